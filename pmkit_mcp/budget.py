@@ -0,0 +1,189 @@
+"""Prompt token budgets and per-field truncation.
+
+Each :class:`WorkflowDefinition` declares a ``prompt_budget`` in estimated
+tokens, and each :class:`FieldSpec` a ``truncation`` policy. When a rendered
+prompt would exceed its budget, :func:`fit_to_budget` shrinks the largest
+optional fields first, trimming each one according to its policy, until the
+estimate fits. Required fields are never trimmed.
+
+Truncation policies:
+
+- ``head``: keep the beginning, drop the end.
+- ``tail``: keep the end, drop the beginning.
+- ``middle``: keep both ends and elide the middle.
+- ``drop_oldest_lines``: drop whole lines from the beginning (the oldest
+  entries of a chronological paste), keeping the most recent ones.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from pmkit_mcp.tokens import chars_for_tokens, estimate_tokens
+from pmkit_mcp.workflows.registry import WorkflowDefinition
+
+TRUNCATION_POLICIES = ("head", "tail", "middle", "drop_oldest_lines")
+
+ELISION_MARKER = "\n[... {count:,} characters trimmed to fit the prompt budget ...]\n"
+
+
+@dataclass(frozen=True)
+class FieldTrim:
+    """How one field was shortened to fit the prompt budget."""
+
+    field: str
+    policy: str
+    original_tokens: int
+    kept_tokens: int
+    original_chars: int
+    kept_chars: int
+
+    @property
+    def trimmed_tokens(self) -> int:
+        return self.original_tokens - self.kept_tokens
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "field": self.field,
+            "policy": self.policy,
+            "original_tokens": self.original_tokens,
+            "kept_tokens": self.kept_tokens,
+            "trimmed_tokens": self.trimmed_tokens,
+            "original_chars": self.original_chars,
+            "kept_chars": self.kept_chars,
+        }
+
+
+@dataclass(frozen=True)
+class BudgetResult:
+    """Outcome of fitting a context to a workflow's prompt budget.
+
+    Attributes:
+        context: The (possibly trimmed) context to render.
+        estimated_tokens: Estimated tokens of the full prompt after trimming.
+        budget: The workflow's prompt budget.
+        trims: One entry per field that was shortened.
+        over_budget: True if the prompt still exceeds the budget, which can
+            only happen when required fields alone are too large.
+    """
+
+    context: dict[str, str]
+    estimated_tokens: int
+    budget: int
+    trims: tuple[FieldTrim, ...] = ()
+    over_budget: bool = False
+
+
+def truncate(text: str, max_tokens: int, policy: str) -> str:
+    """Shorten ``text`` to roughly ``max_tokens`` estimated tokens using ``policy``.
+
+    Raises:
+        ValueError: If ``policy`` is not one of :data:`TRUNCATION_POLICIES`.
+    """
+    if policy not in TRUNCATION_POLICIES:
+        raise ValueError(f"Unknown truncation policy: {policy!r}")
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    marker_tokens = estimate_tokens(ELISION_MARKER.format(count=len(text)))
+    keep = chars_for_tokens(text, max(0, max_tokens - marker_tokens))
+    dropped = len(text) - keep
+
+    if policy == "head":
+        return text[:keep] + ELISION_MARKER.format(count=dropped)
+    if policy == "tail":
+        return ELISION_MARKER.format(count=dropped) + text[len(text) - keep :]
+    if policy == "middle":
+        front = keep // 2
+        back = keep - front
+        return (
+            text[:front]
+            + ELISION_MARKER.format(count=dropped)
+            + (text[len(text) - back :] if back else "")
+        )
+
+    # drop_oldest_lines: cut at the first line boundary that leaves <= keep chars.
+    cut = len(text) - keep
+    newline = text.find("\n", cut)
+    start = len(text) if newline == -1 else newline + 1
+    return ELISION_MARKER.format(count=start).lstrip("\n") + text[start:]
+
+
+def _template_slot_counts(workflow: WorkflowDefinition) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for slot in workflow.compiled_template.slots:
+        counts[slot] = counts.get(slot, 0) + 1
+    return counts
+
+
+def _water_level(sizes: list[int], available: int) -> int:
+    """Largest cap ``c`` such that ``sum(min(s, c) for s in sizes) <= available``."""
+    remaining = available
+    ordered = sorted(sizes)
+    for i, size in enumerate(ordered):
+        share = remaining // (len(ordered) - i)
+        if size > share:
+            return share
+        remaining -= size
+    return ordered[-1] if ordered else 0
+
+
+def fit_to_budget(workflow: WorkflowDefinition, context: Mapping[str, str]) -> BudgetResult:
+    """Trim optional fields so the rendered prompt fits ``workflow.prompt_budget``.
+
+    The estimate covers the system prompt, the template's literal text and
+    every value substituted into it. Optional fields are capped to a common
+    size, largest first, so small fields survive intact while large pastes
+    absorb the cut.
+    """
+    budget = workflow.prompt_budget
+    slot_counts = _template_slot_counts(workflow)
+    values = dict(context)
+
+    fixed = estimate_tokens(workflow.system_prompt) + sum(
+        estimate_tokens(literal) for literal in workflow.compiled_template.literals
+    )
+    sizes = {name: estimate_tokens(values[name]) for name in slot_counts if name in values}
+    total = fixed + sum(sizes[name] * slot_counts[name] for name in sizes)
+    if total <= budget:
+        return BudgetResult(context=values, estimated_tokens=total, budget=budget)
+
+    required = {f.name for f in workflow.required_fields}
+    policies = {f.name: f.truncation for f in workflow.optional_fields}
+    trimmable = [name for name in sizes if name not in required and name in policies]
+    protected = total - sum(sizes[name] * slot_counts[name] for name in trimmable)
+
+    # Each trimmable field may appear several times in the template; weight its cap accordingly.
+    available = max(0, budget - protected)
+    weighted = [sizes[name] * slot_counts[name] for name in trimmable]
+    level = _water_level(weighted, available) if trimmable else 0
+
+    trims: list[FieldTrim] = []
+    for name in trimmable:
+        cap = level // slot_counts[name]
+        if sizes[name] <= cap:
+            continue
+        original = values[name]
+        shortened = truncate(original, cap, policies[name])
+        values[name] = shortened
+        kept = estimate_tokens(shortened)
+        total -= (sizes[name] - kept) * slot_counts[name]
+        trims.append(
+            FieldTrim(
+                field=name,
+                policy=policies[name],
+                original_tokens=sizes[name],
+                kept_tokens=kept,
+                original_chars=len(original),
+                kept_chars=len(shortened),
+            )
+        )
+
+    return BudgetResult(
+        context=values,
+        estimated_tokens=total,
+        budget=budget,
+        trims=tuple(trims),
+        over_budget=total > budget,
+    )
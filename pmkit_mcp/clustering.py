@@ -0,0 +1,355 @@
+"""Local pre-clustering of large feedback pastes.
+
+``voc_clustering`` asks the model to group thousands of raw feedback lines.
+At that size the paste is slow to process and often overflows the prompt
+budget, so the model sees a trimmed sample rather than the whole picture.
+
+With clustering enabled (``--cluster-min-lines``), the ``cluster`` preprocess
+stage replaces a field with at least that many lines by a compact summary:
+
+1. Identical lines are counted once.
+2. Each distinct line becomes an L2-normalized TF-IDF vector over the most
+   frequent terms (sublinear term frequency, smoothed IDF).
+3. Mini-batch spherical k-means groups the vectors. Batches are sampled in
+   proportion to how often a line occurs, so repeated complaints weigh more.
+4. Each theme is reported with its line count, share, top terms and the
+   verbatims closest to its center.
+
+Counts are exact; only the grouping is approximate. Lines without any
+frequent term are counted as unclustered.
+
+This needs NumPy (``pip install 'pmkit-mcp-server[cluster]'``). Sparse rows
+are kept as CSR arrays and densified one batch at a time, so memory stays
+bounded by the batch size rather than the number of lines.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from pmkit_mcp.text import STOP_WORDS
+
+# NumPy is imported on first use (see _require_numpy), keeping it out of server startup.
+np: Any = None
+
+DEFAULT_MAX_CLUSTERS = 12
+DEFAULT_SAMPLES = 3
+DEFAULT_MAX_FEATURES = 2048
+BATCH_SIZE = 1024
+ITERATIONS = 100
+# Densify at most this many rows at once when assigning every line.
+ASSIGN_CHUNK = 4096
+# Representative lines are picked from this many nearest to a center, skipping
+# any whose cosine similarity to an already picked one exceeds the maximum.
+CANDIDATES = 64
+MAX_EXAMPLE_SIMILARITY = 0.8
+
+_TOKEN = re.compile(r"[a-z][a-z0-9']+")
+
+
+class ClusteringUnavailableError(RuntimeError):
+    """Clustering was requested but NumPy is not installed."""
+
+
+@dataclass(frozen=True)
+class ClusterSettings:
+    """How the ``cluster`` preprocess stage condenses a field.
+
+    Attributes:
+        min_lines: Fields with fewer non-blank lines are left as they are.
+        max_clusters: Upper bound on the number of themes.
+        samples: Representative verbatims shown per theme.
+        max_features: Vocabulary size, by document frequency.
+        seed: Seed for batch sampling and initialization, so the same input
+            always produces the same summary (and render-cache key).
+    """
+
+    min_lines: int
+    max_clusters: int = DEFAULT_MAX_CLUSTERS
+    samples: int = DEFAULT_SAMPLES
+    max_features: int = DEFAULT_MAX_FEATURES
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class Cluster:
+    """One theme found in a field.
+
+    Attributes:
+        terms: Highest-weighted terms of the theme's center.
+        count: Lines in the theme, counting repeats.
+        examples: ``(line, occurrences)`` for the lines closest to the center.
+    """
+
+    terms: tuple[str, ...]
+    count: int
+    examples: tuple[tuple[str, int], ...]
+
+
+@dataclass(frozen=True)
+class Clustering:
+    """Themes of one field, largest first."""
+
+    clusters: tuple[Cluster, ...]
+    total: int
+    unclustered: int
+    unclustered_examples: tuple[tuple[str, int], ...] = ()
+
+
+def _require_numpy() -> None:
+    global np
+    if np is not None:
+        return
+    try:
+        import numpy
+    except ImportError:
+        raise ClusteringUnavailableError(
+            "Clustering needs NumPy: pip install 'pmkit-mcp-server[cluster]'"
+        ) from None
+    np = numpy
+
+
+def _tokens(line: str) -> list[str]:
+    return [t for t in _TOKEN.findall(line.lower()) if t not in STOP_WORDS]
+
+
+# ---------------------------------------------------------------------------
+# TF-IDF
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _Matrix:
+    """L2-normalized TF-IDF rows in CSR form."""
+
+    indptr: Any
+    indices: Any
+    data: Any
+    terms: list[str]
+
+    def dense(self, rows: Any) -> Any:
+        """The given rows as a dense ``float32`` array."""
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        out = np.zeros((len(rows), len(self.terms)), dtype=np.float32)
+        total = int(lengths.sum())
+        if total:
+            row_of = np.repeat(np.arange(len(rows)), lengths)
+            # Position of every stored value of the selected rows, in row order.
+            first = np.cumsum(lengths) - lengths
+            positions = np.repeat(starts - first, lengths) + np.arange(total)
+            out[row_of, self.indices[positions]] = self.data[positions]
+        return out
+
+
+def _tfidf(docs: Sequence[list[str]], max_features: int) -> _Matrix:
+    df: Counter[str] = Counter()
+    for tokens in docs:
+        df.update(set(tokens))
+    # Terms in a single line cannot group anything.
+    vocab = [t for t, n in df.most_common(max_features) if n > 1]
+    index = {t: i for i, t in enumerate(vocab)}
+    n_docs = len(docs)
+    idf = np.array([math.log((1 + n_docs) / (1 + df[t])) + 1 for t in vocab], dtype=np.float32)
+
+    indptr = [0]
+    indices: list[int] = []
+    counts: list[int] = []
+    for tokens in docs:
+        tf = Counter(index[t] for t in tokens if t in index)
+        indices.extend(tf)
+        counts.extend(tf.values())
+        indptr.append(len(indices))
+
+    indptr_arr = np.asarray(indptr, dtype=np.int64)
+    indices_arr = np.asarray(indices, dtype=np.int32)
+    data = (1 + np.log(np.asarray(counts, dtype=np.float32))) * idf[indices_arr]
+    row_of = np.repeat(np.arange(n_docs), np.diff(indptr_arr))
+    norms = np.sqrt(np.bincount(row_of, weights=data * data, minlength=n_docs))
+    data /= norms[row_of].astype(np.float32)
+    return _Matrix(indptr_arr, indices_arr, data, vocab)
+
+
+# ---------------------------------------------------------------------------
+# Mini-batch k-means
+# ---------------------------------------------------------------------------
+
+
+def _normalize(centers: Any) -> Any:
+    norms = np.linalg.norm(centers, axis=1, keepdims=True)
+    return centers / np.maximum(norms, 1e-12)
+
+
+def _init_centers(matrix: _Matrix, rows: Any, weights: Any, k: int, rng: Any) -> Any:
+    """k-means++ seeding on a weighted sample, with cosine distance."""
+    sample = rng.choice(rows, size=min(len(rows), 20 * k + BATCH_SIZE), replace=False)
+    points = matrix.dense(sample)
+    w = weights[sample].astype(np.float64)
+    centers = [points[rng.choice(len(sample), p=w / w.sum())]]
+    closest = 1 - points @ centers[0]
+    for _ in range(1, k):
+        score = np.maximum(closest, 0) * w
+        if score.sum() <= 0:
+            break
+        chosen = points[rng.choice(len(sample), p=score / score.sum())]
+        centers.append(chosen)
+        closest = np.minimum(closest, 1 - points @ chosen)
+    return np.array(centers, dtype=np.float32)
+
+
+def _fit(matrix: _Matrix, rows: Any, weights: Any, k: int, seed: int) -> Any:
+    rng = np.random.default_rng(seed)
+    centers = _init_centers(matrix, rows, weights, k, rng)
+    k = len(centers)
+    seen = np.zeros(k, dtype=np.float64)
+    p = weights[rows] / weights[rows].sum()
+    batch = min(BATCH_SIZE, len(rows))
+    for _ in range(ITERATIONS):
+        points = matrix.dense(rng.choice(rows, size=batch, p=p))
+        assigned = np.argmax(points @ centers.T, axis=1)
+        members = np.zeros((k, batch), dtype=np.float32)
+        members[assigned, np.arange(batch)] = 1
+        sizes = members.sum(axis=1)
+        hit = sizes > 0
+        seen[hit] += sizes[hit]
+        # Per-center learning rate 1/count, applied to the batch mean (Sculley 2010).
+        rate = (sizes[hit] / seen[hit]).astype(np.float32)[:, None]
+        means = (members[hit] @ points) / sizes[hit][:, None]
+        centers[hit] = (1 - rate) * centers[hit] + rate * means
+        centers = _normalize(centers)
+    return centers
+
+
+def _diverse(points: Any, count: int) -> list[int]:
+    """Up to ``count`` of ``points`` (nearest first), skipping near-copies of earlier picks."""
+    picked: list[int] = []
+    for i in range(len(points)):
+        if len(picked) == count:
+            break
+        if not picked or (points[picked] @ points[i]).max() < MAX_EXAMPLE_SIMILARITY:
+            picked.append(i)
+    return picked
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def cluster_lines(lines: Iterable[str], settings: ClusterSettings) -> Clustering:
+    """Group ``lines`` into themes.
+
+    Raises:
+        ClusteringUnavailableError: If NumPy is not installed.
+    """
+    _require_numpy()
+    occurrences = Counter(line.strip() for line in lines if line.strip())
+    texts = list(occurrences)
+    total = sum(occurrences.values())
+    weights = np.array([occurrences[t] for t in texts], dtype=np.float64)
+    matrix = _tfidf([_tokens(t) for t in texts], settings.max_features)
+
+    has_terms = np.flatnonzero(np.diff(matrix.indptr) > 0)
+    no_terms = np.flatnonzero(np.diff(matrix.indptr) == 0)
+    unclustered_examples = tuple(
+        (texts[i], occurrences[texts[i]])
+        for i in no_terms[np.argsort(-weights[no_terms], kind="stable")][: settings.samples]
+    )
+    k = min(settings.max_clusters, len(has_terms))
+    if k == 0:
+        return Clustering((), total, total, unclustered_examples)
+
+    centers = _fit(matrix, has_terms, weights, k, settings.seed)
+    assigned = np.empty(len(has_terms), dtype=np.int64)
+    similarity = np.empty(len(has_terms), dtype=np.float32)
+    for start in range(0, len(has_terms), ASSIGN_CHUNK):
+        chunk = has_terms[start : start + ASSIGN_CHUNK]
+        sims = matrix.dense(chunk) @ centers.T
+        assigned[start : start + len(chunk)] = np.argmax(sims, axis=1)
+        similarity[start : start + len(chunk)] = sims.max(axis=1)
+
+    clusters = []
+    for c in range(len(centers)):
+        members = np.flatnonzero(assigned == c)
+        if not len(members):
+            continue
+        nearest = members[np.argsort(-similarity[members], kind="stable")][:CANDIDATES]
+        closest = _diverse(matrix.dense(has_terms[nearest]), settings.samples)
+        clusters.append(
+            Cluster(
+                terms=tuple(matrix.terms[i] for i in np.argsort(-centers[c])[:3]),
+                count=int(weights[has_terms[members]].sum()),
+                examples=tuple(
+                    (texts[has_terms[i]], occurrences[texts[has_terms[i]]])
+                    for i in nearest[closest]
+                ),
+            )
+        )
+    clusters.sort(key=lambda c: -c.count)
+    unclustered = int(weights[no_terms].sum())
+    return Clustering(tuple(clusters), total, unclustered, unclustered_examples)
+
+
+def format_clustering(result: Clustering) -> Iterator[str]:
+    """Lines of the summary that replaces a clustered field."""
+    yield (
+        f"[Pre-clustered locally: {result.total:,} lines in {len(result.clusters)} themes. "
+        "Counts are exact; quotes are the lines closest to each theme.]"
+    )
+    for number, cluster in enumerate(result.clusters, 1):
+        share = 100 * cluster.count / result.total
+        yield ""
+        yield (
+            f"Theme {number}: {', '.join(cluster.terms)} ({cluster.count:,} lines, {share:.1f}%)"
+        )
+        for text, repeats in cluster.examples:
+            suffix = f" (x{repeats})" if repeats > 1 else ""
+            yield f'- "{text}"{suffix}'
+    if result.unclustered:
+        yield ""
+        yield f"Unclustered: {result.unclustered:,} lines without recurring terms"
+        for text, repeats in result.unclustered_examples:
+            suffix = f" (x{repeats})" if repeats > 1 else ""
+            yield f'- "{text}"{suffix}'
+
+
+_settings: ClusterSettings | None = None
+
+
+def configure_clustering(settings: ClusterSettings | None) -> None:
+    """Enable the ``cluster`` stage with ``settings``, or disable it with ``None``.
+
+    Raises:
+        ClusteringUnavailableError: If enabling and NumPy is not installed.
+    """
+    global _settings
+    if settings is not None:
+        _require_numpy()
+    _settings = settings
+
+
+def make_cluster_settings(
+    min_lines: int, max_clusters: int = DEFAULT_MAX_CLUSTERS
+) -> ClusterSettings | None:
+    """Build settings from ``--cluster-min-lines``, or ``None`` when it is 0."""
+    if min_lines <= 0:
+        return None
+    return ClusterSettings(min_lines=min_lines, max_clusters=max_clusters)
+
+
+def cluster_stage(lines: Iterable[str]) -> Iterator[str]:
+    """Preprocess stage: summarize the field when clustering is enabled and it is large."""
+    settings = _settings
+    if settings is None:
+        yield from lines
+        return
+    buffered = list(lines)
+    if sum(1 for line in buffered if line.strip()) < settings.min_lines:
+        yield from buffered
+        return
+    yield from format_clustering(cluster_lines(buffered, settings))
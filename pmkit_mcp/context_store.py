@@ -0,0 +1,283 @@
+"""Content-addressed store for large pasted inputs.
+
+Hosts often paste the same multi-megabyte blob (support tickets, call
+transcripts) into several workflows in one session. With the
+``pmkit_put_context`` tool the blob is uploaded once and addressed by its
+SHA-256. Any workflow field can then carry ``ref:<sha256>`` instead of the
+text, and the server substitutes the stored content before validating and
+rendering.
+
+Storage is bounded:
+
+- Blobs live in memory up to ``max_memory_bytes``. Least recently used
+  blobs then spill to files in a subdirectory of ``spill_dir`` owned by
+  the store and removed when it is closed.
+- The spill directory is itself capped at ``max_disk_bytes``, evicting
+  least recently used blobs.
+- A blob not used for ``ttl_seconds`` expires.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+REF_PREFIX = "ref:"
+_HASH_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+DEFAULT_MEMORY_MB = 256
+DEFAULT_DISK_MB = 4096
+DEFAULT_TTL_SECONDS = 3600.0
+
+
+class ContextRefError(LookupError):
+    """A ``ref:`` value names content that is unknown or has expired."""
+
+    def __init__(self, field: str, ref: str) -> None:
+        super().__init__(
+            f"Unknown or expired context reference for `{field}`: {ref}. "
+            "Upload the content again with `pmkit_put_context` and use the new ref."
+        )
+        self.field = field
+        self.ref = ref
+
+
+@dataclass
+class _Blob:
+    size: int  # UTF-8 bytes
+    last_used: float
+    text: str | None = None  # None when spilled to disk
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def parse_ref(value: Any) -> str | None:
+    """Return the hash of a ``ref:<sha256>`` value, or ``None`` for ordinary values."""
+    if not isinstance(value, str) or not value.startswith(REF_PREFIX):
+        return None
+    digest = value[len(REF_PREFIX) :].strip().lower()
+    return digest if _HASH_PATTERN.fullmatch(digest) else None
+
+
+class ContextStore:
+    """Thread-safe, size-bounded blob store keyed by SHA-256.
+
+    Args:
+        max_memory_bytes: Bytes of blob text kept in memory before spilling.
+        max_disk_bytes: Bytes of spilled blobs kept on disk before evicting.
+        ttl_seconds: Blobs unused for this long are dropped.
+        spill_dir: Directory under which spilled blobs are kept. On first
+            spill the store creates its own subdirectory there (named
+            after the process id), or in the system temporary directory if
+            not given, and removes it on :meth:`close`. Processes sharing
+            ``spill_dir`` therefore never touch each other's blobs.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = DEFAULT_MEMORY_MB << 20,
+        max_disk_bytes: int = DEFAULT_DISK_MB << 20,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        spill_dir: str | Path | None = None,
+    ) -> None:
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self._spill_root = Path(spill_dir) if spill_dir else None
+        self._spill_dir: Path | None = None
+        self._blobs: OrderedDict[str, _Blob] = OrderedDict()  # LRU order
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        self.spills = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # -- public API ---------------------------------------------------------
+
+    def put(self, text: str) -> tuple[str, int]:
+        """Store ``text`` and return ``(sha256, size_in_bytes)``. Re-putting is cheap."""
+        data = text.encode("utf-8", "surrogatepass")
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            blob = self._blobs.get(digest)
+            if blob is not None:
+                blob.last_used = now
+                self._blobs.move_to_end(digest)
+                return digest, blob.size
+            self._blobs[digest] = _Blob(size=len(data), last_used=now, text=text)
+            self._memory_bytes += len(data)
+            self._enforce_limits()
+        return digest, len(data)
+
+    def get(self, digest: str) -> str | None:
+        """Return the stored text for ``digest``, or ``None`` if unknown or expired."""
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            blob = self._blobs.get(digest)
+            if blob is None:
+                return None
+            blob.last_used = now
+            self._blobs.move_to_end(digest)
+            if blob.text is not None:
+                return blob.text
+            path = self._path(digest)
+        try:
+            # Bytes, not text mode: newline translation would change the content.
+            return path.read_bytes().decode("utf-8", "surrogatepass")
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, digest: object) -> bool:
+        return digest in self._blobs
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            in_memory = sum(1 for b in self._blobs.values() if b.text is not None)
+            return {
+                "entries": len(self._blobs),
+                "in_memory": in_memory,
+                "on_disk": len(self._blobs) - in_memory,
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "spills": self.spills,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def close(self) -> None:
+        """Drop everything and remove the store's spill directory."""
+        with self._lock:
+            self._blobs.clear()
+            self._memory_bytes = self._disk_bytes = 0
+            if self._spill_dir is not None:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+
+    # -- internals (called with the lock held) -------------------------------
+
+    def _path(self, digest: str) -> Path:
+        if self._spill_dir is None:
+            if self._spill_root is not None:
+                self._spill_root.mkdir(parents=True, exist_ok=True)
+            self._spill_dir = Path(
+                tempfile.mkdtemp(prefix=f"pmkit-context-{os.getpid()}-", dir=self._spill_root)
+            )
+        return self._spill_dir / digest
+
+    def _drop(self, digest: str) -> None:
+        blob = self._blobs.pop(digest)
+        if blob.text is not None:
+            self._memory_bytes -= blob.size
+        else:
+            self._disk_bytes -= blob.size
+            self._path(digest).unlink(missing_ok=True)
+
+    def _sweep(self, now: float) -> None:
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + min(self.ttl_seconds, 60.0)
+        cutoff = now - self.ttl_seconds
+        # LRU order means expired blobs are at the front.
+        while self._blobs:
+            digest, blob = next(iter(self._blobs.items()))
+            if blob.last_used > cutoff:
+                break
+            self._drop(digest)
+            self.expirations += 1
+
+    def _enforce_limits(self) -> None:
+        if self._memory_bytes > self.max_memory_bytes:
+            for digest, blob in list(self._blobs.items()):
+                if self._memory_bytes <= self.max_memory_bytes:
+                    break
+                if blob.text is None:
+                    continue
+                if blob.size > self.max_disk_bytes:
+                    self._drop(digest)
+                    self.evictions += 1
+                    continue
+                path = self._path(digest)
+                tmp = path.with_name(f".{digest}.{os.getpid()}.tmp")
+                tmp.write_bytes(blob.text.encode("utf-8", "surrogatepass"))
+                os.replace(tmp, path)
+                blob.text = None
+                self._memory_bytes -= blob.size
+                self._disk_bytes += blob.size
+                self.spills += 1
+        while self._disk_bytes > self.max_disk_bytes:
+            victim = next(d for d, b in self._blobs.items() if b.text is None)
+            self._drop(victim)
+            self.evictions += 1
+
+
+@dataclass(frozen=True)
+class ResolvedArguments:
+    """Arguments with every ``ref:`` value replaced by its stored content.
+
+    Attributes:
+        arguments: The resolved arguments.
+        refs: Number of ``ref:`` values resolved.
+        bytes_saved: Bytes the client did not have to send, i.e. content
+            size minus the size of the ``ref:`` strings.
+    """
+
+    arguments: dict[str, Any]
+    refs: int = 0
+    bytes_saved: int = 0
+
+
+def has_refs(arguments: Mapping[str, Any]) -> bool:
+    return any(parse_ref(v) is not None for v in arguments.values())
+
+
+def resolve_refs(arguments: Mapping[str, Any], store: ContextStore) -> ResolvedArguments:
+    """Replace ``ref:<sha256>`` values in ``arguments`` with stored content.
+
+    Raises:
+        ContextRefError: If a reference is unknown or has expired.
+    """
+    resolved = dict(arguments)
+    refs = saved = 0
+    for name, value in arguments.items():
+        digest = parse_ref(value)
+        if digest is None:
+            continue
+        text = store.get(digest)
+        if text is None:
+            raise ContextRefError(name, value)
+        resolved[name] = text
+        refs += 1
+        saved += len(text.encode("utf-8", "surrogatepass")) - len(value)
+    return ResolvedArguments(resolved, refs, saved)
+
+
+def make_context_store(
+    memory_mb: float = DEFAULT_MEMORY_MB,
+    disk_mb: float = DEFAULT_DISK_MB,
+    ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    spill_dir: str | None = None,
+) -> ContextStore:
+    """Build a store from megabyte limits, as given on the command line."""
+    return ContextStore(
+        max_memory_bytes=int(memory_mb * 1024 * 1024),
+        max_disk_bytes=int(disk_mb * 1024 * 1024),
+        ttl_seconds=ttl_seconds,
+        spill_dir=spill_dir or None,
+    )
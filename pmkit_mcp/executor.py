@@ -0,0 +1,353 @@
+"""Optional server-side execution of rendered prompts.
+
+By default the server only renders prompts and the host runs the model. With
+an executor configured (``--llm-url``), workflow calls also send the rendered
+system/user pair to an OpenAI- or Anthropic-compatible chat endpoint and
+return the model's answer. This saves the host a turn per workflow and lets
+``pmkit_render_batch`` run many workflows concurrently on the server.
+
+:class:`LLMExecutor` keeps one pooled ``httpx.AsyncClient`` (keep-alive
+connections are reused across calls) and bounds in-flight requests with a
+semaphore. Responses are streamed over server-sent events, so tokens can be
+forwarded as they arrive. Connection failures, 429 and 5xx responses are
+retried with exponential backoff and jitter (honoring ``Retry-After``), but
+only until the first token has been received; a retry after that would
+duplicate output.
+
+``base_url`` includes the API version prefix, e.g.
+``https://api.openai.com/v1`` or ``https://api.anthropic.com/v1``; the
+executor posts to ``/chat/completions`` or ``/messages`` under it. The API
+key is read from the ``PMKIT_LLM_API_KEY`` environment variable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from pmkit_mcp.renderer import RenderedPrompt
+
+API_STYLES = ("openai", "anthropic")
+API_KEY_ENV = "PMKIT_LLM_API_KEY"
+ANTHROPIC_VERSION = "2023-06-01"
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+
+TokenCallback = Callable[[str], Awaitable[None]]
+
+
+class ExecutorError(RuntimeError):
+    """The model endpoint failed, after any retries.
+
+    Attributes:
+        status: HTTP status of the last response, or ``None`` for transport errors.
+    """
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class _RetryableStatusError(Exception):
+    def __init__(self, status: int, retry_after: float | None) -> None:
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class ExecutorSettings:
+    """Where and how to run rendered prompts.
+
+    Attributes:
+        base_url: Endpoint root including the version prefix.
+        model: Model name sent with each request.
+        api: Request/response dialect, one of :data:`API_STYLES`.
+        api_key: Bearer token (OpenAI) or ``x-api-key`` (Anthropic); may be empty
+            for local servers.
+        max_concurrency: Requests in flight at once; also the connection pool size.
+        max_retries: Retries after the first attempt for retryable failures.
+        backoff: Base delay in seconds, doubled on each retry.
+        max_backoff: Upper bound for one delay.
+        timeout: Seconds to wait for a connection or for the next streamed chunk.
+        max_tokens: Completion length limit.
+        temperature: Sampling temperature.
+    """
+
+    base_url: str
+    model: str
+    api: str = "openai"
+    api_key: str = ""
+    max_concurrency: int = 4
+    max_retries: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 8.0
+    timeout: float = 120.0
+    max_tokens: int = 4096
+    temperature: float = 0.2
+
+    def __post_init__(self) -> None:
+        if self.api not in API_STYLES:
+            raise ValueError(f"Unknown API style: {self.api!r} (expected one of {API_STYLES})")
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+    def model_params(self) -> dict[str, Any]:
+        """The settings that influence the output, for result cache keys."""
+        return {
+            "base_url": self.base_url,
+            "api": self.api,
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+        }
+
+
+@dataclass(frozen=True)
+class Completion:
+    """A finished model call.
+
+    Attributes:
+        text: The generated text.
+        model: Model the prompt was sent to.
+        attempts: Requests made, including retries.
+        latency: Seconds from the first attempt to the last token.
+        cached: True if served from the result cache without calling the model.
+    """
+
+    text: str
+    model: str
+    attempts: int
+    latency: float
+    cached: bool = False
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None  # HTTP-date form; fall back to our own backoff
+
+
+class LLMExecutor:
+    """Runs rendered prompts against a chat completion endpoint.
+
+    Args:
+        settings: Endpoint, model and limits.
+    """
+
+    def __init__(self, settings: ExecutorSettings) -> None:
+        self.settings = settings
+        headers = {"content-type": "application/json", "accept": "text/event-stream"}
+        if settings.api == "anthropic":
+            headers["anthropic-version"] = ANTHROPIC_VERSION
+            if settings.api_key:
+                headers["x-api-key"] = settings.api_key
+        elif settings.api_key:
+            headers["authorization"] = f"Bearer {settings.api_key}"
+        self._client = httpx.AsyncClient(
+            base_url=settings.base_url.rstrip("/"),
+            headers=headers,
+            timeout=httpx.Timeout(settings.timeout),
+            limits=httpx.Limits(
+                max_connections=settings.max_concurrency,
+                max_keepalive_connections=settings.max_concurrency,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(settings.max_concurrency)
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    async def __aenter__(self) -> LLMExecutor:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    # -- request encoding ---------------------------------------------------
+
+    def _request(self, system_prompt: str, user_prompt: str) -> tuple[str, dict[str, Any]]:
+        s = self.settings
+        if s.api == "anthropic":
+            return "/messages", {
+                "model": s.model,
+                "system": system_prompt,
+                "messages": [{"role": "user", "content": user_prompt}],
+                "max_tokens": s.max_tokens,
+                "temperature": s.temperature,
+                "stream": True,
+            }
+        return "/chat/completions", {
+            "model": s.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "max_tokens": s.max_tokens,
+            "temperature": s.temperature,
+            "stream": True,
+        }
+
+    def _parse_event(self, data: dict[str, Any]) -> tuple[str, bool]:
+        """Return ``(text, finished)`` for one decoded SSE ``data`` payload."""
+        if "error" in data and data.get("type") in (None, "error"):
+            error = data["error"]
+            message = error.get("message", error) if isinstance(error, dict) else error
+            raise ExecutorError(f"Model endpoint error: {message}")
+        if self.settings.api == "anthropic":
+            kind = data.get("type")
+            if kind == "content_block_delta":
+                return data.get("delta", {}).get("text", ""), False
+            return "", kind == "message_stop"
+        choices = data.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content") or "", False
+
+    # -- execution -----------------------------------------------------------
+
+    async def _stream_once(
+        self, path: str, body: dict[str, Any], started: list[bool]
+    ) -> AsyncIterator[str]:
+        async with self._client.stream("POST", path, json=body) as response:
+            if response.status_code in RETRYABLE_STATUS:
+                await response.aread()
+                raise _RetryableStatusError(response.status_code, _retry_after(response))
+            if response.status_code >= 400:
+                detail = (await response.aread()).decode("utf-8", "replace")[:500]
+                raise ExecutorError(
+                    f"Model endpoint returned HTTP {response.status_code}: {detail}",
+                    response.status_code,
+                )
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    return
+                if not payload:
+                    continue
+                try:
+                    data = json.loads(payload)
+                except ValueError as e:
+                    raise ExecutorError(f"Malformed event from endpoint: {payload[:200]}") from e
+                text, finished = self._parse_event(data)
+                if text:
+                    started[0] = True
+                    yield text
+                if finished:
+                    return
+
+    async def stream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """Yield the model's output as it is generated.
+
+        Raises:
+            ExecutorError: If the endpoint fails after retries, returns a
+                non-retryable error, or the stream breaks after output began.
+        """
+        async for text in self._stream(system_prompt, user_prompt, [0]):
+            yield text
+
+    async def _stream(
+        self, system_prompt: str, user_prompt: str, attempts: list[int]
+    ) -> AsyncIterator[str]:
+        # attempts[0] counts this call's requests; self.requests is shared by all calls.
+        s = self.settings
+        path, body = self._request(system_prompt, user_prompt)
+        started = [False]
+        async with self._semaphore:
+            while True:
+                attempts[0] += 1
+                attempt = attempts[0]
+                self.requests += 1
+                try:
+                    async for text in self._stream_once(path, body, started):
+                        yield text
+                    return
+                except (httpx.TransportError, _RetryableStatusError) as e:
+                    status = e.status if isinstance(e, _RetryableStatusError) else None
+                    if started[0] or attempt > s.max_retries:
+                        self.failures += 1
+                        raise ExecutorError(
+                            f"Model request failed after {attempt} attempt(s): {e!r}", status
+                        ) from e
+                    delay = min(s.max_backoff, s.backoff * 2 ** (attempt - 1))
+                    delay *= 0.5 + random.random()
+                    if isinstance(e, _RetryableStatusError) and e.retry_after is not None:
+                        delay = min(s.max_backoff, e.retry_after)
+                    self.retries += 1
+                    await asyncio.sleep(delay)
+                except ExecutorError:
+                    self.failures += 1
+                    raise
+
+    async def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        on_token: TokenCallback | None = None,
+    ) -> Completion:
+        """Run one prompt pair to completion, passing chunks to ``on_token``."""
+        start = time.perf_counter()
+        attempts = [0]
+        parts: list[str] = []
+        async for text in self._stream(system_prompt, user_prompt, attempts):
+            parts.append(text)
+            if on_token is not None:
+                await on_token(text)
+        return Completion(
+            text="".join(parts),
+            model=self.settings.model,
+            attempts=attempts[0],
+            latency=time.perf_counter() - start,
+        )
+
+    async def execute(
+        self, rendered: RenderedPrompt, on_token: TokenCallback | None = None
+    ) -> Completion:
+        """Run a rendered workflow prompt (see :func:`~pmkit_mcp.renderer.render_workflow`)."""
+        return await self.complete(rendered.system_prompt, rendered.user_prompt, on_token)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "model": self.settings.model,
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "max_concurrency": self.settings.max_concurrency,
+        }
+
+
+def make_executor(
+    base_url: str | None,
+    model: str = "",
+    api: str = "openai",
+    **limits: Any,
+) -> LLMExecutor | None:
+    """Build an executor, or ``None`` when no endpoint is configured.
+
+    The API key comes from the :data:`API_KEY_ENV` environment variable.
+    ``limits`` are passed through to :class:`ExecutorSettings`.
+    """
+    if not base_url:
+        return None
+    if not model:
+        raise ValueError("An LLM model name is required with an LLM endpoint URL")
+    settings = ExecutorSettings(
+        base_url=base_url,
+        model=model,
+        api=api,
+        api_key=os.environ.get(API_KEY_ENV, ""),
+        **limits,
+    )
+    return LLMExecutor(settings)
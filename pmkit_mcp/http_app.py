@@ -0,0 +1,382 @@
+"""Streamable HTTP transport for the PM Kit MCP server.
+
+Serves the same tools as the stdio transport (see :func:`create_server`) over
+MCP Streamable HTTP so that one pool of server processes can sit behind a
+load balancer and handle many concurrent client sessions.
+
+Worker processes are managed by uvicorn. Because uvicorn imports the
+application by name in each worker, settings travel through ``PMKIT_HTTP_*``
+environment variables (see :class:`HttpSettings`) and the ASGI app is built
+by the :func:`create_app` factory.
+
+Each worker serves its own Prometheus-text metrics at ``/metrics``. With
+several workers a scrape sees whichever worker answers, so prefer
+``metrics_file``; each worker then writes ``<stem>.<pid><suffix>``.
+
+Usage:
+    pmkit-mcp --transport http --port 8000 --workers 4 --max-concurrency 64
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any
+
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from starlette.types import Receive, Scope, Send
+
+from pmkit_mcp.clustering import DEFAULT_MAX_CLUSTERS, configure_clustering, make_cluster_settings
+from pmkit_mcp.context_store import (
+    DEFAULT_DISK_MB,
+    DEFAULT_MEMORY_MB,
+    DEFAULT_TTL_SECONDS,
+    make_context_store,
+)
+from pmkit_mcp.executor import make_executor
+from pmkit_mcp.metrics import ServerMetrics, dump_metrics_periodically
+from pmkit_mcp.passages import DEFAULT_PASSAGE_INDEX_MB, make_passage_index_cache
+from pmkit_mcp.preprocess import load_noise_patterns
+from pmkit_mcp.profiles import make_profile_store
+from pmkit_mcp.render_cache import make_render_cache
+from pmkit_mcp.responses import DEFAULT_RESPONSE_MODE
+from pmkit_mcp.result_cache import DEFAULT_RESULT_CACHE_MB, make_result_cache
+from pmkit_mcp.scheduler import (
+    DEFAULT_CATCH_UP_SECONDS,
+    DEFAULT_JITTER_SECONDS,
+    DEFAULT_SCHEDULE_CONCURRENCY,
+    load_schedule,
+)
+from pmkit_mcp.server import (
+    create_server,
+    get_tool_manifest,
+    is_known_tool,
+    load_catalogs,
+    metrics_exporter,
+    schedule_ledger,
+    start_scheduler,
+    start_watcher,
+    unsaved_schedule_reason,
+)
+from pmkit_mcp.sessions import (
+    DEFAULT_DRAFT_TTL_SECONDS,
+    DEFAULT_DRAFTS_MB,
+    make_argument_drafts,
+)
+from pmkit_mcp.workflows.watch import DEFAULT_WATCH_INTERVAL
+
+logger = logging.getLogger("pmkit_mcp.http")
+
+ENV_PREFIX = "PMKIT_HTTP_"
+
+
+@dataclass(frozen=True)
+class HttpSettings:
+    """Configuration for the HTTP transport.
+
+    Attributes:
+        host: Interface to bind.
+        port: TCP port to bind.
+        path: URL path of the MCP endpoint.
+        workers: Number of worker processes.
+        max_concurrency: Maximum concurrent connections/requests per worker;
+            further requests receive HTTP 503 until capacity frees up.
+            ``0`` disables the limit.
+        keep_alive: Seconds an idle keep-alive connection is held open.
+        stateless: Handle every request independently with no session
+            state. Required when ``workers > 1`` because a client's
+            follow-up requests may land on a different worker.
+        json_response: Answer with plain JSON bodies instead of SSE streams.
+        response_mode: Encoding of rendered prompts (see :mod:`pmkit_mcp.responses`).
+        render_cache_mb: Size of the per-worker render cache in MB (``0`` = off).
+        passage_index_mb: Size of the per-worker passage index cache in MB
+            (``0`` = off).
+        metrics_file: If set, each worker periodically writes Prometheus-text
+            metrics to this path (suffixed with its pid when ``workers > 1``).
+        metrics_interval: Seconds between metrics file writes.
+        catalog: External workflow catalog directories to serve, separated
+            by ``os.pathsep``.
+        watch: Reload edited workflow definitions without restarting. Each
+            worker polls on its own.
+        watch_interval: Seconds between checks for edits.
+        context_memory_mb: Per-worker memory for ``pmkit_put_context`` uploads, in MB.
+        context_disk_mb: Per-worker disk space for spilled uploads, in MB.
+        context_ttl: Seconds an unused upload is kept.
+        context_spill_dir: Directory for spilled uploads; each worker spills
+            into its own subdirectory, removed on shutdown, of this or the
+            system temporary directory. Uploads are per worker, so with
+            ``workers > 1`` a ``ref:`` only resolves on the worker that
+            stored it.
+        session_drafts_mb: Per-worker memory for ``pmkit_session`` argument
+            drafts, in MB. Drafts need a session, so they have no effect
+            when ``stateless``.
+        session_ttl: Seconds an untouched draft is kept.
+        llm_url: If set, run rendered prompts on this OpenAI/Anthropic-compatible
+            endpoint (see :mod:`pmkit_mcp.executor`). Each worker has its own
+            connection pool of ``llm_concurrency`` connections.
+        llm_model: Model name to request.
+        llm_api: Request dialect, ``openai`` or ``anthropic``.
+        llm_concurrency: Model requests in flight per worker.
+        llm_retries: Retries for failed model requests.
+        llm_timeout: Seconds to wait for a connection or the next streamed chunk.
+        llm_max_tokens: Output token limit.
+        result_cache: SQLite file caching model outputs. All workers share it.
+        result_cache_mb: Size bound of the result cache in MB.
+        result_ttl: Result freshness overrides, ``name=seconds,...`` by
+            workflow id or category.
+        schedule: JSON file of scheduled workflow jobs. Every worker runs the
+            schedule. Executed results are claimed once in the shared result
+            cache; rendered prompts are cached by each worker. Not started
+            without the matching ``result_cache`` or ``render_cache_mb``.
+        schedule_concurrency: Scheduled runs in flight at once, per worker.
+        schedule_jitter: Max random delay of each scheduled run, in seconds.
+        schedule_catch_up: Runs missed by at most this many seconds are made up.
+        profiles: JSON file of per-user recurring field values, shared by
+            all workers. Only authenticated requests use a profile.
+        noise_patterns: File of extra line patterns dropped by the ``noise``
+            preprocess stage.
+        cluster_min_lines: Feedback fields with at least this many lines are
+            replaced by local clusters (0 = off; needs NumPy).
+        clusters: Most themes per clustered field.
+    """
+
+    host: str = "127.0.0.1"
+    port: int = 8000
+    path: str = "/mcp"
+    workers: int = 1
+    max_concurrency: int = 64
+    keep_alive: int = 30
+    stateless: bool = False
+    json_response: bool = False
+    response_mode: str = DEFAULT_RESPONSE_MODE
+    render_cache_mb: float = 0
+    passage_index_mb: float = DEFAULT_PASSAGE_INDEX_MB
+    metrics_file: str = ""
+    metrics_interval: float = 15.0
+    catalog: str = ""
+    watch: bool = False
+    watch_interval: float = DEFAULT_WATCH_INTERVAL
+    context_memory_mb: float = DEFAULT_MEMORY_MB
+    context_disk_mb: float = DEFAULT_DISK_MB
+    context_ttl: float = DEFAULT_TTL_SECONDS
+    context_spill_dir: str = ""
+    session_drafts_mb: float = DEFAULT_DRAFTS_MB
+    session_ttl: float = DEFAULT_DRAFT_TTL_SECONDS
+    llm_url: str = ""
+    llm_model: str = ""
+    llm_api: str = "openai"
+    llm_concurrency: int = 4
+    llm_retries: int = 3
+    llm_timeout: float = 120.0
+    llm_max_tokens: int = 4096
+    result_cache: str = ""
+    result_cache_mb: float = DEFAULT_RESULT_CACHE_MB
+    result_ttl: str = ""
+    schedule: str = ""
+    schedule_concurrency: int = DEFAULT_SCHEDULE_CONCURRENCY
+    schedule_jitter: float = DEFAULT_JITTER_SECONDS
+    schedule_catch_up: float = DEFAULT_CATCH_UP_SECONDS
+    profiles: str = ""
+    noise_patterns: str = ""
+    cluster_min_lines: int = 0
+    clusters: int = DEFAULT_MAX_CLUSTERS
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError("workers must be at least 1")
+        if self.max_concurrency < 0:
+            raise ValueError("max_concurrency must be >= 0")
+        if self.clusters < 1:
+            raise ValueError("clusters must be at least 1")
+        if self.workers > 1 and not self.stateless:
+            # Sessions live in one process; spread across workers they would be lost.
+            object.__setattr__(self, "stateless", True)
+
+    def to_env(self) -> dict[str, str]:
+        """Serialize settings to ``PMKIT_HTTP_*`` environment variables."""
+        return {ENV_PREFIX + f.name.upper(): str(getattr(self, f.name)) for f in fields(self)}
+
+    @classmethod
+    def from_env(cls, environ: dict[str, str] | None = None) -> HttpSettings:
+        """Load settings from ``PMKIT_HTTP_*`` environment variables, using defaults if unset."""
+        environ = dict(os.environ) if environ is None else environ
+        values: dict[str, Any] = {}
+        for f in fields(cls):
+            raw = environ.get(ENV_PREFIX + f.name.upper())
+            if raw is None:
+                continue
+            if f.type == "bool":
+                values[f.name] = raw.strip().lower() in ("1", "true", "yes", "on")
+            elif f.type == "int":
+                values[f.name] = int(raw)
+            elif f.type == "float":
+                values[f.name] = float(raw)
+            else:
+                values[f.name] = raw
+        return cls(**values)
+
+
+class _MCPEndpoint:
+    """ASGI endpoint that forwards requests to the session manager."""
+
+    def __init__(self, session_manager: StreamableHTTPSessionManager) -> None:
+        self.session_manager = session_manager
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+def create_app(settings: HttpSettings | None = None) -> Starlette:
+    """Build the ASGI application serving MCP over Streamable HTTP.
+
+    Args:
+        settings: Transport settings. Defaults to :meth:`HttpSettings.from_env`,
+            which is how uvicorn worker processes receive their configuration.
+
+    Returns:
+        A Starlette app exposing the MCP endpoint, a ``/healthz`` probe and a
+        cacheable ``/tools`` manifest.
+    """
+    settings = settings or HttpSettings.from_env()
+    catalogs = [d for d in settings.catalog.split(os.pathsep) if d]
+    load_catalogs(catalogs)
+    if settings.noise_patterns:
+        load_noise_patterns(settings.noise_patterns)
+    configure_clustering(make_cluster_settings(settings.cluster_min_lines, settings.clusters))
+    render_cache = make_render_cache(settings.render_cache_mb)
+    metrics = ServerMetrics(known_tools=is_known_tool)
+    exporter = metrics_exporter(metrics, render_cache)
+    context_store = make_context_store(
+        settings.context_memory_mb,
+        settings.context_disk_mb,
+        settings.context_ttl,
+        settings.context_spill_dir,
+    )
+    executor = make_executor(
+        settings.llm_url,
+        settings.llm_model,
+        settings.llm_api,
+        max_concurrency=settings.llm_concurrency,
+        max_retries=settings.llm_retries,
+        timeout=settings.llm_timeout,
+        max_tokens=settings.llm_max_tokens,
+    )
+    result_cache = make_result_cache(
+        settings.result_cache, settings.result_cache_mb, settings.result_ttl
+    )
+    schedule = load_schedule(settings.schedule) if settings.schedule else []
+    server = create_server(
+        settings.response_mode,
+        render_cache,
+        metrics,
+        context_store,
+        make_argument_drafts(settings.session_drafts_mb, settings.session_ttl),
+        executor,
+        result_cache,
+        make_profile_store(settings.profiles),
+        make_passage_index_cache(settings.passage_index_mb),
+    )
+    session_manager = StreamableHTTPSessionManager(
+        app=server,
+        json_response=settings.json_response,
+        stateless=settings.stateless,
+    )
+
+    async def healthz(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+    async def tools(request: Request) -> Response:
+        # Pre-serialized tools/list payload with a conditional-GET ETag, so
+        # clients and caching proxies can skip re-downloading an unchanged list.
+        manifest = get_tool_manifest()
+        headers = {"ETag": manifest.etag, "Cache-Control": "no-cache"}
+        if manifest.etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return Response(manifest.json_bytes, media_type="application/json", headers=headers)
+
+    async def metrics_endpoint(request: Request) -> Response:
+        return Response(exporter(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        tasks = []
+        if settings.metrics_file:
+            tasks.append(
+                asyncio.create_task(
+                    dump_metrics_periodically(
+                        _worker_metrics_path(settings), exporter, settings.metrics_interval
+                    )
+                )
+            )
+        if settings.watch:
+            tasks.append(start_watcher(server, catalogs, settings.watch_interval))
+        unsaved = unsaved_schedule_reason(render_cache, executor, result_cache)
+        if schedule and unsaved:
+            logger.warning("Not starting the scheduler: %s", unsaved)
+        elif schedule:
+            tasks.append(
+                start_scheduler(
+                    server,
+                    schedule,
+                    settings.schedule_concurrency,
+                    settings.schedule_jitter,
+                    settings.schedule_catch_up,
+                    schedule_ledger(executor, result_cache),
+                )
+            )
+        try:
+            async with session_manager.run():
+                yield
+        finally:
+            for task in tasks:
+                task.cancel()
+            context_store.close()
+            if executor is not None:
+                await executor.aclose()
+            if result_cache is not None:
+                result_cache.close()
+
+    return Starlette(
+        routes=[
+            Route(settings.path, endpoint=_MCPEndpoint(session_manager)),
+            Route("/healthz", endpoint=healthz, methods=["GET"]),
+            Route("/tools", endpoint=tools, methods=["GET"]),
+            Route("/metrics", endpoint=metrics_endpoint, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def _worker_metrics_path(settings: HttpSettings) -> Path:
+    path = Path(settings.metrics_file)
+    if settings.workers > 1:
+        # Workers must not overwrite each other's dumps.
+        path = path.with_name(f"{path.stem}.{os.getpid()}{path.suffix}")
+    return path
+
+
+def run_http(settings: HttpSettings) -> None:
+    """Serve the HTTP transport with uvicorn, blocking until shutdown."""
+    import uvicorn
+
+    # Workers re-import the app by name, so hand them the settings via the environment.
+    os.environ.update(settings.to_env())
+    uvicorn.run(
+        "pmkit_mcp.http_app:create_app",
+        factory=True,
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers,
+        limit_concurrency=settings.max_concurrency or None,
+        timeout_keep_alive=settings.keep_alive,
+        log_level="info",
+    )
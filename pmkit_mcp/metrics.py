@@ -0,0 +1,292 @@
+"""Per-tool latency and payload metrics.
+
+:class:`ServerMetrics` records, for every tool (and for ``tools/list``):
+
+- a latency histogram,
+- a histogram of argument sizes in bytes,
+- call and error counters,
+- an in-flight gauge.
+
+Recording is a handful of integer updates and one :func:`bisect.bisect_left`
+over a short fixed bucket list, cheap enough to leave on in production.
+Handlers record on the event loop thread. Exporters may read from another
+thread; a snapshot can then be a call or two out of date, but it never
+blocks the handlers.
+
+The metrics are exposed three ways:
+
+- as JSON through the ``pmkit_stats`` tool (:meth:`ServerMetrics.snapshot`);
+- as Prometheus text (:func:`render_prometheus`), which can be written to a
+  file periodically (:func:`write_metrics_file`), for example for the
+  node_exporter textfile collector;
+- on a local HTTP endpoint (:func:`serve_metrics`, or ``/metrics`` on the HTTP
+  transport).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Mapping
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from pmkit_mcp.responses import dumps
+
+# Upper bounds of the histogram buckets; an implicit +Inf bucket follows.
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = tuple(float(256 << (2 * i)) for i in range(11))  # 256 B … 256 MiB
+
+LIST_TOOLS = "tools/list"
+UNKNOWN_TOOL = "_unknown"
+
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus style.
+
+    Args:
+        bounds: Sorted upper bounds of the buckets.
+    """
+
+    __slots__ = ("bounds", "counts", "total", "count", "max")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile by interpolating within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+        return self.max
+
+    def summary(self, scale: float = 1.0) -> dict[str, float]:
+        """Count, mean, p50/p95/p99 and max, multiplied by ``scale``."""
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean": round(mean * scale, 3),
+            "p50": round(self.quantile(0.50) * scale, 3),
+            "p95": round(self.quantile(0.95) * scale, 3),
+            "p99": round(self.quantile(0.99) * scale, 3),
+            "max": round(self.max * scale, 3),
+        }
+
+
+class ToolMetrics:
+    """Counters and histograms for one tool."""
+
+    __slots__ = ("calls", "errors", "in_flight", "latency", "argument_bytes")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.argument_bytes = Histogram(SIZE_BUCKETS)
+
+
+def argument_bytes(arguments: Mapping[str, Any]) -> int:
+    """Size of the call arguments in UTF-8 bytes.
+
+    ASCII strings, the common case, are measured without encoding. Non-string
+    values such as batch items are serialized to count them.
+    """
+    size = 0
+    for key, value in arguments.items():
+        size += len(key)
+        if isinstance(value, str):
+            size += len(value) if value.isascii() else len(value.encode("utf-8", "surrogatepass"))
+        else:
+            size += len(dumps(value).encode("utf-8", "surrogatepass"))
+    return size
+
+
+class ServerMetrics:
+    """Per-tool metrics for one server instance.
+
+    Args:
+        known_tools: Callable returning whether a tool name is registered.
+            Calls to unregistered names are recorded under ``_unknown`` so
+            arbitrary client input cannot grow the label set without bound.
+    """
+
+    def __init__(self, known_tools: Callable[[str], bool] | None = None) -> None:
+        self._tools: dict[str, ToolMetrics] = {}
+        self._known_tools = known_tools
+        self.started = time.time()
+
+    def tool(self, name: str) -> ToolMetrics:
+        """Return the metrics for ``name``, creating them on first use."""
+        metrics = self._tools.get(name)
+        if metrics is None:
+            if name != LIST_TOOLS and self._known_tools and not self._known_tools(name):
+                name = UNKNOWN_TOOL
+            metrics = self._tools.setdefault(name, ToolMetrics())
+        return metrics
+
+    def items(self) -> list[tuple[str, ToolMetrics]]:
+        return sorted(self._tools.items())
+
+    def snapshot(self, render_cache_stats: dict[str, int] | None = None) -> dict[str, Any]:
+        """JSON-serializable view of all metrics, with latencies in milliseconds."""
+        tools = {
+            name: {
+                "calls": m.calls,
+                "errors": m.errors,
+                "in_flight": m.in_flight,
+                "latency_ms": m.latency.summary(scale=1e3),
+                "argument_bytes": m.argument_bytes.summary(),
+            }
+            for name, m in self.items()
+        }
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "tools": tools,
+            "render_cache": render_cache_stats,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Prometheus exposition
+# ---------------------------------------------------------------------------
+
+
+def _format_bound(bound: float) -> str:
+    return repr(bound) if bound != int(bound) else f"{bound:.1f}"
+
+
+def _histogram_lines(name: str, tool: str, histogram: Histogram) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{tool="{tool}",le="{_format_bound(bound)}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{tool="{tool}",le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{tool="{tool}"}} {histogram.total}')
+    lines.append(f'{name}_count{{tool="{tool}"}} {histogram.count}')
+    return lines
+
+
+def render_prometheus(
+    metrics: ServerMetrics, render_cache_stats: dict[str, int] | None = None
+) -> str:
+    """Render metrics in the Prometheus text exposition format (version 0.0.4)."""
+    tools = metrics.items()
+    lines = [
+        "# HELP pmkit_tool_calls_total Tool calls handled.",
+        "# TYPE pmkit_tool_calls_total counter",
+        *(f'pmkit_tool_calls_total{{tool="{n}"}} {m.calls}' for n, m in tools),
+        "# HELP pmkit_tool_errors_total Tool calls that raised or returned an error result.",
+        "# TYPE pmkit_tool_errors_total counter",
+        *(f'pmkit_tool_errors_total{{tool="{n}"}} {m.errors}' for n, m in tools),
+        "# HELP pmkit_tool_in_flight Tool calls currently being handled.",
+        "# TYPE pmkit_tool_in_flight gauge",
+        *(f'pmkit_tool_in_flight{{tool="{n}"}} {m.in_flight}' for n, m in tools),
+        "# HELP pmkit_tool_latency_seconds Tool call latency.",
+        "# TYPE pmkit_tool_latency_seconds histogram",
+    ]
+    for name, m in tools:
+        lines += _histogram_lines("pmkit_tool_latency_seconds", name, m.latency)
+    lines += [
+        "# HELP pmkit_tool_argument_bytes Size of tool call arguments.",
+        "# TYPE pmkit_tool_argument_bytes histogram",
+    ]
+    for name, m in tools:
+        lines += _histogram_lines("pmkit_tool_argument_bytes", name, m.argument_bytes)
+    if render_cache_stats is not None:
+        for key, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter")):
+            lines += [
+                f"# TYPE pmkit_render_cache_{key}_total {kind}",
+                f"pmkit_render_cache_{key}_total {render_cache_stats[key]}",
+            ]
+        for key in ("entries", "bytes", "max_bytes"):
+            lines += [
+                f"# TYPE pmkit_render_cache_{key} gauge",
+                f"pmkit_render_cache_{key} {render_cache_stats[key]}",
+            ]
+    lines += [
+        "# TYPE pmkit_process_start_time_seconds gauge",
+        f"pmkit_process_start_time_seconds {metrics.started}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path: str | Path, text: str) -> None:
+    """Atomically replace ``path`` with ``text`` so scrapers never see a partial file."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+async def dump_metrics_periodically(
+    path: str | Path, render: Callable[[], str], interval: float = 15.0
+) -> None:
+    """Rewrite ``path`` with ``render()`` every ``interval`` seconds until cancelled."""
+    try:
+        while True:
+            write_metrics_file(path, render())
+            await asyncio.sleep(interval)
+    finally:
+        write_metrics_file(path, render())
+
+
+def serve_metrics(host: str, port: int, render: Callable[[], str]) -> ThreadingHTTPServer:
+    """Serve ``GET /metrics`` from a daemon thread and return the running server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=httpd.serve_forever, name="pmkit-metrics", daemon=True).start()
+    return httpd
@@ -0,0 +1,358 @@
+"""Relevant-passage selection for long source documents.
+
+Workflows such as ``one_pager`` and ``competitor_research`` take whole
+documents as input. Forwarding them verbatim fills the prompt with pages
+that have nothing to do with the request. A field with a
+``passage_budget`` is instead cut into passages, indexed, and reduced to
+the passages that score best with Okapi BM25 against the values of the
+field's ``query_fields`` (for example ``purpose`` or a feature list).
+
+Passages are paragraphs, with short ones merged and long ones split on
+line or sentence ends, of about :data:`PASSAGE_TOKENS` estimated tokens.
+Selected passages are kept in document order, with a marker wherever
+passages were left out.
+
+Indexes can be kept in a :class:`PassageIndexCache`, an LRU keyed by a
+hash of the document and bounded by the indexes' approximate size, so
+rendering the same document again (another workflow, a retry, a
+different query) skips chunking and indexing.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import math
+import re
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+from pmkit_mcp.text import STOP_WORDS
+from pmkit_mcp.tokens import estimate_tokens
+
+# Target and upper size of a passage, in estimated tokens.
+PASSAGE_TOKENS = 200
+MAX_PASSAGE_TOKENS = 400
+# Longest queries are cut to their most selective terms.
+MAX_QUERY_TERMS = 64
+BM25_K1 = 1.2
+BM25_B = 0.75
+DEFAULT_PASSAGE_INDEX_MB = 64
+# Approximate memory per posting (two array items, with growth slack) and per term.
+_POSTING_BYTES = 10
+_TERM_BYTES = 300
+
+OMISSION_MARKER = "[... {count:,} less relevant passages omitted ...]"
+
+_WORD = re.compile(r"[^\W_]+(?:['’][^\W_]+)*")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_SUFFIXES = ("ing", "ies", "es", "ed", "s")
+
+
+def _stem(word: str) -> str:
+    # Light suffix stripping, so "filters" matches "filter" and "searching" "search".
+    word = word.removesuffix("'s")
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def terms(text: str) -> list[str]:
+    """Index terms of ``text``: lowercased, stop words dropped, lightly stemmed."""
+    words = (w.replace("’", "'") for w in _WORD.findall(text.lower()))
+    return [_stem(w) for w in words if w not in STOP_WORDS and len(w) > 1]
+
+
+# ---------------------------------------------------------------------------
+# Chunking
+# ---------------------------------------------------------------------------
+
+
+def _split_long(paragraph: str) -> Iterable[str]:
+    """Split a paragraph above :data:`MAX_PASSAGE_TOKENS` on line, then sentence ends."""
+    if estimate_tokens(paragraph) <= MAX_PASSAGE_TOKENS:
+        yield paragraph
+        return
+    pieces = paragraph.splitlines() if "\n" in paragraph else _SENTENCE_END.split(paragraph)
+    if len(pieces) == 1:
+        # One enormous sentence: cut into fixed-size pieces.
+        step = MAX_PASSAGE_TOKENS * 4
+        for start in range(0, len(paragraph), step):
+            yield paragraph[start : start + step]
+        return
+    sep = "\n" if "\n" in paragraph else " "
+    chunk: list[str] = []
+    size = 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if chunk and size + tokens > PASSAGE_TOKENS:
+            yield from _split_long(sep.join(chunk))
+            chunk, size = [], 0
+        chunk.append(piece)
+        size += tokens
+    if chunk:
+        yield from _split_long(sep.join(chunk))
+
+
+def chunk_passages(text: str) -> list[str]:
+    """Cut ``text`` into passages of about :data:`PASSAGE_TOKENS` tokens."""
+    passages: list[str] = []
+    pending: list[str] = []
+    size = 0
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        for piece in _split_long(paragraph):
+            tokens = estimate_tokens(piece)
+            if pending and size + tokens > PASSAGE_TOKENS:
+                passages.append("\n\n".join(pending))
+                pending, size = [], 0
+            pending.append(piece)
+            size += tokens
+    if pending:
+        passages.append("\n\n".join(pending))
+    return passages
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+class PassageIndex:
+    """BM25 inverted index over the passages of one document."""
+
+    def __init__(self, text: str) -> None:
+        self.passages = chunk_passages(text)
+        self.tokens = [estimate_tokens(p) for p in self.passages]
+        # term -> (passage indexes, term frequencies), as compact arrays
+        self.postings: dict[str, tuple[array[int], array[int]]] = {}
+        lengths = []
+        for i, passage in enumerate(self.passages):
+            counts = Counter(terms(passage))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                posting = self.postings.get(term)
+                if posting is None:
+                    posting = self.postings[term] = (array("I"), array("I"))
+                posting[0].append(i)
+                posting[1].append(tf)
+        self.lengths = lengths
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        postings = sum(len(docs) for docs, _ in self.postings.values())
+        self.size = (
+            sum(len(p) for p in self.passages)
+            + _POSTING_BYTES * postings
+            + _TERM_BYTES * len(self.postings)
+        )
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings[term][0]) if term in self.postings else 0
+        n = len(self.passages)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def query_terms(self, query: str) -> list[str]:
+        """Distinct terms of ``query`` present in the index, most selective first."""
+        counts = Counter(t for t in terms(query) if t in self.postings)
+        ranked = sorted(counts, key=lambda t: -counts[t] * self.idf(t))
+        return ranked[:MAX_QUERY_TERMS]
+
+    def scores(self, query: str) -> dict[int, float]:
+        """BM25 score of every passage matching at least one query term."""
+        scores: dict[int, float] = {}
+        avg = self.avg_length or 1.0
+        for term in self.query_terms(query):
+            idf = self.idf(term)
+            docs, tfs = self.postings[term]
+            for i, tf in zip(docs, tfs):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[i] / avg)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+
+class PassageIndexCache:
+    """Size-bounded LRU of :class:`PassageIndex` objects keyed by a hash of the document.
+
+    Args:
+        max_bytes: Upper bound on the summed approximate size of cached
+            indexes. Indexes larger than this on their own are not cached.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, PassageIndex] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text: str) -> tuple[PassageIndex, bool]:
+        """The index of ``text``, and whether it came from the cache."""
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+        with self._lock:
+            index = self._entries.get(key)
+            if index is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return index, True
+            self.misses += 1
+        index = PassageIndex(text)
+        if index.size > self.max_bytes:
+            return index, False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = index
+            self._bytes += index.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+        return index, False
+
+    def stats(self) -> dict[str, int]:
+        """Counters for monitoring: hits, misses, evictions, entries and bytes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def make_passage_index_cache(megabytes: float) -> PassageIndexCache | None:
+    """Build a cache of ``megabytes`` MB, or ``None`` when caching is disabled (``<= 0``)."""
+    return PassageIndexCache(int(megabytes * 1024 * 1024)) if megabytes > 0 else None
+
+
+# ---------------------------------------------------------------------------
+# Selection
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class PassageSelection:
+    """How one field was reduced to its most relevant passages."""
+
+    field: str
+    query_fields: tuple[str, ...]
+    passages: int
+    kept_passages: int
+    original_tokens: int
+    kept_tokens: int
+    cached: bool
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "field": self.field,
+            "query_fields": list(self.query_fields),
+            "passages": self.passages,
+            "kept_passages": self.kept_passages,
+            "original_tokens": self.original_tokens,
+            "kept_tokens": self.kept_tokens,
+            "cached_index": self.cached,
+        }
+
+
+def _join(index: PassageIndex, chosen: list[int]) -> str:
+    parts: list[str] = []
+    previous = -1
+    for i in chosen:
+        if i - previous > 1:
+            parts.append(OMISSION_MARKER.format(count=i - previous - 1))
+        parts.append(index.passages[i])
+        previous = i
+    if len(index.passages) - 1 > previous:
+        parts.append(OMISSION_MARKER.format(count=len(index.passages) - 1 - previous))
+    return "\n\n".join(parts)
+
+
+def select_passages(index: PassageIndex, query: str, budget: int) -> list[int] | None:
+    """Indexes of the best passages for ``query`` that fit ``budget`` tokens, in order.
+
+    The budget covers the joined text, omission markers and separators included.
+
+    Returns:
+        ``None`` when no passage matches the query.
+    """
+    scores = index.scores(query)
+    if not scores:
+        return None
+    n = len(index.passages)
+    # Upper bound of one marker plus its separator.
+    marker = estimate_tokens(OMISSION_MARKER.format(count=n)) + 1
+    ranked = sorted(scores, key=lambda i: (-scores[i], i))
+    chosen: list[int] = []
+    used = marker  # the whole document is one gap to begin with
+    for i in ranked:
+        at = bisect.bisect(chosen, i)
+        before = chosen[at - 1] if at else -1
+        after = chosen[at] if at < len(chosen) else n
+        gaps = (i - before > 1) + (after - i > 1) - (after - before > 1)
+        cost = index.tokens[i] + 1 + gaps * marker
+        if used + cost <= budget:
+            chosen.insert(at, i)
+            used += cost
+    # Token estimates of the pieces need not add up to that of the joined
+    # text (ASCII passages in a non-ASCII document); drop the weakest until it fits.
+    rank = {i: r for r, i in enumerate(ranked)}
+    while chosen and estimate_tokens(_join(index, chosen)) > budget:
+        chosen.remove(max(chosen, key=rank.__getitem__))
+    return chosen
+
+
+def select_context(
+    fields: Iterable[tuple[str, int, tuple[str, ...]]],
+    context: Mapping[str, str],
+    cache: PassageIndexCache | None = None,
+) -> tuple[dict[str, str], tuple[PassageSelection, ...]]:
+    """Reduce each ``(field, budget, query_fields)`` over its budget to relevant passages.
+
+    Fields within their budget, without a query, or without any passage
+    matching the query are left as they are. Indexes are looked up in and
+    added to ``cache``, if given.
+
+    Returns:
+        The new context, and one report per reduced field.
+    """
+    result = dict(context)
+    reports: list[PassageSelection] = []
+    for name, budget, query_fields in fields:
+        value = context.get(name)
+        if budget <= 0 or not isinstance(value, str):
+            continue
+        original_tokens = estimate_tokens(value)
+        if original_tokens <= budget:
+            continue
+        query = "\n".join(context[q] for q in query_fields if isinstance(context.get(q), str))
+        if not query.strip():
+            continue
+        index, cached = cache.get(value) if cache is not None else (PassageIndex(value), False)
+        chosen = select_passages(index, query, budget)
+        if not chosen:
+            continue
+        result[name] = _join(index, chosen)
+        reports.append(
+            PassageSelection(
+                field=name,
+                query_fields=query_fields,
+                passages=len(index.passages),
+                kept_passages=len(chosen),
+                original_tokens=original_tokens,
+                kept_tokens=estimate_tokens(result[name]),
+                cached=cached,
+            )
+        )
+    return result, tuple(reports)
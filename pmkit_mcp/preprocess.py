@@ -0,0 +1,352 @@
+"""Normalization of pasted context fields before rendering.
+
+Fields such as ``slack_messages`` or ``support_tickets`` usually arrive as
+raw pastes: bot notices, quoted reply chains, signatures, timestamps, runs
+of blank lines and the same message repeated. Forwarding all of it verbatim
+inflates token counts and model latency without adding information.
+
+Each :class:`~pmkit_mcp.workflows.registry.FieldSpec` names the stages to
+apply to its value in ``preprocess``. Stages are generators over lines that
+are chained, so a value is split once, flows through every stage in a single
+pass, and is joined once. Cost is linear in the size of the value.
+
+Stages:
+
+- ``noise``: drop lines matching a noise pattern, such as channel join
+  notices and other bot chatter. The patterns are tried as one alternation,
+  and only on lines containing one of :data:`DEFAULT_NOISE_HINTS`. Extend
+  the patterns with :func:`add_noise_patterns` (``--noise-patterns FILE``).
+- ``quotes``: drop ``On ... wrote:`` attributions with the ``> ...``
+  block quoted under them, and forwarded-message header blocks. Other
+  ``>`` lines, such as quoted customer feedback, are kept.
+- ``signatures``: drop ``-- `` signature blocks (up to the next blank line)
+  and mobile mail footers.
+- ``timestamps``: strip leading timestamps (``[10:42 AM]``,
+  ``2026-01-15 10:42:03``, ``00:01:23``).
+- ``whitespace``: trim line ends, collapse runs of spaces and blank lines.
+- ``dedupe``: drop lines equal to an earlier line, ignoring case,
+  punctuation, spacing and a leading timestamp. Short lines (such as
+  ``Status: Done`` under each ticket) are kept, since repeating them is
+  meaningful and cheap.
+- ``cluster``: replace a large field by locally computed themes with
+  counts and representative lines (see :mod:`pmkit_mcp.clustering`).
+  A pass-through unless enabled with ``--cluster-min-lines``.
+- ``sprint_metrics``: replace a story list (lines, CSV or JSON) by computed
+  velocity, completion, carry-over and per-assignee tables and a compact
+  story list (see :mod:`pmkit_mcp.sprint_metrics`).
+- ``release_issues``: replace an issue list by one deduplicated line per
+  issue, sub-tasks folded into parents, grouped into features,
+  improvements and fixes (see :mod:`pmkit_mcp.release_issues`).
+
+Further stages can be added with :func:`register_stage`.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+from pmkit_mcp.clustering import cluster_stage
+from pmkit_mcp.release_issues import release_issues_stage
+from pmkit_mcp.sprint_metrics import sprint_metrics_stage
+
+Stage = Callable[[Iterable[str]], Iterator[str]]
+
+STAGES: dict[str, Stage] = {}
+
+
+def register_stage(name: str, stage: Stage) -> None:
+    """Make ``stage`` available to ``FieldSpec.preprocess`` under ``name``."""
+    STAGES[name] = stage
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+_TIMESTAMP = (
+    r"\[?(?:\d{4}-\d{2}-\d{2}[T ])?\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?"
+    r"(?:\s?[AaPp][Mm])?(?:Z|[+-]\d{2}:?\d{2})?\]?"
+)
+_LEADING_TIMESTAMP = re.compile(rf"^\s*{_TIMESTAMP}(?:\s*[-|:]\s*|\s+|$)")
+
+DEFAULT_NOISE_PATTERNS = (
+    r"\bhas (?:joined|left) the channel\b",
+    r"\b(?:set|changed|cleared) the channel (?:topic|purpose|description)\b",
+    r"\brenamed the channel\b",
+    r"\badded an integration to this channel\b",
+    r"^\s*(?:\(edited\)|This message was deleted\.?)\s*$",
+    r"^\s*\d+\s+(?:replies|reply)\b.*$",
+    r"^\s*(?:View thread|Show more|See more)\s*$",
+)
+# Every default pattern contains one of these (lowercased), so text without
+# any of them skips the regular expressions.
+DEFAULT_NOISE_HINTS = (
+    "channel",
+    "edited",
+    "deleted",
+    "repl",
+    "view thread",
+    "show more",
+    "see more",
+)
+# Lines checked against the hints at once.
+_NOISE_CHUNK_LINES = 256
+
+
+def _combine(patterns: Sequence[str]) -> list[re.Pattern[str]]:
+    """One case-insensitive alternation of ``patterns``, or one regex each if they can't merge."""
+    if not patterns:
+        return []
+    try:
+        return [re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)]
+    except re.error:
+        # Patterns with inline global flags cannot be merged.
+        return [re.compile(p, re.IGNORECASE) for p in patterns]
+
+
+_default_noise = _combine(DEFAULT_NOISE_PATTERNS)[0]
+_extra_noise_patterns: list[str] = []
+_extra_noise: list[re.Pattern[str]] = []
+
+
+def add_noise_patterns(patterns: Iterable[str]) -> int:
+    """Also drop lines matching ``patterns`` (case-insensitive regular expressions).
+
+    Returns:
+        The number of patterns added.
+
+    Raises:
+        re.error: If a pattern is not a valid regular expression.
+    """
+    global _extra_noise
+    added = [p for p in patterns if p.strip()]
+    for pattern in added:
+        re.compile(pattern, re.IGNORECASE)
+    _extra_noise_patterns.extend(added)
+    _extra_noise = _combine(_extra_noise_patterns)
+    return len(added)
+
+
+def load_noise_patterns(path: str | Path) -> int:
+    """Add the patterns in ``path``, one per line; ``#`` starts a comment line."""
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    return add_noise_patterns(line for line in lines if not line.lstrip().startswith("#"))
+
+
+def _has_noise_hint(text: str) -> bool:
+    lowered = text.lower()
+    return any(hint in lowered for hint in DEFAULT_NOISE_HINTS)
+
+
+def drop_noise(lines: Iterable[str]) -> Iterator[str]:
+    lines = iter(lines)
+    extra = _extra_noise
+    while chunk := list(islice(lines, _NOISE_CHUNK_LINES)):
+        hinted = _has_noise_hint("\n".join(chunk))
+        if not hinted and not extra:
+            yield from chunk
+            continue
+        for line in chunk:
+            if hinted and _has_noise_hint(line) and _default_noise.search(line):
+                continue
+            if not any(p.search(line) for p in extra):
+                yield line
+
+
+_ATTRIBUTION = re.compile(r"^\s*On .{4,200}\bwrote:\s*$")
+_FORWARD_MARKER = re.compile(
+    r"^\s*(?:-{3,}\s*(?:Original|Forwarded) Message\s*-{3,}|_{10,})\s*$", re.IGNORECASE
+)
+_HEADER = re.compile(r"^\s*(?:From|Sent|Date|To|Cc|Subject):", re.IGNORECASE)
+
+
+def strip_quotes(lines: Iterable[str]) -> Iterator[str]:
+    in_headers = False
+    in_reply = False  # after an attribution, until its quoted block ends
+    quoting = False
+    for line in lines:
+        if in_headers:
+            if _HEADER.match(line):
+                continue
+            in_headers = False
+        if in_reply:
+            # Only the block quoted under an attribution is a reply chain; a
+            # standalone "> ..." line is usually a customer quote worth keeping.
+            stripped = line.lstrip()
+            if stripped.startswith(">"):
+                quoting = True
+                continue
+            # Blank lines may separate the attribution from its quote, not follow it.
+            in_reply = not stripped and not quoting
+        if ("---" in line or "__________" in line) and _FORWARD_MARKER.match(line):
+            in_headers = True
+            continue
+        if "wrote:" in line and _ATTRIBUTION.match(line):
+            in_reply, quoting = True, False
+            continue
+        yield line
+
+
+_SIGNATURE_DELIMITER = re.compile(r"^--\s?$")
+_MOBILE_FOOTER = re.compile(
+    r"^\s*(?:Sent from my \w+.*|Get Outlook for \w+.*|Sent via \w+.*)$", re.IGNORECASE
+)
+
+
+def strip_signatures(lines: Iterable[str]) -> Iterator[str]:
+    in_signature = False
+    for line in lines:
+        if in_signature:
+            if line.strip():
+                continue
+            in_signature = False
+        if line.startswith("--") and _SIGNATURE_DELIMITER.match(line):
+            in_signature = True
+            continue
+        if line.lstrip()[:4].lower() not in ("sent", "get ") or not _MOBILE_FOOTER.match(line):
+            yield line
+
+
+def _strip_timestamp(line: str) -> str:
+    first = line[:1]
+    # Cheap check first: a timestamp starts with a digit or "[" after optional spaces.
+    if first.isdigit() or first == "[" or first.isspace():
+        match = _LEADING_TIMESTAMP.match(line)
+        if match:
+            return line[match.end() :]
+    return line
+
+
+def strip_timestamps(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        yield _strip_timestamp(line)
+
+
+_INNER_SPACE = re.compile(r"(?<=\S)[ \t]{2,}")
+
+
+def collapse_whitespace(lines: Iterable[str]) -> Iterator[str]:
+    pending_blank = False
+    started = False
+    for line in lines:
+        line = line.rstrip()
+        if "\u00a0" in line:
+            line = line.replace("\u00a0", " ")
+        if "  " in line or "\t" in line:
+            line = _INNER_SPACE.sub(" ", line)
+        if not line:
+            pending_blank = started
+            continue
+        if pending_blank:
+            yield ""
+            pending_blank = False
+        started = True
+        yield line
+
+
+_NOT_WORD = re.compile(r"[\W_]+")
+# ASCII bytes that are not letters or digits, dropped from ASCII dedupe keys.
+_ASCII_NOT_WORD = bytes(c for c in range(128) if not chr(c).isalnum())
+# Letters and digits a line needs before dedupe considers it.
+MIN_DEDUPE_CHARS = 24
+
+
+def _dedupe_key(line: str) -> bytes | None:
+    line = _strip_timestamp(line)
+    if line.isascii():
+        # bytes.translate is an order of magnitude faster than the regex below.
+        key = line.encode("ascii").lower().translate(None, _ASCII_NOT_WORD)
+        return key if len(key) >= MIN_DEDUPE_CHARS else None
+    text = _NOT_WORD.sub("", line.casefold())
+    return text.encode("utf-8", "surrogatepass") if len(text) >= MIN_DEDUPE_CHARS else None
+
+
+def dedupe_lines(lines: Iterable[str]) -> Iterator[str]:
+    seen: set[bytes] = set()
+    for line in lines:
+        key = _dedupe_key(line)
+        if key is not None:
+            if key in seen:
+                continue
+            seen.add(key)
+        yield line
+
+
+register_stage("noise", drop_noise)
+register_stage("quotes", strip_quotes)
+register_stage("signatures", strip_signatures)
+register_stage("timestamps", strip_timestamps)
+register_stage("whitespace", collapse_whitespace)
+register_stage("dedupe", dedupe_lines)
+register_stage("cluster", cluster_stage)
+register_stage("sprint_metrics", sprint_metrics_stage)
+register_stage("release_issues", release_issues_stage)
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class FieldPreprocess:
+    """How one field was normalized before rendering."""
+
+    field: str
+    stages: tuple[str, ...]
+    original_bytes: int
+    kept_bytes: int
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "field": self.field,
+            "stages": list(self.stages),
+            "original_bytes": self.original_bytes,
+            "kept_bytes": self.kept_bytes,
+        }
+
+
+def _utf8_size(text: str) -> int:
+    return len(text.encode("utf-8", "surrogatepass"))
+
+
+def preprocess(text: str, stages: Sequence[str]) -> str:
+    """Run ``text`` through ``stages`` in order.
+
+    Raises:
+        ValueError: If a stage name is not registered.
+    """
+    lines: Iterable[str] = text.splitlines()
+    for name in stages:
+        try:
+            lines = STAGES[name](lines)
+        except KeyError:
+            raise ValueError(f"Unknown preprocess stage: {name!r}") from None
+    return "\n".join(lines)
+
+
+def preprocess_context(
+    fields: Iterable[tuple[str, Sequence[str]]], context: Mapping[str, str]
+) -> tuple[dict[str, str], tuple[FieldPreprocess, ...]]:
+    """Normalize each ``(field, stages)`` value present in ``context``.
+
+    Returns:
+        The new context, and one report per field whose value changed.
+    """
+    result = dict(context)
+    reports: list[FieldPreprocess] = []
+    for name, stages in fields:
+        value = context.get(name)
+        if not stages or not isinstance(value, str) or not value:
+            continue
+        cleaned = preprocess(value, stages)
+        if cleaned != value:
+            result[name] = cleaned
+            reports.append(
+                FieldPreprocess(name, tuple(stages), _utf8_size(value), _utf8_size(cleaned))
+            )
+    return result, tuple(reports)
@@ -0,0 +1,176 @@
+"""Per-client profiles that pre-fill recurring workflow fields.
+
+Most workflows require ``tenant_name``, and several need ``user_name`` or
+``product_name`` as well. Without help, every new conversation spends a
+round-trip on the missing-fields message just to learn them again.
+
+:class:`ProfileStore` keeps these values per client identity (see
+:func:`client_identity`): the ``clientInfo.name`` the MCP client sent at
+initialization over stdio, or ``user:<subject>`` for authenticated HTTP
+requests. Values are learned from the arguments of earlier calls, and the
+JSON file can also be edited by hand::
+
+    {"claude-ai": {"tenant_name": "Acme Corp", "user_name": "Sam"}}
+
+Profile values only fill fields the workflow has and the call left out;
+explicit arguments always win. Reads go through an in-memory cache, which
+is dropped when the file changes on disk (for example, when another worker
+process learned a new value).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from mcp.server.auth.middleware.auth_context import get_access_token
+from mcp.server.lowlevel.server import request_ctx
+
+from pmkit_mcp.context_store import REF_PREFIX
+from pmkit_mcp.workflows.registry import WorkflowSummary
+
+PROFILE_FIELDS = ("tenant_name", "user_name", "product_name")
+
+
+def client_identity() -> str | None:
+    """Identity of the client whose request is being handled.
+
+    Over stdio the process serves one user, so the client's name identifies
+    them. Over HTTP many users share one client name (every user of the
+    same desktop app), so only an authenticated user identifies a profile.
+
+    Returns:
+        ``user:<subject>`` for an authenticated request, the client's
+        ``clientInfo.name`` for an unauthenticated stdio session, or ``None``
+        when no profile applies: outside a request (scheduled runs,
+        embedding), unauthenticated HTTP, or a session that has not
+        identified itself.
+    """
+    ctx = request_ctx.get(None)
+    if ctx is None:
+        return None
+    token = get_access_token()
+    if token is not None:
+        return f"user:{getattr(token, 'subject', None) or token.client_id}"
+    if ctx.request is not None:
+        # HTTP without authentication: the client name would be shared across tenants.
+        return None
+    params = getattr(ctx.session, "client_params", None)
+    name: str | None = params.clientInfo.name if params is not None else None
+    return name or None
+
+
+class ProfileStore:
+    """JSON-file profiles by client identity, with a read-through memory cache.
+
+    Args:
+        path: Profile file; created on the first learned value.
+        fields: Fields that are remembered and filled in.
+    """
+
+    def __init__(self, path: str | Path, fields: tuple[str, ...] = PROFILE_FIELDS) -> None:
+        self.path = Path(path)
+        self.fields = fields
+        self._cache: dict[str, dict[str, str]] = {}
+        self._mtime: float | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fills = 0
+        self.writes = 0
+
+    def _file_mtime(self) -> float | None:
+        try:
+            return self.path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _read_file(self) -> dict[str, dict[str, str]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, identity: str) -> dict[str, str]:
+        """The profile of ``identity``; empty if it has none."""
+        with self._lock:
+            mtime = self._file_mtime()
+            if mtime != self._mtime:
+                self._cache.clear()
+                self._mtime = mtime
+            profile = self._cache.get(identity)
+            if profile is not None:
+                self.hits += 1
+                return profile
+            self.misses += 1
+            stored = self._read_file().get(identity) or {}
+            profile = {k: v for k, v in stored.items() if k in self.fields and isinstance(v, str)}
+            self._cache[identity] = profile
+            return profile
+
+    def learn(self, identity: str, arguments: Mapping[str, Any]) -> bool:
+        """Remember profile fields given explicitly in ``arguments``.
+
+        Empty values and ``ref:`` values are ignored. The file is only
+        rewritten when a value changes.
+
+        Returns:
+            True if the profile changed.
+        """
+        values = {
+            k: v.strip()
+            for k, v in arguments.items()
+            if k in self.fields
+            and isinstance(v, str)
+            and v.strip()
+            and not v.startswith(REF_PREFIX)
+        }
+        if not values or values.items() <= self.get(identity).items():
+            return False
+        with self._lock:
+            data = self._read_file()
+            profile = {**(data.get(identity) or {}), **values}
+            data[identity] = profile
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write a sibling file and swap it in, so readers never see a partial file.
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._cache[identity] = profile
+            self._mtime = self._file_mtime()
+            self.writes += 1
+        return True
+
+    def fill(
+        self, identity: str, workflow: WorkflowSummary, arguments: Mapping[str, Any]
+    ) -> dict[str, Any]:
+        """``arguments`` with profile values added for the workflow's missing fields."""
+        profile = self.get(identity)
+        if not profile:
+            return dict(arguments)
+        names = {f.name for f in (*workflow.required_fields, *workflow.optional_fields)}
+        filled = {k: v for k, v in profile.items() if k in names and not arguments.get(k)}
+        self.fills += len(filled)
+        return {**arguments, **filled}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "cached_identities": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fields_filled": self.fills,
+            "writes": self.writes,
+        }
+
+
+def make_profile_store(path: str | None) -> ProfileStore | None:
+    """Build a store from the ``--profiles`` value, or ``None`` when not set."""
+    return ProfileStore(path) if path else None
@@ -0,0 +1,281 @@
+"""Parsing and grouping of completed issues for release notes.
+
+A large release pasted into ``release_notes`` can list thousands of Jira
+keys, often with the same issue repeated across boards and every sub-task
+listed under its story. The ``release_issues`` preprocess stage turns the
+paste into a compact list grouped the way the notes are written:
+
+1. Lines are parsed as they stream in. Each issue key is kept once; later
+   mentions only fill in a missing type or title.
+2. Sub-tasks are folded into their parent, which shows the sub-task count.
+   A line is a sub-task if its type says so, it names its parent
+   (``sub-task of ACME-1``, ``parent: ACME-1``), or it is indented under a
+   keyed line. Sub-tasks whose parent is not listed stand on their own.
+3. Issues are grouped into New Features, Improvements and Bug Fixes by
+   issue type, or by the title's first word (``Add``, ``Improve``,
+   ``Fix``, ...) when there is no type.
+
+Issues that fit no group, and lines without an issue key, are passed on as
+raw text. Issues marked breaking (``[Breaking]``, ``breaking change``) are
+flagged. JSON and CSV exports are read with
+:func:`pmkit_mcp.sprint_metrics.parse_export`.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from pmkit_mcp.sprint_metrics import ISSUE_KEY, parse_export
+
+GROUPS = ("New Features", "Improvements", "Bug Fixes")
+TYPE_GROUPS = {
+    "story": "New Features",
+    "feature": "New Features",
+    "new feature": "New Features",
+    "epic": "New Features",
+    "improvement": "Improvements",
+    "enhancement": "Improvements",
+    "task": "Improvements",
+    "chore": "Improvements",
+    "tech debt": "Improvements",
+    "refactor": "Improvements",
+    "performance": "Improvements",
+    "bug": "Bug Fixes",
+    "defect": "Bug Fixes",
+    "fix": "Bug Fixes",
+    "bugfix": "Bug Fixes",
+    "hotfix": "Bug Fixes",
+    "incident": "Bug Fixes",
+}
+SUBTASK_TYPES = frozenset({"sub-task", "subtask", "sub task"})
+# Group by the first word of the title when the issue has no type.
+TITLE_GROUPS = {
+    **dict.fromkeys(
+        ("add", "adds", "added", "new", "introduce", "support", "launch"), "New Features"
+    ),
+    **dict.fromkeys(
+        ("improve", "improved", "faster", "optimize", "reduce", "update", "upgrade", "refine"),
+        "Improvements",
+    ),
+    **dict.fromkeys(
+        ("bug", "fix", "fixed", "fixes", "resolve", "resolved", "correct", "prevent"), "Bug Fixes"
+    ),
+}
+
+_TYPE_NAMES = "|".join(
+    re.escape(t) for t in sorted((*TYPE_GROUPS, *SUBTASK_TYPES), key=len, reverse=True)
+)
+_TYPE_TAG = re.compile(
+    rf"\[({_TYPE_NAMES})\]|\(({_TYPE_NAMES})\)|^({_TYPE_NAMES})\s*:", re.IGNORECASE
+)
+_PARENT = re.compile(rf"\(?\b(?:sub-?task of|parent:?)\s*({ISSUE_KEY.pattern})\)?", re.IGNORECASE)
+_BREAKING = re.compile(r"\[breaking\]|\bbreaking change\b", re.IGNORECASE)
+_BULLET = re.compile(r"^(\s*)(?:[-*•]|\d+[.)])?\s*")
+_FIRST_WORD = re.compile(r"[A-Za-z]+")
+
+
+@dataclass
+class Issue:
+    """One issue of the release."""
+
+    key: str
+    title: str = ""
+    issue_type: str = ""
+    breaking: bool = False
+    subtasks: list[str] = field(default_factory=list)
+    # The line the issue was first seen on, shown when it fits no group.
+    source: str = ""
+
+    @property
+    def group(self) -> str | None:
+        """The release-notes group, or ``None`` if the issue fits none."""
+        group = TYPE_GROUPS.get(self.issue_type.casefold())
+        if group is None and (word := _FIRST_WORD.match(self.title)):
+            group = TITLE_GROUPS.get(word.group(0).casefold())
+        return group
+
+
+@dataclass(frozen=True)
+class ParsedLine:
+    """An issue mention on one line of the paste."""
+
+    key: str
+    title: str
+    issue_type: str
+    parent: str
+    indent: int
+    breaking: bool
+
+
+def parse_issue_line(line: str) -> ParsedLine | None:
+    """Parse one line, or ``None`` if it has no issue key."""
+    key_match = ISSUE_KEY.search(line)
+    if key_match is None:
+        return None
+    bullet = _BULLET.match(line)
+    indent = len(bullet.group(1).expandtabs(4)) if bullet else 0
+    text = line[bullet.end() :] if bullet else line.strip()
+
+    issue_type = ""
+    parent = ""
+    if match := _PARENT.search(text):
+        parent = match.group(1)
+        text = text[: match.start()] + text[match.end() :]
+    text = text.replace(key_match.group(0), " ", 1).strip(" :-–—|,")
+    if match := _TYPE_TAG.search(text):
+        issue_type = next(g for g in match.groups() if g)
+        text = _TYPE_TAG.sub(" ", text, count=1)
+    breaking = bool(_BREAKING.search(text))
+    text = re.sub(r"\[breaking\]", " ", text, flags=re.IGNORECASE)
+    title = re.sub(r"\s+", " ", text).strip(" :-–—|,")
+    return ParsedLine(key_match.group(0), title, issue_type, parent, indent, breaking)
+
+
+@dataclass
+class ReleaseIssues:
+    """Issues of a release, built line by line with :meth:`add_line`."""
+
+    issues: dict[str, Issue] = field(default_factory=dict)
+    raw: list[str] = field(default_factory=list)
+    lines: int = 0
+    duplicates: int = 0
+    folded: int = 0
+    _subtasks: dict[str, list[tuple[str, str, str]]] = field(default_factory=dict)
+    _last_top: tuple[str, int] | None = None
+
+    def add(
+        self,
+        key: str,
+        title: str,
+        issue_type: str = "",
+        parent: str = "",
+        breaking: bool = False,
+        source: str = "",
+    ) -> None:
+        """Record one mention of an issue."""
+        if issue_type.casefold() in SUBTASK_TYPES or (parent and not issue_type):
+            self._subtasks.setdefault(parent, []).append((key, title, source))
+            return
+        issue = self.issues.get(key)
+        if issue is None:
+            self.issues[key] = Issue(key, title, issue_type, breaking, source=source)
+            return
+        self.duplicates += 1
+        issue.title = issue.title or title
+        issue.issue_type = issue.issue_type or issue_type
+        issue.breaking = issue.breaking or breaking
+
+    def add_line(self, line: str) -> None:
+        """Parse and record one line of the paste."""
+        if not line.strip():
+            return
+        self.lines += 1
+        parsed = parse_issue_line(line)
+        if parsed is None:
+            self.raw.append(line.rstrip())
+            return
+        parent = parsed.parent
+        is_subtask = parsed.issue_type.casefold() in SUBTASK_TYPES
+        if not parent and self._last_top and parsed.indent > self._last_top[1]:
+            # Indented under a keyed line: a sub-task of that issue.
+            parent = self._last_top[0]
+            is_subtask = True
+        if not parent and not is_subtask:
+            self._last_top = (parsed.key, parsed.indent)
+        issue_type = parsed.issue_type or ("Sub-task" if is_subtask else "")
+        self.add(parsed.key, parsed.title, issue_type, parent, parsed.breaking, line.strip())
+
+    @property
+    def has_subtasks(self) -> bool:
+        return bool(self._subtasks)
+
+    def finish(self) -> None:
+        """Fold sub-tasks into listed parents; the others become issues of their own."""
+        seen: set[str] = set()
+        for parent, subtasks in self._subtasks.items():
+            owner = self.issues.get(parent)
+            for key, title, source in subtasks:
+                if key in seen or key in self.issues:
+                    self.duplicates += 1
+                    continue
+                seen.add(key)
+                if owner is not None:
+                    owner.subtasks.append(key)
+                    self.folded += 1
+                else:
+                    self.issues[key] = Issue(key, title, source=source)
+        self._subtasks.clear()
+
+    def grouped(self) -> dict[str, list[Issue]]:
+        groups: dict[str, list[Issue]] = {g: [] for g in GROUPS}
+        groups["Unclassified"] = []
+        for issue in self.issues.values():
+            groups[issue.group or "Unclassified"].append(issue)
+        return groups
+
+
+def _plural(count: int, noun: str) -> str:
+    return f"{count:,} {noun}{'' if count == 1 else 's'}"
+
+
+def _issue_row(issue: Issue, as_pasted: bool = False) -> str:
+    row = issue.source if as_pasted and issue.source else f"- {issue.key} {issue.title}".rstrip()
+    if issue.breaking and not as_pasted:
+        row += " [BREAKING]"
+    if issue.subtasks:
+        row += f" (+{_plural(len(issue.subtasks), 'sub-task')})"
+    return row
+
+
+def format_release(release: ReleaseIssues) -> Iterator[str]:
+    """Lines of the grouped list that replaces the paste."""
+    yield (
+        f"[Parsed locally: {_plural(release.lines, 'line')} -> "
+        f"{_plural(len(release.issues), 'issue')}; "
+        f"{_plural(release.duplicates, 'duplicate')} dropped, "
+        f"{_plural(release.folded, 'sub-task')} folded]"
+    )
+    groups = release.grouped()
+    for name in GROUPS:
+        if groups[name]:
+            yield ""
+            yield f"### {name} ({len(groups[name])})"
+            yield from (_issue_row(issue) for issue in groups[name])
+    unclassified = groups["Unclassified"]
+    if unclassified or release.raw:
+        yield ""
+        yield "### Unclassified (as pasted)"
+        yield from (_issue_row(issue, as_pasted=True) for issue in unclassified)
+        yield from release.raw
+
+
+def release_issues_stage(lines: Iterable[str]) -> Iterator[str]:
+    """Preprocess stage: replace a pasted issue list by a deduplicated, grouped list."""
+    release = ReleaseIssues()
+    lines = iter(lines)
+    head: list[str] = []
+    for line in lines:
+        head.append(line)
+        if line.strip():
+            break
+    first = head[-1].lstrip() if head else ""
+    if first[:1] in "[{" or first.count(",") + first.count("\t") >= 2:
+        # Possibly a JSON or CSV export, which needs the whole text at once.
+        head.extend(lines)
+        stories = parse_export("\n".join(head))
+        if stories is not None:
+            for story in stories:
+                release.lines += 1
+                release.add(story.key, story.summary, story.issue_type, story.parent)
+            head = []
+    for line in head:
+        release.add_line(line)
+    for line in lines:
+        release.add_line(line)
+    if not release.issues and not release.has_subtasks:
+        yield from release.raw
+        return
+    release.finish()
+    yield from format_release(release)
@@ -0,0 +1,131 @@
+"""Content-hash LRU cache for rendered workflow results.
+
+Hosts often re-invoke a workflow with identical arguments (retries, client
+reconnects). :class:`RenderCache` stores the encoded tool result under a
+hash of the workflow id, the registry version, the response mode and the
+canonicalized arguments, so a repeat call skips validation, rendering and
+serialization. The cache is bounded by the total size of the cached prompt
+text rather than by entry count, and evicts least recently used entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any
+
+from mcp.types import CallToolResult, TextContent
+
+CachedResult = list[TextContent] | CallToolResult
+
+
+def cache_key(
+    workflow_id: str,
+    registry_version: int,
+    arguments: Mapping[str, Any],
+    response_mode: str = "",
+) -> str:
+    """Hash a workflow invocation into a stable cache key.
+
+    Arguments are canonicalized (sorted keys, compact separators), so two
+    calls with the same values in a different order share one entry.
+    """
+    digest = hashlib.sha256()
+    header = f"{workflow_id}\0{registry_version}\0{response_mode}\0"
+    digest.update(header.encode())
+    canonical = json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    digest.update(canonical.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def result_size(result: CachedResult) -> int:
+    """Approximate in-memory size of a cached result, in characters of text."""
+    content = result.content if isinstance(result, CallToolResult) else result
+    size = sum(len(block.text) for block in content if isinstance(block, TextContent))
+    if isinstance(result, CallToolResult) and result.structuredContent:
+        size += len(json.dumps(result.structuredContent))
+    return size
+
+
+class RenderCache:
+    """Byte-bounded LRU cache of encoded workflow results.
+
+    Args:
+        max_bytes: Upper bound on the summed size of cached results. Results
+            larger than this on their own are never cached.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[CachedResult, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def current_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> CachedResult | None:
+        """Return the cached result for ``key`` and mark it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, result: CachedResult) -> bool:
+        """Store ``result`` under ``key``, evicting LRU entries to stay within budget.
+
+        Returns:
+            ``True`` if the result was cached, ``False`` if it is too large.
+        """
+        size = result_size(result)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Counters for monitoring: hits, misses, evictions, entries and bytes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def make_render_cache(megabytes: float) -> RenderCache | None:
+    """Build a cache of ``megabytes`` MB, or ``None`` when caching is disabled (``<= 0``)."""
+    return RenderCache(int(megabytes * 1024 * 1024)) if megabytes > 0 else None
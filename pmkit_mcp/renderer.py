@@ -7,9 +7,52 @@ ready to send to an LLM.
 
 from __future__ import annotations
 
-import re
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
 
-from pmkit_mcp.workflows.registry import WorkflowDefinition
+from pmkit_mcp.budget import FieldTrim, fit_to_budget
+from pmkit_mcp.context_store import ContextRefError, ContextStore, has_refs, resolve_refs
+from pmkit_mcp.passages import PassageIndexCache, PassageSelection, select_context
+from pmkit_mcp.preprocess import FieldPreprocess, preprocess_context
+from pmkit_mcp.workflows.registry import (
+    WORKFLOW_REGISTRY,
+    FieldSpec,
+    WorkflowDefinition,
+    WorkflowSummary,
+)
+
+# Upper bounds for render_batch, so one request cannot monopolize the server.
+MAX_BATCH_ITEMS = 500
+DEFAULT_BATCH_WORKERS = 8
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    """A rendered prompt pair plus a report of what was done to fit it.
+
+    Attributes:
+        system_prompt: The workflow's system prompt.
+        user_prompt: The user prompt with all placeholders substituted.
+        estimated_tokens: Estimated tokens of system + user prompt.
+        prompt_budget: The workflow's token budget.
+        trims: Fields shortened to fit the budget, with before/after sizes.
+        over_budget: True if the prompt still exceeds the budget because
+            required fields alone are too large.
+        preprocessed: Fields normalized before rendering, with byte counts
+            before and after.
+        passages: Long fields reduced to their most relevant passages.
+    """
+
+    system_prompt: str
+    user_prompt: str
+    estimated_tokens: int
+    prompt_budget: int
+    trims: tuple[FieldTrim, ...] = ()
+    over_budget: bool = False
+    preprocessed: tuple[FieldPreprocess, ...] = ()
+    passages: tuple[PassageSelection, ...] = ()
 
 
 def render_prompt(
@@ -24,22 +67,190 @@ def render_prompt(
 
     Returns:
         A (system_prompt, user_prompt) tuple with all ``{{placeholders}}`` replaced.
-        Missing optional fields are replaced with ``(not provided)``.
+        Missing optional fields are replaced with ``(not provided)``. Values are
+        inserted verbatim; placeholders appearing inside a value are not expanded.
+    """
+    return workflow.system_prompt, workflow.compiled_template.render(context)
+
+
+def render_workflow(
+    workflow: WorkflowDefinition,
+    context: dict[str, str],
+    passage_cache: PassageIndexCache | None = None,
+) -> RenderedPrompt:
+    """Render a workflow's prompts within its token budget.
+
+    Like :func:`render_prompt`, but pasted fields are first normalized by
+    their ``preprocess`` stages (see :mod:`pmkit_mcp.preprocess`), long
+    source documents are reduced to their relevant passages (see
+    :mod:`pmkit_mcp.passages`), then optional fields are trimmed according
+    to their truncation policies so the estimated prompt size fits
+    ``workflow.prompt_budget``. Required fields are never trimmed.
+
+    Args:
+        workflow: The workflow definition to render.
+        context: Mapping of field names to user-provided values.
+
+    Returns:
+        The rendered prompts together with the budget report.
+    """
+    all_fields = (*workflow.required_fields, *workflow.optional_fields)
+    context, preprocessed = preprocess_context(
+        ((f.name, f.preprocess) for f in all_fields), context
+    )
+    context, passages = select_context(
+        ((f.name, f.passage_budget, f.query_fields) for f in all_fields), context, passage_cache
+    )
+    fitted = fit_to_budget(workflow, context)
+    system_prompt, user_prompt = render_prompt(workflow, fitted.context)
+    return RenderedPrompt(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        estimated_tokens=fitted.estimated_tokens,
+        prompt_budget=fitted.budget,
+        trims=fitted.trims,
+        over_budget=fitted.over_budget,
+        preprocessed=preprocessed,
+        passages=passages,
+    )
+
+
+@dataclass(frozen=True)
+class BatchItemResult:
+    """Outcome of rendering one item of a batch.
+
+    Exactly one of ``rendered`` and ``error`` is set. ``workflow`` is the
+    definition the item was rendered against, when the id was known.
+    ``context_refs`` and ``context_bytes_saved`` count the ``ref:`` values
+    resolved from the context store.
+    """
+
+    index: int
+    workflow_id: str
+    workflow: WorkflowDefinition | None = None
+    rendered: RenderedPrompt | None = None
+    error: str | None = None
+    context_refs: int = 0
+    context_bytes_saved: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _render_batch_item(
+    index: int,
+    workflow_id: str,
+    arguments: Mapping[str, str],
+    registry: Mapping[str, WorkflowDefinition] | None,
+    context_store: ContextStore | None = None,
+    passage_cache: PassageIndexCache | None = None,
+) -> BatchItemResult:
+    if registry is None:
+        workflow = WORKFLOW_REGISTRY.get(workflow_id)
+    else:
+        workflow = registry.get(workflow_id)
+    if workflow is None:
+        return BatchItemResult(index, workflow_id, error=f"Unknown workflow: `{workflow_id}`")
+    context = dict(arguments)
+    refs = saved = 0
+    if context_store is not None and has_refs(context):
+        try:
+            resolved = resolve_refs(context, context_store)
+        except ContextRefError as e:
+            return BatchItemResult(index, workflow_id, workflow, error=str(e))
+        context, refs, saved = resolved.arguments, resolved.refs, resolved.bytes_saved
+    missing_msg = build_missing_fields_message(workflow, context)
+    if missing_msg:
+        return BatchItemResult(index, workflow_id, workflow, error=missing_msg)
+    try:
+        rendered = render_workflow(workflow, context, passage_cache)
+    except Exception as e:  # one bad item must not fail the whole batch
+        return BatchItemResult(index, workflow_id, workflow, error=str(e))
+    return BatchItemResult(
+        index,
+        workflow_id,
+        workflow,
+        rendered=rendered,
+        context_refs=refs,
+        context_bytes_saved=saved,
+    )
+
+
+def render_batch(
+    items: Iterable[tuple[str, Mapping[str, str]]],
+    max_workers: int = DEFAULT_BATCH_WORKERS,
+    registry: Mapping[str, WorkflowDefinition] | None = None,
+    context_store: ContextStore | None = None,
+    passage_cache: PassageIndexCache | None = None,
+) -> list[BatchItemResult]:
+    """Validate and render many workflow invocations concurrently.
+
+    Args:
+        items: ``(workflow_id, arguments)`` pairs.
+        max_workers: Size of the bounded thread pool used for rendering.
+        registry: Workflow lookup; defaults to ``WORKFLOW_REGISTRY``.
+        context_store: If given, ``ref:<sha256>`` argument values are
+            replaced with the stored content before validation.
+        passage_cache: Passage indexes to reuse (see :func:`render_workflow`).
+
+    Returns:
+        One :class:`BatchItemResult` per item, in input order. Unknown
+        workflows, missing required fields and render failures are reported
+        per item rather than raised, as are unknown or expired context refs.
+
+    Raises:
+        ValueError: If more than :data:`MAX_BATCH_ITEMS` items are given.
     """
-    user_prompt = workflow.user_prompt_template
+    items = list(items)
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f"Batch too large: {len(items)} items (max {MAX_BATCH_ITEMS})")
+    if not items:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as pool:
+        futures = [
+            pool.submit(_render_batch_item, i, wf_id, args, registry, context_store, passage_cache)
+            for i, (wf_id, args) in enumerate(items)
+        ]
+        return [f.result() for f in futures]
+
+
+def missing_required_fields(
+    workflow: WorkflowSummary, provided: Mapping[str, Any]
+) -> list[FieldSpec]:
+    """The required fields of ``workflow`` that are absent or empty in ``provided``."""
+    return [f for f in workflow.required_fields if not provided.get(f.name)]
+
 
-    # Collect all placeholder names from the template
-    placeholders = set(re.findall(r"\{\{(\w+)\}\}", user_prompt))
+def build_missing_fields_schema(
+    workflow: WorkflowSummary, provided: Mapping[str, Any]
+) -> dict[str, Any] | None:
+    """A JSON schema asking for exactly the missing required fields.
 
-    for key in placeholders:
-        value = context.get(key, "(not provided)")
-        user_prompt = user_prompt.replace("{{" + key + "}}", value)
+    The schema is flat and uses only string properties, so it can be sent
+    as an MCP elicitation ``requestedSchema`` as well as returned to hosts.
 
-    return workflow.system_prompt, user_prompt
+    Returns:
+        The schema, or ``None`` if all required fields are present.
+    """
+    missing = missing_required_fields(workflow, provided)
+    if not missing:
+        return None
+    properties: dict[str, Any] = {}
+    for f in missing:
+        # Elicitation schemas allow no "examples" keyword; keep the example in the text.
+        example = f' (e.g. "{f.example}")' if f.example else ""
+        properties[f.name] = {
+            "type": "string",
+            "title": f.name,
+            "description": f.description + example,
+        }
+    return {"type": "object", "properties": properties, "required": [f.name for f in missing]}
 
 
 def build_missing_fields_message(
-    workflow: WorkflowDefinition,
+    workflow: WorkflowSummary,
     provided: dict[str, str],
 ) -> str | None:
     """Check which required fields are missing and return a human-readable message.
@@ -51,9 +262,7 @@ def build_missing_fields_message(
     Returns:
         A message listing missing required fields, or ``None`` if all are present.
     """
-    missing = [
-        f for f in workflow.required_fields if f.name not in provided or not provided[f.name]
-    ]
+    missing = missing_required_fields(workflow, provided)
     if not missing:
         return None
 
@@ -68,7 +277,7 @@ def build_missing_fields_message(
     return "\n".join(lines)
 
 
-def build_field_summary(workflow: WorkflowDefinition) -> str:
+def build_field_summary(workflow: WorkflowSummary) -> str:
     """Build a human-readable summary of a workflow's fields for the help output."""
     lines = [f"## {workflow.name}\n", f"{workflow.description}\n"]
 
@@ -0,0 +1,244 @@
+"""Encoding of rendered workflow prompts into MCP tool results.
+
+Three response modes are supported:
+
+- ``json`` (default): one text block holding an indented JSON object with
+  ``workflow``, ``output_format``, ``system_prompt`` and ``user_prompt``.
+  This is the original format.
+- ``blocks``: a small JSON metadata block followed by the system prompt and
+  the user prompt as two plain text blocks. Prompts are sent verbatim, so
+  large pasted inputs are not JSON-escaped twice and hosts need no extra
+  parse step.
+- ``structured``: the system and user prompts as plain text blocks, with
+  the metadata in the result's ``structuredContent``.
+
+When the server executes prompts itself (see :mod:`pmkit_mcp.executor`), the
+model output takes the place of the prompts in each mode.
+
+JSON encoding uses ``orjson`` when it is installed and falls back to the
+standard library otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
+
+from mcp.types import CallToolResult, TextContent
+
+from pmkit_mcp.renderer import BatchItemResult, RenderedPrompt
+from pmkit_mcp.workflows.registry import WorkflowDefinition, WorkflowSummary
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when the optional extra is absent
+    orjson = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from pmkit_mcp.executor import Completion
+
+RESPONSE_MODES = ("json", "blocks", "structured")
+DEFAULT_RESPONSE_MODE = "json"
+
+
+def dumps(obj: Any, *, indent: bool = False) -> str:
+    """Serialize ``obj`` to a JSON string, preferring ``orjson`` when available."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        try:
+            return orjson.dumps(obj, option=option).decode()
+        except TypeError:
+            # e.g. lone surrogates, which the stdlib encoder escapes instead of rejecting
+            pass
+    if indent:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def build_metadata(workflow: WorkflowDefinition, rendered: RenderedPrompt) -> dict[str, Any]:
+    """Metadata describing a rendered prompt pair, without the prompts themselves."""
+    metadata: dict[str, Any] = {
+        "workflow": workflow.name,
+        "workflow_id": workflow.id,
+        "output_format": workflow.output_format,
+        "parts": ["system_prompt", "user_prompt"],
+        "system_prompt_chars": len(rendered.system_prompt),
+        "user_prompt_chars": len(rendered.user_prompt),
+        "estimated_tokens": rendered.estimated_tokens,
+        "prompt_budget": rendered.prompt_budget,
+    }
+    if rendered.preprocessed:
+        metadata["preprocessed"] = [p.as_dict() for p in rendered.preprocessed]
+    if rendered.passages:
+        metadata["passages"] = [p.as_dict() for p in rendered.passages]
+    if rendered.trims:
+        metadata["truncated"] = [t.as_dict() for t in rendered.trims]
+    if rendered.over_budget:
+        metadata["over_budget"] = True
+    return metadata
+
+
+def build_result_dict(workflow: WorkflowDefinition, rendered: RenderedPrompt) -> dict[str, Any]:
+    """The ``json``-mode result object for one rendered workflow."""
+    result: dict[str, Any] = {
+        "workflow": workflow.name,
+        "output_format": workflow.output_format,
+        "system_prompt": rendered.system_prompt,
+        "user_prompt": rendered.user_prompt,
+    }
+    # Only report budget details when they matter, keeping the common case unchanged.
+    if rendered.preprocessed:
+        result["preprocessed"] = [p.as_dict() for p in rendered.preprocessed]
+    if rendered.passages:
+        result["passages"] = [p.as_dict() for p in rendered.passages]
+    if rendered.trims:
+        result["truncated"] = [t.as_dict() for t in rendered.trims]
+    if rendered.over_budget:
+        result["over_budget"] = True
+    return result
+
+
+def build_workflow_response(
+    workflow: WorkflowDefinition,
+    rendered: RenderedPrompt,
+    mode: str = DEFAULT_RESPONSE_MODE,
+) -> list[TextContent] | CallToolResult:
+    """Encode a rendered prompt pair as a tool result in the given response mode.
+
+    Args:
+        workflow: The workflow that was rendered.
+        rendered: The rendered prompts and budget report.
+        mode: One of :data:`RESPONSE_MODES`.
+
+    Returns:
+        Content blocks for ``json`` and ``blocks`` modes, or a full
+        ``CallToolResult`` for ``structured`` mode.
+
+    Raises:
+        ValueError: If ``mode`` is not a known response mode.
+    """
+    if mode == "json":
+        result = build_result_dict(workflow, rendered)
+        return [TextContent(type="text", text=dumps(result, indent=True))]
+
+    metadata = build_metadata(workflow, rendered)
+    prompts = [
+        TextContent(type="text", text=rendered.system_prompt),
+        TextContent(type="text", text=rendered.user_prompt),
+    ]
+    if mode == "blocks":
+        return [TextContent(type="text", text=dumps(metadata)), *prompts]
+    if mode == "structured":
+        # list() widens the item type to any content block for the invariant list field.
+        return CallToolResult(content=list(prompts), structuredContent=metadata, isError=False)
+    raise ValueError(f"Unknown response mode: {mode!r} (expected one of {RESPONSE_MODES})")
+
+
+def build_execution_dict(
+    workflow: WorkflowDefinition, rendered: RenderedPrompt, completion: Completion
+) -> dict[str, Any]:
+    """The ``json``-mode result object for one executed workflow."""
+    result: dict[str, Any] = {
+        "workflow": workflow.name,
+        "output_format": workflow.output_format,
+        "output": completion.text,
+        "model": completion.model,
+    }
+    if completion.cached:
+        result["cached"] = True
+    if rendered.preprocessed:
+        result["preprocessed"] = [p.as_dict() for p in rendered.preprocessed]
+    if rendered.passages:
+        result["passages"] = [p.as_dict() for p in rendered.passages]
+    if rendered.trims:
+        result["truncated"] = [t.as_dict() for t in rendered.trims]
+    return result
+
+
+def build_execution_response(
+    workflow: WorkflowDefinition,
+    rendered: RenderedPrompt,
+    completion: Completion,
+    mode: str = DEFAULT_RESPONSE_MODE,
+) -> list[TextContent] | CallToolResult:
+    """Encode a workflow's model output as a tool result in the given response mode.
+
+    Like :func:`build_workflow_response`, with the output in place of the prompts.
+    """
+    if mode == "json":
+        result = build_execution_dict(workflow, rendered, completion)
+        return [TextContent(type="text", text=dumps(result, indent=True))]
+
+    metadata = build_metadata(workflow, rendered)
+    metadata.update(
+        parts=["output"],
+        model=completion.model,
+        attempts=completion.attempts,
+        latency_ms=round(completion.latency * 1e3, 1),
+        output_chars=len(completion.text),
+        cached=completion.cached,
+    )
+    output = TextContent(type="text", text=completion.text)
+    if mode == "blocks":
+        return [TextContent(type="text", text=dumps(metadata)), output]
+    if mode == "structured":
+        return CallToolResult(content=[output], structuredContent=metadata, isError=False)
+    raise ValueError(f"Unknown response mode: {mode!r} (expected one of {RESPONSE_MODES})")
+
+
+def build_needs_input_response(
+    workflow: WorkflowSummary, message: str, schema: dict[str, Any]
+) -> CallToolResult:
+    """A result asking for missing required fields.
+
+    The content is the usual human-readable message. ``structuredContent``
+    carries ``status: "needs_input"`` and a JSON schema for exactly the
+    missing fields, so a host can collect them and call again without an
+    extra model turn.
+    """
+    return CallToolResult(
+        content=[TextContent(type="text", text=message)],
+        structuredContent={
+            "status": "needs_input",
+            "workflow_id": workflow.id,
+            "missing": schema["required"],
+            "schema": schema,
+        },
+        isError=False,
+    )
+
+
+def build_batch_response(
+    results: list[BatchItemResult],
+    completions: Mapping[int, Completion | Exception] | None = None,
+) -> list[TextContent]:
+    """Encode batch render results as one JSON text block, in input order.
+
+    Each entry has ``index``, ``workflow_id`` and ``status`` (``ok`` or
+    ``error``). Successful entries carry the same fields as a ``json``-mode
+    single result, and failed entries carry an ``error`` message.
+
+    Args:
+        results: Render results from :func:`~pmkit_mcp.renderer.render_batch`.
+        completions: Model outputs (or failures) by item index, when the
+            batch was executed; entries then carry ``output`` instead of prompts.
+    """
+    entries: list[dict[str, Any]] = []
+    for item in results:
+        entry: dict[str, Any] = {"index": item.index, "workflow_id": item.workflow_id}
+        completion = completions.get(item.index) if completions is not None else None
+        if isinstance(completion, Exception):
+            entry["status"] = "error"
+            entry["error"] = str(completion)
+        elif item.workflow is not None and item.rendered is not None:
+            entry["status"] = "ok"
+            if completion is not None:
+                entry.update(build_execution_dict(item.workflow, item.rendered, completion))
+            else:
+                entry.update(build_result_dict(item.workflow, item.rendered))
+        else:
+            entry["status"] = "error"
+            entry["error"] = item.error
+        entries.append(entry)
+    return [TextContent(type="text", text=dumps({"results": entries}))]
@@ -0,0 +1,251 @@
+"""Persistent cache of executed workflow outputs.
+
+When the server runs prompts itself (see :mod:`pmkit_mcp.executor`), the
+same rendered prompt is often run again: teammates ask for the same digest,
+hosts retry. :class:`ResultCache` stores model outputs in a local SQLite
+database, keyed by a hash of the fully rendered prompts and the model
+parameters, so a repeat is answered without calling the model.
+
+- **Expiry.** How long an output stays fresh depends on the workflow. An
+  autonomous ``daily_brief`` goes stale within hours, while a ``prd_draft``
+  for the same inputs stays valid for days. TTLs are therefore looked up by
+  workflow id first, then by category (:data:`DEFAULT_TTLS`).
+- **Size.** The summed output size is bounded. Least recently used outputs
+  are evicted first.
+- **Concurrency.** The database runs in WAL mode, so readers never block the
+  writer. Writes take the lock up front (``BEGIN IMMEDIATE``) and wait out
+  contention with a busy timeout. Several worker processes can therefore
+  share one file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from pmkit_mcp.scheduler import DEFAULT_CATCH_UP_SECONDS, DEFAULT_JITTER_SECONDS
+
+# Seconds an output stays fresh, by workflow id or category.
+DEFAULT_TTLS: dict[str, float] = {
+    "autonomous": 3 * 3600.0,
+    "beta": 24 * 3600.0,
+    "on-demand": 7 * 24 * 3600.0,
+}
+DEFAULT_TTL = 24 * 3600.0
+DEFAULT_RESULT_CACHE_MB = 512
+# Seconds of scheduled-run claims kept per job (see claim_run).
+DEFAULT_RUN_RETENTION = DEFAULT_CATCH_UP_SECONDS + DEFAULT_JITTER_SECONDS
+BUSY_TIMEOUT_MS = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    workflow_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    output TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_expires ON results (expires);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+CREATE TABLE IF NOT EXISTS scheduled_runs (
+    job TEXT NOT NULL,
+    due REAL NOT NULL,
+    claimed REAL NOT NULL,
+    PRIMARY KEY (job, due)
+);
+"""
+
+
+def result_key(system_prompt: str, user_prompt: str, params: Mapping[str, Any]) -> str:
+    """Hash rendered prompts and model parameters into a cache key."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(params, sort_keys=True, separators=(",", ":")).encode())
+    for part in (system_prompt, user_prompt):
+        digest.update(b"\0")
+        digest.update(part.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def parse_ttls(spec: str) -> dict[str, float]:
+    """Parse ``"autonomous=3600,prd_draft=604800"`` into TTL overrides.
+
+    Raises:
+        ValueError: If an entry is not ``name=seconds``.
+    """
+    ttls: dict[str, float] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, sep, seconds = entry.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Invalid TTL {entry!r}; expected name=seconds")
+        ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+class ResultCache:
+    """SQLite-backed, size-bounded cache of model outputs.
+
+    Args:
+        path: Database file; created if missing. Share it between processes
+            to share results.
+        max_bytes: Upper bound on the summed size of cached outputs, in
+            UTF-8 bytes.
+        ttls: TTL overrides by workflow id or category, merged over
+            :data:`DEFAULT_TTLS`.
+        default_ttl: TTL for workflows matching no entry.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = DEFAULT_RESULT_CACHE_MB << 20,
+        ttls: Mapping[str, float] | None = None,
+        default_ttl: float = DEFAULT_TTL,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per instance, shared by worker threads under a lock.
+        self._db = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,  # explicit transactions only
+            check_same_thread=False,
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+
+    def ttl_for(self, workflow_id: str, category: str) -> float:
+        return self.ttls.get(workflow_id, self.ttls.get(category, self.default_ttl))
+
+    def get(self, key: str) -> tuple[str, str] | None:
+        """Return ``(output, model)`` for a fresh entry, or ``None``."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT output, model FROM results WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Recency for LRU eviction is best effort; a hit must not fail on a busy database.
+            try:
+                self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            except sqlite3.OperationalError:
+                pass
+        return row[0], row[1]
+
+    def put(self, key: str, workflow_id: str, category: str, output: str, model: str) -> bool:
+        """Store an output, then drop expired and least recently used entries.
+
+        Returns:
+            ``False`` if the output alone exceeds ``max_bytes`` and was not stored.
+        """
+        size = len(output.encode("utf-8", "surrogatepass"))
+        if size > self.max_bytes:
+            return False
+        now = time.time()
+        expires = now + self.ttl_for(workflow_id, category)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, workflow_id, model, output, size, now, expires, now),
+                )
+                self._db.execute("DELETE FROM results WHERE expires <= ?", (now,))
+                total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+                excess = total[0] - self.max_bytes
+                if excess > 0:
+                    self._evict(excess)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return True
+
+    def _evict(self, excess: int) -> None:
+        victims: list[str] = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed"):
+            victims.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM results WHERE key = ?", ((k,) for k in victims))
+
+    # -- scheduled runs (see pmkit_mcp.scheduler) ------------------------------
+
+    def claim_run(self, job: str, due: float, retain: float = DEFAULT_RUN_RETENTION) -> bool:
+        """Record that ``job``'s run due at ``due`` is taken.
+
+        Claims of ``job`` due more than ``retain`` seconds earlier are
+        deleted, so the table holds about one catch-up window per job.
+
+        Returns:
+            ``False`` if this or another process already claimed it.
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO scheduled_runs VALUES (?, ?, ?)", (job, due, time.time())
+            )
+            self._db.execute(
+                "DELETE FROM scheduled_runs WHERE job = ? AND due < ?", (job, due - retain)
+            )
+        return cursor.rowcount == 1
+
+    def last_run(self, job: str) -> float | None:
+        """Due time of the latest claimed run of ``job``."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MAX(due) FROM scheduled_runs WHERE job = ?", (job,)
+            ).fetchone()
+        due: float | None = row[0]
+        return due
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        return {
+            "path": str(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def make_result_cache(
+    path: str | None, megabytes: float = DEFAULT_RESULT_CACHE_MB, ttls: str = ""
+) -> ResultCache | None:
+    """Build a cache from command-line values, or ``None`` when no path is given."""
+    if not path:
+        return None
+    return ResultCache(path, int(megabytes * 1024 * 1024), parse_ttls(ttls))
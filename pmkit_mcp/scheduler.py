@@ -0,0 +1,524 @@
+"""Scheduled pre-rendering of workflows, for the ``autonomous`` category.
+
+Workflows such as ``daily_brief``, ``meeting_prep`` and ``sprint_review`` are
+meant to run on a schedule, before PMs start their day. A schedule file lists
+one job per tenant/user with a cron expression::
+
+    {
+      "timezone": "Europe/London",
+      "jobs": [
+        {
+          "tenant": "Acme Corp",
+          "user": "Sam",
+          "workflow_id": "daily_brief",
+          "cron": "30 7 * * 1-5",
+          "arguments": {"slack_messages": "ref:9f2c..."}
+        }
+      ]
+    }
+
+When a job is due, the server calls the workflow tool itself. It fills
+``tenant_name``, ``user_name`` and ``current_date`` (``YYYY-MM-DD``, in the
+job's timezone) from the job if the workflow has those fields and the job
+does not set them. The result lands in the render cache, or in the result
+cache when the server executes prompts. A PM's later call with the same
+arguments is then a cache read.
+
+:class:`Scheduler` runs at most ``max_concurrency`` jobs at once. It delays
+each run by a random jitter, so tenants sharing a cron time do not all hit
+the model endpoint at the same instant. A run missed because the process was
+down or suspended is caught up once on start or wake-up, if it is no older
+than ``catch_up`` seconds. Several missed runs of a job coalesce into one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+from pathlib import Path
+from typing import Any, Protocol
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY, WorkflowRegistry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCHEDULE_CONCURRENCY = 2
+DEFAULT_JITTER_SECONDS = 300.0
+DEFAULT_CATCH_UP_SECONDS = 6 * 3600.0
+# The loop re-checks the wall clock at least this often, so clock changes and
+# suspends are noticed.
+MAX_SLEEP_SECONDS = 60.0
+
+
+class ScheduleError(ValueError):
+    """A schedule file or cron expression is invalid."""
+
+
+# ---------------------------------------------------------------------------
+# Cron expressions
+# ---------------------------------------------------------------------------
+
+_MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+_DAYS = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+
+def _parse_value(text: str, names: Sequence[str], offset: int) -> int:
+    lowered = text.lower()
+    if lowered in names:
+        return names.index(lowered) + offset
+    return int(text)
+
+
+def _parse_field(
+    text: str, low: int, high: int, names: Sequence[str] = (), offset: int = 0
+) -> tuple[frozenset[int], bool]:
+    """Parse one cron field into its set of values, and whether it was ``*``."""
+    values: set[int] = set()
+    for part in text.split(","):
+        spec, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if step < 1:
+            raise ValueError(f"step must be positive in {part!r}")
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            first, _, last = spec.partition("-")
+            start, end = _parse_value(first, names, offset), _parse_value(last, names, offset)
+        else:
+            start = _parse_value(spec, names, offset)
+            end = high if step_text else start
+        if not low <= start <= end <= high:
+            raise ValueError(f"{part!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values), text == "*"
+
+
+@dataclass(frozen=True)
+class CronSpec:
+    """A five-field cron expression: minute, hour, day of month, month, day of week.
+
+    Fields accept ``*``, numbers, ranges (``1-5``), lists (``1,15``) and steps
+    (``*/15``). Months and weekdays also accept names (``jan``, ``mon``), and
+    Sunday is ``0`` or ``7``. As in cron, when both day fields are restricted
+    a day matching either one matches. ``@daily``, ``@hourly`` and the other
+    common aliases are accepted.
+    """
+
+    source: str
+    minutes: tuple[int, ...]
+    hours: tuple[int, ...]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    any_day: bool
+    any_weekday: bool
+
+    @classmethod
+    def parse(cls, source: str) -> CronSpec:
+        """Parse ``source``.
+
+        Raises:
+            ScheduleError: If the expression is malformed.
+        """
+        fields = _ALIASES.get(source.strip().lower(), source).split()
+        if len(fields) != 5:
+            raise ScheduleError(f"Cron expression {source!r} must have 5 fields")
+        try:
+            minutes, _ = _parse_field(fields[0], 0, 59)
+            hours, _ = _parse_field(fields[1], 0, 23)
+            days, any_day = _parse_field(fields[2], 1, 31)
+            months, _ = _parse_field(fields[3], 1, 12, _MONTHS, 1)
+            weekdays, any_weekday = _parse_field(fields[4], 0, 7, _DAYS)
+        except ValueError as e:
+            raise ScheduleError(f"Invalid cron expression {source!r}: {e}") from e
+        if 7 in weekdays:
+            weekdays = (weekdays - {7}) | {0}
+        return cls(
+            source,
+            tuple(sorted(minutes)),
+            tuple(sorted(hours)),
+            days,
+            months,
+            weekdays,
+            any_day,
+            any_weekday,
+        )
+
+    def matches_day(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, timestamp: float, tz: ZoneInfo) -> float:
+        """The first matching minute strictly after ``timestamp``, as a timestamp.
+
+        Raises:
+            ScheduleError: If the expression matches no date (e.g. ``0 0 31 2 *``).
+        """
+        start = datetime.fromtimestamp(timestamp, tz).replace(second=0, microsecond=0)
+        day = start.date()
+        # Five years covers every satisfiable combination, including 29 February.
+        for _ in range(5 * 366):
+            if self.matches_day(day):
+                for hour in self.hours:
+                    if day == start.date() and hour < start.hour:
+                        continue
+                    for minute in self.minutes:
+                        candidate = datetime.combine(day, dtime(hour, minute), tz).timestamp()
+                        if candidate > timestamp:
+                            return candidate
+            day += timedelta(days=1)
+        raise ScheduleError(f"Cron expression {self.source!r} never matches")
+
+    def last_between(self, start: float, end: float, tz: ZoneInfo) -> float | None:
+        """The latest matching minute in ``(start, end]``, if any."""
+        last = None
+        due = self.next_after(start, tz)
+        while due <= end:
+            last = due
+            due = self.next_after(due, tz)
+        return last
+
+
+# ---------------------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ScheduledJob:
+    """One workflow run on a cron schedule for a tenant/user.
+
+    Attributes:
+        name: Unique job name; defaults to ``tenant/user/workflow_id``.
+        workflow_id: Workflow tool to call.
+        cron: When to run.
+        timezone: Zone the cron expression and ``current_date`` are read in.
+        tenant: Fills ``tenant_name`` if the workflow has it.
+        user: Fills ``user_name`` if the workflow has it.
+        arguments: Tool arguments; ``ref:`` values are allowed.
+        execute: Override whether the server executes the prompt (``None``
+            follows the server's setting).
+    """
+
+    name: str
+    workflow_id: str
+    cron: CronSpec
+    timezone: ZoneInfo
+    tenant: str = ""
+    user: str = ""
+    arguments: Mapping[str, Any] = field(default_factory=dict)
+    execute: bool | None = None
+
+    def arguments_for(
+        self, due: float, registry: WorkflowRegistry = WORKFLOW_REGISTRY
+    ) -> dict[str, Any]:
+        """Tool arguments for the run due at ``due``."""
+        arguments = dict(self.arguments)
+        summary = registry.summary(self.workflow_id)
+        fields = {f.name for f in (*summary.required_fields, *summary.optional_fields)}
+        defaults = {
+            "tenant_name": self.tenant,
+            "user_name": self.user,
+            "current_date": datetime.fromtimestamp(due, self.timezone).date().isoformat(),
+        }
+        for name, value in defaults.items():
+            if name in fields and value and name not in arguments:
+                arguments[name] = value
+        if self.execute is not None:
+            arguments["pmkit_execute"] = self.execute
+        return arguments
+
+
+def _zone(name: str, where: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ScheduleError(f"{where}: unknown timezone {name!r}") from e
+
+
+def parse_schedule(
+    data: Mapping[str, Any],
+    registry: WorkflowRegistry = WORKFLOW_REGISTRY,
+    source: str = "schedule",
+) -> list[ScheduledJob]:
+    """Build jobs from a decoded schedule document (see the module docstring).
+
+    Raises:
+        ScheduleError: If a job names an unknown workflow, lacks required
+            fields, or has an invalid cron expression or timezone.
+    """
+    default_zone = _zone(data.get("timezone", "UTC"), source)
+    jobs: list[ScheduledJob] = []
+    for position, entry in enumerate(data.get("jobs", [])):
+        where = f"{source}: job {position}"
+        try:
+            workflow_id = entry["workflow_id"]
+            cron = CronSpec.parse(entry["cron"])
+        except KeyError as e:
+            raise ScheduleError(f"{where} is missing {e.args[0]!r}") from e
+        if workflow_id not in registry:
+            raise ScheduleError(f"{where}: unknown workflow {workflow_id!r}")
+        tenant, user = entry.get("tenant", ""), entry.get("user", "")
+        job = ScheduledJob(
+            name=entry.get("name") or "/".join(p for p in (tenant, user, workflow_id) if p),
+            workflow_id=workflow_id,
+            cron=cron,
+            timezone=_zone(entry["timezone"], where) if "timezone" in entry else default_zone,
+            tenant=tenant,
+            user=user,
+            arguments=dict(entry.get("arguments") or {}),
+            execute=entry.get("execute"),
+        )
+        # Fail at startup rather than at 7am: the job must be able to run.
+        job.cron.next_after(time.time(), job.timezone)
+        provided = job.arguments_for(time.time(), registry)
+        missing = [
+            f.name
+            for f in registry.summary(workflow_id).required_fields
+            if not provided.get(f.name)
+        ]
+        if missing:
+            raise ScheduleError(f"{where} ({job.name}) is missing required fields: {missing}")
+        if any(j.name == job.name for j in jobs):
+            raise ScheduleError(f"{where}: duplicate job name {job.name!r}")
+        jobs.append(job)
+    return jobs
+
+
+def load_schedule(
+    path: str | Path, registry: WorkflowRegistry = WORKFLOW_REGISTRY
+) -> list[ScheduledJob]:
+    """Read a JSON schedule file.
+
+    Raises:
+        ScheduleError: If the file is not valid JSON or not a valid schedule.
+    """
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        raise ScheduleError(f"{path}: {e}") from e
+    return parse_schedule(data, registry, str(path))
+
+
+# ---------------------------------------------------------------------------
+# Run ledger
+# ---------------------------------------------------------------------------
+
+
+class Ledger(Protocol):
+    """Where runs are claimed, so each due run happens once."""
+
+    def claim_run(self, job: str, due: float, retain: float = ...) -> bool:
+        """Claim ``job``'s run due at ``due``; ``False`` if it was already claimed.
+
+        Claims of ``job`` due more than ``retain`` seconds before ``due`` may
+        be forgotten; no run that old is claimed any more.
+        """
+        ...
+
+    def last_run(self, job: str) -> float | None: ...
+
+
+class MemoryLedger:
+    """Ledger for a single process. Runs are forgotten on restart."""
+
+    def __init__(self) -> None:
+        self._last: dict[str, float] = {}
+
+    def claim_run(self, job: str, due: float, retain: float = 0.0) -> bool:
+        if self._last.get(job, float("-inf")) >= due:
+            return False
+        self._last[job] = due
+        return True
+
+    def last_run(self, job: str) -> float | None:
+        return self._last.get(job)
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+JobRunner = Callable[[ScheduledJob, dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class _JobState:
+    job: ScheduledJob
+    due: float
+    fire_at: float
+    catch_up: bool = False
+    running: bool = False
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    catch_ups: int = 0
+    last_due: float | None = None
+    last_error: str = ""
+
+
+class Scheduler:
+    """Runs jobs when due, with bounded concurrency, jitter and catch-up.
+
+    Args:
+        jobs: The jobs to run.
+        run_job: Called with the job and its arguments for each run; raises
+            on failure.
+        max_concurrency: Jobs running at once, across all tenants.
+        jitter: Each run starts up to this many seconds after it is due.
+        catch_up: Runs missed by at most this many seconds are made up.
+        ledger: Records claimed runs. Pass a ledger shared between processes
+            (e.g. :class:`~pmkit_mcp.result_cache.ResultCache`) so only one
+            of them runs each job, and runs survive restarts.
+        clock: Wall clock, for tests.
+        rng: Jitter source, for tests.
+    """
+
+    def __init__(
+        self,
+        jobs: Sequence[ScheduledJob],
+        run_job: JobRunner,
+        max_concurrency: int = DEFAULT_SCHEDULE_CONCURRENCY,
+        jitter: float = DEFAULT_JITTER_SECONDS,
+        catch_up: float = DEFAULT_CATCH_UP_SECONDS,
+        ledger: Ledger | None = None,
+        clock: Callable[[], float] = time.time,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.jobs = list(jobs)
+        self.run_job = run_job
+        self.max_concurrency = max_concurrency
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.ledger: Ledger = ledger if ledger is not None else MemoryLedger()
+        self.clock = clock
+        self._rng = rng or random.Random()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._states: list[_JobState] = []
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def _fire_at(self, due: float) -> float:
+        return due + self._rng.uniform(0, self.jitter)
+
+    async def start(self) -> None:
+        """Plan every job's next run, catching up runs missed while down."""
+        now = self.clock()
+        for job in self.jobs:
+            last = await asyncio.to_thread(self.ledger.last_run, job.name)
+            since = now - self.catch_up if last is None else max(now - self.catch_up, last)
+            missed = job.cron.last_between(since, now, job.timezone)
+            if missed is not None:
+                state = _JobState(job, missed, self._fire_at(now), catch_up=True)
+            else:
+                due = job.cron.next_after(now, job.timezone)
+                state = _JobState(job, due, self._fire_at(due))
+            self._states.append(state)
+
+    def tick(self) -> float:
+        """Start the runs that are due; return seconds until the next one."""
+        now = self.clock()
+        for state in self._states:
+            if state.fire_at > now:
+                continue
+            job, due = state.job, state.due
+            if state.running:
+                # The previous run is still going; this one is dropped, not queued.
+                state.skipped += 1
+                logger.warning("Scheduled job %s still running; skipping its next run", job.name)
+            else:
+                task = asyncio.create_task(self._run(state, due, state.catch_up))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            # Runs missed while suspended collapse into the one just started.
+            next_due = job.cron.next_after(max(now, due), job.timezone)
+            state.due, state.fire_at, state.catch_up = next_due, self._fire_at(next_due), False
+        if not self._states:
+            return MAX_SLEEP_SECONDS
+        return max(0.0, min(s.fire_at for s in self._states) - now)
+
+    async def _run(self, state: _JobState, due: float, catch_up: bool) -> None:
+        job = state.job
+        state.running = True
+        try:
+            async with self._semaphore:
+                # A due run starts within catch_up + jitter; older claims can go.
+                retain = self.catch_up + self.jitter
+                if not await asyncio.to_thread(self.ledger.claim_run, job.name, due, retain):
+                    state.skipped += 1  # another process ran it
+                    return
+                if catch_up:
+                    state.catch_ups += 1
+                    logger.info("Catching up missed run of %s", job.name)
+                state.last_due = due
+                try:
+                    await self.run_job(job, job.arguments_for(due))
+                except Exception as e:
+                    state.failures += 1
+                    state.last_error = str(e)
+                    logger.exception("Scheduled job %s failed", job.name)
+                else:
+                    state.runs += 1
+                    state.last_error = ""
+        finally:
+            state.running = False
+
+    async def wait_idle(self) -> None:
+        """Wait for the runs started so far to finish."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def run(self) -> None:
+        """Run jobs until cancelled."""
+        await self.start()
+        try:
+            while True:
+                await asyncio.sleep(min(self.tick(), MAX_SLEEP_SECONDS))
+        finally:
+            for task in self._tasks:
+                task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": sum(s.running for s in self._states),
+            "jobs": {
+                s.job.name: {
+                    "workflow_id": s.job.workflow_id,
+                    "cron": s.job.cron.source,
+                    "next_due": datetime.fromtimestamp(s.due, s.job.timezone).isoformat(),
+                    "last_due": (
+                        datetime.fromtimestamp(s.last_due, s.job.timezone).isoformat()
+                        if s.last_due is not None
+                        else None
+                    ),
+                    "runs": s.runs,
+                    "failures": s.failures,
+                    "skipped": s.skipped,
+                    "catch_ups": s.catch_ups,
+                    "last_error": s.last_error,
+                }
+                for s in self._states
+            },
+        }
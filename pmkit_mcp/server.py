@@ -1,15 +1,25 @@
 """PM Kit MCP Server.
 
 A Model Context Protocol server that exposes 13 product management workflows
-as tools, plus a ``pmkit_help`` tool for discovering available workflows.
+as tools, plus a ``pmkit_help`` tool for discovering available workflows,
+a ``pmkit_render_batch`` tool for rendering many invocations in one call,
+a ``pmkit_put_context`` tool for uploading large inputs once and referring
+to them as ``ref:<sha256>`` in any workflow field, and a ``pmkit_stats`` tool
+reporting per-tool latency and payload metrics.
 
 Each workflow tool follows a conversational pattern:
 1. If required fields are missing, the tool returns a message listing them.
 2. Once all required fields are provided, it renders the prompt and returns it.
 
+With ``pmkit_session: true`` the server remembers the fields sent so far for
+that workflow in the client's session, so follow-up calls only carry the
+fields that were missing or changed.
+
 The rendered prompts (system + user) are returned to the MCP client so that
 the LLM host can use them directly. This keeps the server stateless and
-avoids coupling to any specific LLM provider.
+avoids coupling to any specific LLM provider. Optionally (``--llm-url``), the
+server runs the prompts against an OpenAI- or Anthropic-compatible endpoint
+itself and returns the model output; see :mod:`pmkit_mcp.executor`.
 
 Usage:
     # stdio transport (default, for Claude Desktop / Cursor / etc.)
@@ -17,25 +27,122 @@ Usage:
 
     # Or via the installed entry point
     pmkit-mcp
+
+    # Streamable HTTP transport with a pool of worker processes
+    pmkit-mcp --transport http --port 8000 --workers 4
 """
 
 from __future__ import annotations
 
-import json
+import argparse
+import asyncio
+import hashlib
 import logging
+import os
 import sys
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, replace
+from dataclasses import field as dataclass_field
 from typing import Any
 
-from mcp.server import Server
+from mcp.server import NotificationOptions, Server
+from mcp.server.lowlevel.server import request_ctx
+from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
-from mcp.types import TextContent, Tool
+from mcp.types import (
+    CallToolRequest,
+    CallToolRequestParams,
+    CallToolResult,
+    ClientCapabilities,
+    ElicitationCapability,
+    ListToolsRequest,
+    ListToolsResult,
+    TextContent,
+    Tool,
+)
 
+from pmkit_mcp.clustering import DEFAULT_MAX_CLUSTERS, configure_clustering, make_cluster_settings
+from pmkit_mcp.context_store import (
+    DEFAULT_DISK_MB,
+    DEFAULT_MEMORY_MB,
+    DEFAULT_TTL_SECONDS,
+    REF_PREFIX,
+    ContextRefError,
+    ContextStore,
+    has_refs,
+    make_context_store,
+    resolve_refs,
+)
+from pmkit_mcp.executor import (
+    API_STYLES,
+    Completion,
+    ExecutorError,
+    LLMExecutor,
+    TokenCallback,
+    make_executor,
+)
+from pmkit_mcp.metrics import (
+    LIST_TOOLS,
+    ServerMetrics,
+    argument_bytes,
+    dump_metrics_periodically,
+    render_prometheus,
+    serve_metrics,
+)
+from pmkit_mcp.passages import (
+    DEFAULT_PASSAGE_INDEX_MB,
+    PassageIndexCache,
+    make_passage_index_cache,
+)
+from pmkit_mcp.preprocess import load_noise_patterns
+from pmkit_mcp.profiles import ProfileStore, client_identity, make_profile_store
+from pmkit_mcp.render_cache import RenderCache, cache_key, make_render_cache
 from pmkit_mcp.renderer import (
+    MAX_BATCH_ITEMS,
+    BatchItemResult,
+    RenderedPrompt,
     build_field_summary,
     build_missing_fields_message,
-    render_prompt,
+    build_missing_fields_schema,
+    render_batch,
+    render_workflow,
 )
-from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY, WorkflowDefinition
+from pmkit_mcp.responses import (
+    DEFAULT_RESPONSE_MODE,
+    RESPONSE_MODES,
+    build_batch_response,
+    build_execution_response,
+    build_needs_input_response,
+    build_workflow_response,
+    dumps,
+)
+from pmkit_mcp.result_cache import (
+    DEFAULT_RESULT_CACHE_MB,
+    ResultCache,
+    make_result_cache,
+    result_key,
+)
+from pmkit_mcp.scheduler import (
+    DEFAULT_CATCH_UP_SECONDS,
+    DEFAULT_JITTER_SECONDS,
+    DEFAULT_SCHEDULE_CONCURRENCY,
+    Ledger,
+    ScheduledJob,
+    Scheduler,
+    load_schedule,
+)
+from pmkit_mcp.sessions import (
+    DEFAULT_DRAFT_TTL_SECONDS,
+    DEFAULT_DRAFTS_MB,
+    ArgumentDrafts,
+    SessionRegistry,
+    SessionState,
+    make_argument_drafts,
+)
+from pmkit_mcp.workflows.catalog import register_catalog
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY, WorkflowSummary
+from pmkit_mcp.workflows.watch import DEFAULT_WATCH_INTERVAL, ReloadResult, WorkflowWatcher
 
 logger = logging.getLogger("pmkit_mcp")
 
@@ -44,7 +151,7 @@ logger = logging.getLogger("pmkit_mcp")
 # ---------------------------------------------------------------------------
 
 
-def _build_tool_schema(workflow: WorkflowDefinition) -> dict[str, Any]:
+def _build_tool_schema(workflow: WorkflowSummary) -> dict[str, Any]:
     """Build a JSON Schema for a workflow tool's input parameters."""
     properties: dict[str, Any] = {}
     required: list[str] = []
@@ -73,12 +180,12 @@ def _build_help_text() -> str:
     """Build the full help text listing all available workflows."""
     lines = [
         "# PM Kit MCP Server - Available Tools\n",
-        "This server provides 13 product management workflow tools.\n"
+        f"This server provides {len(WORKFLOW_REGISTRY)} product management workflow tools.\n"
         "Each tool generates a structured prompt ready for LLM processing.\n",
         "---\n",
     ]
 
-    categories: dict[str, list[WorkflowDefinition]] = {
+    categories: dict[str, list[WorkflowSummary]] = {
         "autonomous": [],
         "on-demand": [],
         "beta": [],
@@ -113,77 +220,479 @@ def _build_help_text() -> str:
     )
     lines.append(
         "**Tip:** Use `pmkit_workflow_details` with a `workflow_id` to see full field "
-        "descriptions for a specific workflow."
+        "descriptions for a specific workflow.\n"
+    )
+    lines.append(
+        "**Tip:** Reusing a large input across workflows? Upload it once with "
+        f"`pmkit_put_context` and pass the returned `{REF_PREFIX}<sha256>` as the field value.\n"
+    )
+    lines.append(
+        f"**Tip:** Add `{SESSION_ARGUMENT}: true` to a workflow call and the server remembers "
+        "the fields sent so far, so follow-up calls only need the missing or changed ones."
     )
     return "\n".join(lines)
 
 
 # ---------------------------------------------------------------------------
-# Server setup
+# Tool manifest
 # ---------------------------------------------------------------------------
 
 
-def create_server() -> Server:
-    """Create and configure the PM Kit MCP server with all tools registered."""
-    server = Server("pmkit-mcp-server")
+@dataclass(frozen=True)
+class ToolManifest:
+    """The tools/list payload, built once per registry version.
 
-    @server.list_tools()
-    async def list_tools() -> list[Tool]:
-        tools: list[Tool] = []
+    Attributes:
+        registry_version: ``WORKFLOW_REGISTRY.version`` the manifest was built from.
+        tools: Tool objects returned by the ``list_tools`` handler.
+        json_bytes: The same tool list serialized as ``{"tools": [...]}`` JSON.
+        etag: Strong HTTP entity tag derived from ``json_bytes``.
+    """
 
-        # Help tool
-        tools.append(
-            Tool(
-                name="pmkit_help",
-                description=(
-                    "List all available PM Kit workflow tools with their required "
-                    "and optional fields. Start here to discover what's available."
-                ),
-                inputSchema={"type": "object", "properties": {}, "required": []},
-            )
+    registry_version: int
+    tools: list[Tool]
+    json_bytes: bytes
+    etag: str
+
+    @property
+    def meta(self) -> dict[str, Any]:
+        """``_meta`` block attached to tools/list results."""
+        return {"pmkit/registryVersion": self.registry_version, "pmkit/etag": self.etag}
+
+
+def _build_tools() -> list[Tool]:
+    """Build the Tool objects for the utility tools and every registered workflow."""
+    tools: list[Tool] = []
+
+    # Help tool
+    tools.append(
+        Tool(
+            name="pmkit_help",
+            description=(
+                "List all available PM Kit workflow tools with their required "
+                "and optional fields. Start here to discover what's available."
+            ),
+            inputSchema={"type": "object", "properties": {}, "required": []},
         )
+    )
 
-        # Workflow details tool
-        tools.append(
-            Tool(
-                name="pmkit_workflow_details",
-                description=(
-                    "Get detailed field descriptions and examples for a specific workflow. "
-                    "Use this to understand exactly what data a workflow needs."
-                ),
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "workflow_id": {
-                            "type": "string",
-                            "description": "The workflow ID to get details for",
-                            "enum": list(WORKFLOW_REGISTRY.keys()),
-                        }
+    # Workflow details tool
+    tools.append(
+        Tool(
+            name="pmkit_workflow_details",
+            description=(
+                "Get detailed field descriptions and examples for a specific workflow. "
+                "Use this to understand exactly what data a workflow needs."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "workflow_id": {
+                        "type": "string",
+                        "description": "The workflow ID to get details for",
+                        "enum": list(WORKFLOW_REGISTRY.keys()),
+                    }
+                },
+                "required": ["workflow_id"],
+            },
+        )
+    )
+
+    # Batch render tool
+    tools.append(
+        Tool(
+            name="pmkit_render_batch",
+            description=(
+                "Render many workflow invocations in one call. Each item names a workflow "
+                "and its arguments; results (or per-item errors) are returned in input order."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "items": {
+                        "type": "array",
+                        "description": "Workflow invocations to render",
+                        "maxItems": MAX_BATCH_ITEMS,
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "workflow_id": {
+                                    "type": "string",
+                                    "description": "The workflow ID to render",
+                                },
+                                "arguments": {
+                                    "type": "object",
+                                    "description": "Field values for the workflow",
+                                    "additionalProperties": {"type": "string"},
+                                },
+                            },
+                            "required": ["workflow_id"],
+                        },
+                    },
+                    "execute": {
+                        "type": "boolean",
+                        "description": (
+                            "Run the rendered prompts on the server's LLM endpoint and return "
+                            "the outputs (default: true when the server has one)"
+                        ),
                     },
-                    "required": ["workflow_id"],
                 },
-            )
+                "required": ["items"],
+            },
         )
+    )
 
-        # One tool per workflow
-        for workflow in WORKFLOW_REGISTRY.values():
-            tools.append(
-                Tool(
-                    name=workflow.id,
-                    description=workflow.description,
-                    inputSchema=_build_tool_schema(workflow),
-                )
+    # Context upload tool
+    tools.append(
+        Tool(
+            name="pmkit_put_context",
+            description=(
+                "Upload a large input (tickets, transcripts, docs) once and get back a "
+                f"`{REF_PREFIX}<sha256>` reference. Pass the reference as the value of any "
+                "workflow field, in any number of calls, instead of resending the text."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "content": {"type": "string", "description": "The text to store"},
+                },
+                "required": ["content"],
+            },
+        )
+    )
+
+    # Stats tool
+    tools.append(
+        Tool(
+            name="pmkit_stats",
+            description=(
+                "Report per-tool call counts, errors, in-flight calls, latency and "
+                "argument size percentiles, plus render cache and context store statistics."
+            ),
+            inputSchema={"type": "object", "properties": {}, "required": []},
+        )
+    )
+
+    # One tool per workflow
+    for workflow in WORKFLOW_REGISTRY.values():
+        tools.append(
+            Tool(
+                name=workflow.id,
+                description=workflow.description,
+                inputSchema=_build_tool_schema(workflow),
             )
+        )
+
+    return tools
+
+
+def _build_tool_manifest() -> ToolManifest:
+    version = WORKFLOW_REGISTRY.version
+    tools = _build_tools()
+    payload = {
+        "tools": [t.model_dump(mode="json", by_alias=True, exclude_none=True) for t in tools]
+    }
+    json_bytes = dumps(payload).encode()
+    etag = '"' + hashlib.sha256(json_bytes).hexdigest()[:32] + '"'
+    return ToolManifest(registry_version=version, tools=tools, json_bytes=json_bytes, etag=etag)
+
+
+_tool_manifest: ToolManifest | None = None
+
+
+def get_tool_manifest() -> ToolManifest:
+    """Return the tool manifest, rebuilding it only if the registry has changed."""
+    global _tool_manifest
+    manifest = _tool_manifest
+    if manifest is None or manifest.registry_version != WORKFLOW_REGISTRY.version:
+        manifest = _tool_manifest = _build_tool_manifest()
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Discovery text cache
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _DiscoveryCache:
+    """Help and per-workflow detail text for one registry version."""
+
+    registry_version: int
+    help_text: str | None = None
+    details: dict[str, str] = dataclass_field(default_factory=dict)
+
+
+_discovery_cache = _DiscoveryCache(registry_version=0)
+
+
+def _current_discovery_cache() -> _DiscoveryCache:
+    global _discovery_cache
+    if _discovery_cache.registry_version != WORKFLOW_REGISTRY.version:
+        _discovery_cache = _DiscoveryCache(registry_version=WORKFLOW_REGISTRY.version)
+    return _discovery_cache
+
+
+def get_help_text() -> str:
+    """Return the ``pmkit_help`` text, building it once per registry version."""
+    cache = _current_discovery_cache()
+    if cache.help_text is None:
+        cache.help_text = _build_help_text()
+    return cache.help_text
+
+
+def get_workflow_details(workflow_id: str) -> str:
+    """Return the ``pmkit_workflow_details`` text for a registered workflow.
+
+    Built lazily on first request and reused until the registry version changes.
+
+    Raises:
+        KeyError: If ``workflow_id`` is not registered.
+    """
+    cache = _current_discovery_cache()
+    text = cache.details.get(workflow_id)
+    if text is None:
+        summary = WORKFLOW_REGISTRY.summary(workflow_id)
+        text = cache.details[workflow_id] = build_field_summary(summary)
+    return text
+
+
+# ---------------------------------------------------------------------------
+# Control arguments
+# ---------------------------------------------------------------------------
+
+# Reserved argument names that steer the server rather than fill a workflow field.
+NO_CACHE_ARGUMENT = "pmkit_no_cache"
+SESSION_ARGUMENT = "pmkit_session"
+RESET_SESSION_ARGUMENT = "pmkit_session_reset"
+EXECUTE_ARGUMENT = "pmkit_execute"
+
+_DRAFT_NOTE = (
+    "\n\nThe fields you sent are remembered for this session; call again with "
+    f"`{SESSION_ARGUMENT}: true` and only the missing fields."
+)
+
+
+def _pop_flag(
+    arguments: dict[str, Any], name: str, default: bool = False
+) -> tuple[dict[str, Any], bool]:
+    """Remove a boolean control argument, returning the remaining arguments and its value."""
+    if name not in arguments:
+        return arguments, default
+    remaining = dict(arguments)
+    value = remaining.pop(name)
+    if isinstance(value, str):
+        return remaining, value.strip().lower() in ("1", "true", "yes", "on")
+    return remaining, bool(value)
+
+
+# ---------------------------------------------------------------------------
+# Server setup
+# ---------------------------------------------------------------------------
+
+
+UTILITY_TOOLS = frozenset(
+    {
+        "pmkit_help",
+        "pmkit_workflow_details",
+        "pmkit_render_batch",
+        "pmkit_put_context",
+        "pmkit_stats",
+    }
+)
+
+
+def is_known_tool(name: str) -> bool:
+    """True if ``name`` is a utility tool or a registered workflow."""
+    return name in UTILITY_TOOLS or name in WORKFLOW_REGISTRY
+
+
+def _is_error_result(result: list[TextContent] | CallToolResult) -> bool:
+    return isinstance(result, CallToolResult) and result.isError
+
+
+def _error_result(message: str) -> CallToolResult:
+    return CallToolResult(content=[TextContent(type="text", text=message)], isError=True)
+
+
+# Streamed model output is forwarded at most this often, to keep notifications few.
+STREAM_FLUSH_SECONDS = 0.05
+
+
+class _TokenRelay:
+    """Forward streamed model output to the client as progress notifications.
+
+    Chunks are coalesced to one notification per :data:`STREAM_FLUSH_SECONDS`.
+    The notification's ``message`` carries the new text and ``progress`` the
+    number of characters streamed so far.
+    """
+
+    def __init__(self, session: Any, progress_token: str | int, request_id: Any) -> None:
+        self._session = session
+        self._token = progress_token
+        self._request_id = request_id
+        self._pending: list[str] = []
+        self._sent_at = time.monotonic()
+        self.chars = 0
+
+    @classmethod
+    def for_current_request(cls) -> _TokenRelay | None:
+        """A relay for the request being handled, if its client asked for progress."""
+        ctx = request_ctx.get(None)
+        if ctx is None or ctx.meta is None or ctx.meta.progressToken is None:
+            return None
+        return cls(ctx.session, ctx.meta.progressToken, ctx.request_id)
+
+    async def __call__(self, text: str) -> None:
+        self._pending.append(text)
+        if time.monotonic() - self._sent_at >= STREAM_FLUSH_SECONDS:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+        self.chars += len(text)
+        self._sent_at = time.monotonic()
+        await self._session.send_progress_notification(
+            self._token, self.chars, message=text, related_request_id=self._request_id
+        )
+
+
+class PMKitServer(Server):
+    """MCP server that can tell connected clients the tool list has changed.
+
+    Advertises the ``tools.listChanged`` capability and remembers every
+    session that has sent a request, so :meth:`notify_tools_changed` can
+    reach them after a hot reload. Per-session counters live in
+    :attr:`sessions` (see :mod:`pmkit_mcp.sessions`), and the scheduler of
+    autonomous workflows, once started, in :attr:`scheduler`.
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.sessions = SessionRegistry()
+        self.scheduler: Scheduler | None = None
+
+    def create_initialization_options(
+        self,
+        notification_options: NotificationOptions | None = None,
+        experimental_capabilities: dict[str, dict[str, Any]] | None = None,
+    ) -> InitializationOptions:
+        return super().create_initialization_options(
+            notification_options or NotificationOptions(tools_changed=True),
+            experimental_capabilities,
+        )
 
-        return tools
+    def remember_session(self) -> SessionState:
+        """Record the session of the request being handled and return its state."""
+        return self.sessions.current()
 
-    @server.call_tool()
-    async def call_tool(name: str, arguments: dict[str, Any] | None) -> list[TextContent]:
+    async def notify_tools_changed(self, result: ReloadResult | None = None) -> int:
+        """Send ``notifications/tools/list_changed`` to every known session.
+
+        Returns:
+            The number of sessions notified.
+        """
+        sent = 0
+        for session in self.sessions.sessions():
+            try:
+                await session.send_tool_list_changed()
+                sent += 1
+            except Exception:
+                # The client went away; stop tracking it.
+                self.sessions.discard(session)
+        return sent
+
+
+def create_server(
+    response_mode: str = DEFAULT_RESPONSE_MODE,
+    render_cache: RenderCache | None = None,
+    metrics: ServerMetrics | None = None,
+    context_store: ContextStore | None = None,
+    argument_drafts: ArgumentDrafts | None = None,
+    executor: LLMExecutor | None = None,
+    result_cache: ResultCache | None = None,
+    profiles: ProfileStore | None = None,
+    passage_cache: PassageIndexCache | None = None,
+) -> PMKitServer:
+    """Create and configure the PM Kit MCP server with all tools registered.
+
+    Args:
+        response_mode: How rendered prompts are encoded in tool results; one of
+            ``json`` (single indented JSON block), ``blocks`` or ``structured``.
+            See :mod:`pmkit_mcp.responses`.
+        render_cache: Optional cache of encoded workflow results keyed by
+            workflow, registry version and arguments. Callers can bypass it per
+            call by passing ``pmkit_no_cache: true``.
+        metrics: Per-tool metrics to record into. A fresh
+            :class:`~pmkit_mcp.metrics.ServerMetrics` is used if omitted; pass
+            one in to export it (see :func:`metrics_exporter`).
+        context_store: Store behind ``pmkit_put_context`` and ``ref:`` field
+            values. A store with the default limits is used if omitted.
+        argument_drafts: Partially filled arguments of calls made with
+            ``pmkit_session: true``. Default limits are used if omitted.
+        executor: If given, workflow calls and batches run the rendered prompts
+            on this LLM endpoint and return the model output. Callers can opt
+            out per call with ``pmkit_execute: false``.
+        result_cache: Persistent cache of model outputs keyed by the rendered
+            prompts and model parameters; used with ``executor``. Bypassed by
+            ``pmkit_no_cache: true``.
+        profiles: Per-client values of recurring fields (tenant, user,
+            product), learned from calls and filled into later calls that
+            leave them out. Explicit arguments always win.
+        passage_cache: Indexes of long source documents reused across calls
+            (see :mod:`pmkit_mcp.passages`). Documents are indexed per call
+            if omitted.
+    """
+    if response_mode not in RESPONSE_MODES:
+        raise ValueError(f"Unknown response mode: {response_mode!r}")
+    server = PMKitServer("pmkit-mcp-server")
+    metrics = metrics if metrics is not None else ServerMetrics(known_tools=is_known_tool)
+    context_store = context_store if context_store is not None else make_context_store()
+    drafts = argument_drafts if argument_drafts is not None else ArgumentDrafts()
+
+    @server.list_tools()
+    async def list_tools(request: ListToolsRequest) -> ListToolsResult:
+        server.remember_session()
+        tool_metrics = metrics.tool(LIST_TOOLS)
+        tool_metrics.calls += 1
+        start = time.perf_counter()
+        manifest = get_tool_manifest()
+        result = ListToolsResult(tools=manifest.tools, _meta=manifest.meta)
+        tool_metrics.latency.observe(time.perf_counter() - start)
+        return result
+
+    # Required fields are checked by the handler, which answers with the list of
+    # missing fields (and merges session drafts first) instead of a schema error.
+    @server.call_tool(validate_input=False)
+    async def call_tool(
+        name: str, arguments: dict[str, Any] | None
+    ) -> list[TextContent] | CallToolResult:
         arguments = arguments or {}
+        server.remember_session()
+        tool_metrics = metrics.tool(name)
+        tool_metrics.calls += 1
+        tool_metrics.in_flight += 1
+        tool_metrics.argument_bytes.observe(argument_bytes(arguments))
+        start = time.perf_counter()
+        try:
+            result = await _dispatch(name, arguments)
+        except Exception:
+            tool_metrics.errors += 1
+            raise
+        finally:
+            tool_metrics.in_flight -= 1
+            tool_metrics.latency.observe(time.perf_counter() - start)
+        if _is_error_result(result):
+            tool_metrics.errors += 1
+        return result
 
+    async def _dispatch(name: str, arguments: dict[str, Any]) -> list[TextContent] | CallToolResult:
         # --- Help tool ---
         if name == "pmkit_help":
-            return [TextContent(type="text", text=_build_help_text())]
+            return [TextContent(type="text", text=get_help_text())]
 
         # --- Workflow details tool ---
         if name == "pmkit_workflow_details":
@@ -199,10 +708,94 @@ def create_server() -> Server:
             return [
                 TextContent(
                     type="text",
-                    text=build_field_summary(WORKFLOW_REGISTRY[wf_id]),
+                    text=get_workflow_details(wf_id),
                 )
             ]
 
+        # --- Batch render tool ---
+        if name == "pmkit_render_batch":
+            execute = executor is not None and arguments.get("execute", True) is not False
+            raw_items = arguments.get("items", [])
+            if not isinstance(raw_items, list):
+                return [TextContent(type="text", text="`items` must be a list.")]
+            if len(raw_items) > MAX_BATCH_ITEMS:
+                return [
+                    TextContent(
+                        type="text",
+                        text=f"Batch too large: {len(raw_items)} items (max {MAX_BATCH_ITEMS}).",
+                    )
+                ]
+            # Malformed entries become per-item errors; the rest are rendered.
+            results: list[BatchItemResult] = []
+            positions: list[int] = []
+            items = []
+            for i, item in enumerate(raw_items):
+                wf_id = item.get("workflow_id", "") if isinstance(item, dict) else ""
+                item_args = (item.get("arguments") or {}) if isinstance(item, dict) else None
+                if not isinstance(wf_id, str) or not isinstance(item_args, dict):
+                    error = "Each item must be an object with `workflow_id` and `arguments`."
+                    results.append(BatchItemResult(i, str(wf_id), error=error))
+                    continue
+                positions.append(i)
+                items.append((wf_id, await _fill_profile(wf_id, item_args, learn=False)))
+            # Rendering is CPU-bound; keep the event loop free for other sessions.
+            rendered_items = await asyncio.to_thread(
+                render_batch, items, context_store=context_store, passage_cache=passage_cache
+            )
+            results += (replace(r, index=i) for i, r in zip(positions, rendered_items))
+            results.sort(key=lambda r: r.index)
+            session = server.remember_session()
+            for result in results:
+                session.context_refs += result.context_refs
+                session.context_bytes_saved += result.context_bytes_saved
+            if not execute:
+                return build_batch_response(results)
+
+            async def run(item: Any) -> Completion | ExecutorError:
+                try:
+                    return await _run_model(item.workflow, item.rendered)
+                except ExecutorError as e:
+                    return e
+
+            # The executor bounds how many of these reach the model at once.
+            ready = [r for r in results if r.rendered is not None]
+            outputs = await asyncio.gather(*(run(r) for r in ready))
+            return build_batch_response(results, {r.index: o for r, o in zip(ready, outputs)})
+
+        # --- Context upload tool ---
+        if name == "pmkit_put_context":
+            content = arguments.get("content")
+            if not isinstance(content, str) or not content:
+                return [TextContent(type="text", text="`content` must be a non-empty string.")]
+            # Hashing and spilling to disk are CPU/IO-bound for large inputs.
+            digest, size = await asyncio.to_thread(context_store.put, content)
+            session = server.remember_session()
+            session.context_uploads += 1
+            session.context_bytes_uploaded += size
+            payload = {
+                "ref": REF_PREFIX + digest,
+                "bytes": size,
+                "session": session.snapshot(),
+            }
+            return [TextContent(type="text", text=dumps(payload))]
+
+        # --- Stats tool ---
+        if name == "pmkit_stats":
+            cache_stats = render_cache.stats() if render_cache is not None else None
+            stats = metrics.snapshot(cache_stats)
+            stats["context_store"] = context_store.stats()
+            stats["argument_drafts"] = drafts.stats()
+            stats["sessions"] = server.sessions.snapshot()
+            stats["executor"] = executor.stats() if executor is not None else None
+            if result_cache is not None:
+                stats["result_cache"] = await asyncio.to_thread(result_cache.stats)
+            if server.scheduler is not None:
+                stats["scheduler"] = server.scheduler.stats()
+            if profiles is not None:
+                stats["profiles"] = profiles.stats()
+            stats["passage_index"] = passage_cache.stats() if passage_cache is not None else None
+            return [TextContent(type="text", text=dumps(stats, indent=True))]
+
         # --- Workflow tools ---
         if name not in WORKFLOW_REGISTRY:
             return [
@@ -215,54 +808,726 @@ def create_server() -> Server:
                 )
             ]
 
-        workflow = WORKFLOW_REGISTRY[name]
+        arguments, bypass_cache = _pop_flag(arguments, NO_CACHE_ARGUMENT)
+        arguments, use_draft = _pop_flag(arguments, SESSION_ARGUMENT)
+        arguments, reset_draft = _pop_flag(arguments, RESET_SESSION_ARGUMENT)
+        arguments, execute = _pop_flag(arguments, EXECUTE_ARGUMENT, default=True)
+        execute = execute and executor is not None
+
+        # Session mode: merge this call's fields into the ones sent earlier
+        if use_draft or reset_draft:
+            session = server.remember_session()
+            if reset_draft:
+                drafts.discard(session.label, name)
+            if use_draft:
+                arguments, reused = drafts.merge(session.label, name, arguments)
+                session.draft_calls += 1
+                session.draft_bytes_reused += reused
+
+        # Recurring fields the client sent before come from its profile
+        arguments = await _fill_profile(name, arguments)
 
-        # Conversational pattern: if required fields missing, ask for them
-        missing_msg = build_missing_fields_message(workflow, arguments)
-        if missing_msg:
-            return [TextContent(type="text", text=missing_msg)]
+        # Identical repeat calls (retries, reconnects) are served from the render cache.
+        # Refs are content hashes, so keying on them before resolving is safe and cheap.
+        # Model output is not cached here; only rendered prompts are.
+        key = None
+        if render_cache is not None and not bypass_cache and not execute:
+            key = cache_key(name, WORKFLOW_REGISTRY.version, arguments, response_mode)
+            cached = render_cache.get(key)
+            if cached is not None:
+                return cached
 
-        # All required fields present: render the prompt
-        system_prompt, user_prompt = render_prompt(workflow, arguments)
+        # Substitute uploaded context for ref:<sha256> values
+        if has_refs(arguments):
+            try:
+                # Spilled blobs are read from disk; keep that off the event loop.
+                resolved = await asyncio.to_thread(resolve_refs, arguments, context_store)
+            except ContextRefError as e:
+                return [TextContent(type="text", text=str(e))]
+            session = server.remember_session()
+            session.context_refs += resolved.refs
+            session.context_bytes_saved += resolved.bytes_saved
+            arguments = resolved.arguments
+
+        # Conversational pattern: if required fields are missing, ask for them. Clients
+        # that support elicitation are asked within this call; others get the message
+        # plus a schema of the missing fields to resume with.
+        summary = WORKFLOW_REGISTRY.summary(name)
+        schema = build_missing_fields_schema(summary, arguments)
+        if schema is not None:
+            values = await _elicit(summary, schema)
+            if values:
+                if use_draft:
+                    drafts.merge(server.remember_session().label, name, values)
+                arguments = await _fill_profile(name, {**arguments, **values})
+                # The cache key describes the incomplete call; don't store under it.
+                key = None
+                schema = build_missing_fields_schema(summary, arguments)
+        missing_msg = build_missing_fields_message(summary, arguments) if schema else None
+        if schema is not None and missing_msg:
+            if use_draft:
+                missing_msg += _DRAFT_NOTE
+            return build_needs_input_response(summary, missing_msg, schema)
+
+        # All required fields present: load the prompts (if not yet loaded) and render
+        workflow = WORKFLOW_REGISTRY[name]
+        # Preprocessing and passage selection are CPU-bound for large pastes.
+        rendered = await asyncio.to_thread(render_workflow, workflow, arguments, passage_cache)
+
+        if execute:
+            relay = _TokenRelay.for_current_request()
+            try:
+                completion = await _run_model(workflow, rendered, relay, not bypass_cache)
+            except ExecutorError as e:
+                return _error_result(str(e))
+            finally:
+                if relay is not None:
+                    await relay.flush()
+            return build_execution_response(workflow, rendered, completion, response_mode)
 
         # Return structured output so the client can use system + user prompts
-        result = {
-            "workflow": workflow.name,
-            "output_format": workflow.output_format,
-            "system_prompt": system_prompt,
-            "user_prompt": user_prompt,
+        response = build_workflow_response(workflow, rendered, response_mode)
+        if render_cache is not None and key is not None:
+            render_cache.put(key, response)
+        return response
+
+    async def _elicit(workflow: WorkflowSummary, schema: dict[str, Any]) -> dict[str, str]:
+        """Ask the user for the fields in ``schema``, if the client supports elicitation.
+
+        Returns:
+            The values given, or an empty dict if the client cannot elicit, or
+            the user declined or cancelled.
+        """
+        ctx = request_ctx.get(None)
+        if ctx is None or not ctx.session.check_client_capability(
+            ClientCapabilities(elicitation=ElicitationCapability())
+        ):
+            return {}
+        message = f"{workflow.name} needs a few more details to continue."
+        try:
+            result = await ctx.session.elicit(message, schema, ctx.request_id)
+        except Exception as e:
+            logger.warning("Elicitation for %s failed, answering with text: %s", workflow.id, e)
+            return {}
+        if result.action != "accept" or not result.content:
+            return {}
+        return {
+            k: str(v)
+            for k, v in result.content.items()
+            if k in schema["properties"] and v not in (None, "")
         }
 
-        return [
-            TextContent(
-                type="text",
-                text=json.dumps(result, indent=2),
+    async def _fill_profile(
+        name: str, arguments: dict[str, Any], learn: bool = True
+    ) -> dict[str, Any]:
+        """Learn profile fields from ``arguments`` and fill in the ones left out.
+
+        Batch items are filled but not learned from: one batch may cover
+        several people, and the last item would become the caller's profile.
+        """
+        if profiles is None or name not in WORKFLOW_REGISTRY:
+            return arguments
+        identity = client_identity()
+        if identity is None:
+            return arguments
+        summary = WORKFLOW_REGISTRY.summary(name)
+
+        def update() -> dict[str, Any]:
+            if learn:
+                profiles.learn(identity, arguments)
+            return profiles.fill(identity, summary, arguments)
+
+        # The profile file is read and rewritten; keep that off the event loop.
+        return await asyncio.to_thread(update)
+
+    async def _run_model(
+        workflow: WorkflowSummary,
+        rendered: RenderedPrompt,
+        on_token: TokenCallback | None = None,
+        use_cache: bool = True,
+    ) -> Completion:
+        """Execute a rendered workflow, answering repeats from the result cache."""
+        if executor is None:
+            raise ExecutorError("No LLM endpoint is configured")
+        key = None
+        if result_cache is not None and use_cache:
+            params = executor.settings.model_params()
+            key = result_key(rendered.system_prompt, rendered.user_prompt, params)
+            # SQLite may wait on another process's write; keep that off the event loop.
+            hit = await asyncio.to_thread(result_cache.get, key)
+            if hit is not None:
+                text, model = hit
+                if on_token is not None:
+                    await on_token(text)
+                return Completion(text, model, attempts=0, latency=0.0, cached=True)
+        completion = await executor.execute(rendered, on_token)
+        if result_cache is not None and key is not None:
+            await asyncio.to_thread(
+                result_cache.put,
+                key,
+                workflow.id,
+                workflow.category,
+                completion.text,
+                completion.model,
             )
-        ]
+        return completion
 
     return server
 
 
-async def run_server() -> None:
-    """Run the MCP server using stdio transport."""
-    server = create_server()
+def load_catalogs(directories: Sequence[str]) -> None:
+    """Register the workflows of each external catalog directory (see ``--catalog``)."""
+    for directory in directories:
+        count = register_catalog(WORKFLOW_REGISTRY, directory)
+        logger.info("Registered %d workflow(s) from catalog %s", count, directory)
+
+
+def metrics_exporter(
+    metrics: ServerMetrics, render_cache: RenderCache | None = None
+) -> Callable[[], str]:
+    """Return a callable rendering ``metrics`` (and cache stats) as Prometheus text."""
+
+    def render() -> str:
+        cache_stats = render_cache.stats() if render_cache is not None else None
+        return render_prometheus(metrics, cache_stats)
+
+    return render
+
+
+def start_watcher(
+    server: PMKitServer,
+    catalogs: Sequence[str] = (),
+    interval: float = DEFAULT_WATCH_INTERVAL,
+) -> asyncio.Task[None]:
+    """Start hot reload of workflow sources; clients are told when tools change."""
+    watcher = WorkflowWatcher(WORKFLOW_REGISTRY, catalogs)
+    logger.info("Watching workflow definitions for changes every %.1fs", interval)
+    return asyncio.create_task(watcher.run(server.notify_tools_changed, interval))
+
+
+def start_scheduler(
+    server: PMKitServer,
+    jobs: Sequence[ScheduledJob],
+    max_concurrency: int = DEFAULT_SCHEDULE_CONCURRENCY,
+    jitter: float = DEFAULT_JITTER_SECONDS,
+    catch_up: float = DEFAULT_CATCH_UP_SECONDS,
+    ledger: Ledger | None = None,
+) -> asyncio.Task[None]:
+    """Start running scheduled workflow calls (see :mod:`pmkit_mcp.scheduler`).
+
+    Each run is an ordinary tool call on ``server``, so its result lands in
+    the same render or result cache that a client's identical call reads.
+    """
+    handler = server.request_handlers[CallToolRequest]
+
+    async def run_job(job: ScheduledJob, arguments: dict[str, Any]) -> None:
+        if job.workflow_id not in WORKFLOW_REGISTRY:
+            raise LookupError(f"Workflow {job.workflow_id!r} is no longer registered")
+        request = CallToolRequest(
+            method="tools/call",
+            params=CallToolRequestParams(name=job.workflow_id, arguments=arguments),
+        )
+        result = (await handler(request)).root
+        if isinstance(result, CallToolResult) and result.isError:
+            text = " ".join(c.text for c in result.content if isinstance(c, TextContent))
+            raise RuntimeError(text)
+
+    server.scheduler = Scheduler(jobs, run_job, max_concurrency, jitter, catch_up, ledger)
+    logger.info("Scheduling %d workflow job(s)", len(jobs))
+    return asyncio.create_task(server.scheduler.run())
+
+
+def unsaved_schedule_reason(
+    render_cache: RenderCache | None,
+    executor: LLMExecutor | None,
+    result_cache: ResultCache | None,
+) -> str | None:
+    """Why scheduled runs would have nowhere to keep their output, if they would not.
+
+    Executed runs are kept in the result cache and rendered runs in the
+    render cache; without it, every run is thrown away (and executed runs
+    pay for model calls whose output nobody reads).
+    """
+    if executor is not None and result_cache is None:
+        return "executed runs need --result-cache"
+    if executor is None and render_cache is None:
+        return "rendered runs need --render-cache-mb"
+    return None
+
+
+def schedule_ledger(
+    executor: LLMExecutor | None, result_cache: ResultCache | None
+) -> Ledger | None:
+    """Where scheduled runs are claimed: the shared result cache when executing.
+
+    Executed outputs go to the shared result cache, so one process running a
+    job serves every worker. Rendered prompts only reach each process's own
+    render cache, so then every process runs its jobs (in-memory ledger).
+    """
+    return result_cache if executor is not None else None
+
+
+async def run_server(
+    response_mode: str = DEFAULT_RESPONSE_MODE,
+    render_cache: RenderCache | None = None,
+    metrics_file: str | None = None,
+    metrics_interval: float = 15.0,
+    metrics_port: int = 0,
+    watch: bool = False,
+    catalogs: Sequence[str] = (),
+    watch_interval: float = DEFAULT_WATCH_INTERVAL,
+    context_store: ContextStore | None = None,
+    argument_drafts: ArgumentDrafts | None = None,
+    executor: LLMExecutor | None = None,
+    result_cache: ResultCache | None = None,
+    schedule: Sequence[ScheduledJob] = (),
+    schedule_concurrency: int = DEFAULT_SCHEDULE_CONCURRENCY,
+    schedule_jitter: float = DEFAULT_JITTER_SECONDS,
+    schedule_catch_up: float = DEFAULT_CATCH_UP_SECONDS,
+    profiles: ProfileStore | None = None,
+    passage_cache: PassageIndexCache | None = None,
+) -> None:
+    """Run the MCP server using stdio transport.
+
+    Args:
+        response_mode: See :func:`create_server`.
+        render_cache: See :func:`create_server`.
+        metrics_file: If set, rewrite this file with Prometheus-text metrics
+            every ``metrics_interval`` seconds and on shutdown.
+        metrics_interval: Seconds between metrics file dumps.
+        metrics_port: If non-zero, serve ``GET /metrics`` on ``127.0.0.1`` at this port.
+        watch: Reload edited workflow definitions without restarting (see
+            :mod:`pmkit_mcp.workflows.watch`).
+        catalogs: Catalog directories already registered, to watch as well.
+        watch_interval: Seconds between checks for edits.
+        context_store: See :func:`create_server`. Closed (removing spilled
+            blobs) on shutdown.
+        argument_drafts: See :func:`create_server`.
+        executor: See :func:`create_server`. Closed on shutdown.
+        result_cache: See :func:`create_server`. Closed on shutdown.
+        schedule: Workflow calls to run on a cron schedule; see
+            :func:`start_scheduler`. Not started unless their output has a
+            cache to go to (see :func:`unsaved_schedule_reason`).
+        schedule_concurrency: Scheduled runs in flight at once.
+        schedule_jitter: Seconds by which each scheduled run is randomly delayed.
+        schedule_catch_up: Runs missed by at most this many seconds are made up.
+        profiles: See :func:`create_server`.
+        passage_cache: See :func:`create_server`.
+    """
+    metrics = ServerMetrics(known_tools=is_known_tool)
+    context_store = context_store if context_store is not None else make_context_store()
+    server = create_server(
+        response_mode,
+        render_cache,
+        metrics,
+        context_store,
+        argument_drafts,
+        executor,
+        result_cache,
+        profiles,
+        passage_cache,
+    )
     options = server.create_initialization_options()
+    exporter = metrics_exporter(metrics, render_cache)
 
-    async with stdio_server() as (read_stream, write_stream):
-        logger.info("PM Kit MCP Server starting on stdio...")
-        await server.run(read_stream, write_stream, options)
+    if metrics_port:
+        serve_metrics("127.0.0.1", metrics_port, exporter)
+        logger.info("Serving metrics on http://127.0.0.1:%d/metrics", metrics_port)
+    tasks = []
+    if metrics_file:
+        tasks.append(
+            asyncio.create_task(dump_metrics_periodically(metrics_file, exporter, metrics_interval))
+        )
+    if watch:
+        tasks.append(start_watcher(server, catalogs, watch_interval))
+    unsaved = unsaved_schedule_reason(render_cache, executor, result_cache) if schedule else None
+    if unsaved:
+        logger.warning("Not starting the scheduler: %s", unsaved)
+    elif schedule:
+        tasks.append(
+            start_scheduler(
+                server,
+                schedule,
+                schedule_concurrency,
+                schedule_jitter,
+                schedule_catch_up,
+                schedule_ledger(executor, result_cache),
+            )
+        )
 
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            logger.info("PM Kit MCP Server starting on stdio...")
+            await server.run(read_stream, write_stream, options)
+    finally:
+        for task in tasks:
+            task.cancel()
+        context_store.close()
+        if executor is not None:
+            await executor.aclose()
+        if result_cache is not None:
+            result_cache.close()
 
-def main() -> None:
-    """Entry point for the pmkit-mcp command."""
-    import asyncio
 
+def _at_least_one(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pmkit-mcp",
+        description="PM Kit MCP server exposing product management workflows as tools.",
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "http"],
+        default="stdio",
+        help="Transport to serve (default: stdio)",
+    )
+    parser.add_argument(
+        "--response-mode",
+        choices=RESPONSE_MODES,
+        default=DEFAULT_RESPONSE_MODE,
+        help=(
+            "Encoding of rendered prompts: one JSON block (json), separate text blocks "
+            "(blocks), or text blocks plus structuredContent metadata (structured)"
+        ),
+    )
+    parser.add_argument(
+        "--catalog",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Also serve the workflows of this catalog directory (repeatable)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Reload edited workflow definitions and catalogs without restarting",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL,
+        help=f"Seconds between checks for edits with --watch (default: {DEFAULT_WATCH_INTERVAL})",
+    )
+    parser.add_argument(
+        "--render-cache-mb",
+        type=float,
+        default=0,
+        help="Cache rendered results for identical calls, up to this many MB (0 = off)",
+    )
+    parser.add_argument(
+        "--passage-index-mb",
+        type=float,
+        default=DEFAULT_PASSAGE_INDEX_MB,
+        help=(
+            "Cache passage indexes of long source documents, up to this many MB "
+            f"(0 = off, default: {DEFAULT_PASSAGE_INDEX_MB})"
+        ),
+    )
+    parser.add_argument(
+        "--profiles",
+        metavar="FILE",
+        help=(
+            "JSON file of per-client tenant/user/product values, learned from calls "
+            "and filled into calls that leave them out (over HTTP, per authenticated user)"
+        ),
+    )
+    parser.add_argument(
+        "--noise-patterns",
+        metavar="FILE",
+        help=(
+            "Extra regular expressions, one per line, for lines the 'noise' stage "
+            "drops from pasted fields"
+        ),
+    )
+    context = parser.add_argument_group("context store (pmkit_put_context)")
+    context.add_argument(
+        "--context-memory-mb",
+        type=float,
+        default=DEFAULT_MEMORY_MB,
+        help=(
+            "Uploaded context kept in memory before spilling to disk, in MB "
+            f"(default: {DEFAULT_MEMORY_MB})"
+        ),
+    )
+    context.add_argument(
+        "--context-disk-mb",
+        type=float,
+        default=DEFAULT_DISK_MB,
+        help=f"Spilled context kept on disk before evicting, in MB (default: {DEFAULT_DISK_MB})",
+    )
+    context.add_argument(
+        "--context-ttl",
+        type=float,
+        default=DEFAULT_TTL_SECONDS,
+        help=f"Seconds an unused upload is kept (default: {DEFAULT_TTL_SECONDS:g})",
+    )
+    context.add_argument(
+        "--context-spill-dir",
+        help=(
+            "Directory under which spilled context is kept, in a per-process subdirectory "
+            "removed on exit (default: the system temporary directory)"
+        ),
+    )
+    drafts = parser.add_argument_group("session drafts (pmkit_session)")
+    drafts.add_argument(
+        "--session-drafts-mb",
+        type=float,
+        default=DEFAULT_DRAFTS_MB,
+        help=f"Memory for partially filled arguments, in MB (default: {DEFAULT_DRAFTS_MB})",
+    )
+    drafts.add_argument(
+        "--session-ttl",
+        type=float,
+        default=DEFAULT_DRAFT_TTL_SECONDS,
+        help=(
+            "Seconds an untouched draft of partially filled arguments is kept "
+            f"(default: {DEFAULT_DRAFT_TTL_SECONDS:g})"
+        ),
+    )
+    llm = parser.add_argument_group(
+        "llm execution", "Run rendered prompts on the server (API key from $PMKIT_LLM_API_KEY)"
+    )
+    llm.add_argument(
+        "--llm-url",
+        help="OpenAI/Anthropic-compatible endpoint including version, e.g. http://localhost:8080/v1",
+    )
+    llm.add_argument("--llm-model", default="", help="Model name to request")
+    llm.add_argument(
+        "--llm-api", choices=API_STYLES, default="openai", help="Request dialect (default: openai)"
+    )
+    llm.add_argument(
+        "--llm-concurrency", type=int, default=4, help="Model requests in flight (default: 4)"
+    )
+    llm.add_argument(
+        "--llm-retries", type=int, default=3, help="Retries for failed requests (default: 3)"
+    )
+    llm.add_argument(
+        "--llm-timeout", type=float, default=120.0, help="Seconds without progress (default: 120)"
+    )
+    llm.add_argument(
+        "--llm-max-tokens", type=int, default=4096, help="Output token limit (default: 4096)"
+    )
+    llm.add_argument(
+        "--result-cache",
+        metavar="PATH",
+        help="SQLite file caching model outputs; may be shared by several servers",
+    )
+    llm.add_argument(
+        "--result-cache-mb",
+        type=float,
+        default=DEFAULT_RESULT_CACHE_MB,
+        help=f"Size bound of the result cache in MB (default: {DEFAULT_RESULT_CACHE_MB})",
+    )
+    llm.add_argument(
+        "--result-ttl",
+        default="",
+        metavar="NAME=SECONDS,...",
+        help=(
+            "Result freshness by workflow id or category, e.g. daily_brief=3600,on-demand=604800 "
+            "(defaults: autonomous 3h, beta 1d, on-demand 7d)"
+        ),
+    )
+    clustering = parser.add_argument_group("feedback clustering (voc_clustering, needs numpy)")
+    clustering.add_argument(
+        "--cluster-min-lines",
+        type=int,
+        default=0,
+        help=(
+            "Replace feedback fields with at least this many lines by locally computed "
+            "themes with counts and quotes (0 = off)"
+        ),
+    )
+    clustering.add_argument(
+        "--clusters",
+        type=_at_least_one,
+        default=DEFAULT_MAX_CLUSTERS,
+        help=f"Most themes per clustered field (default: {DEFAULT_MAX_CLUSTERS})",
+    )
+    scheduling = parser.add_argument_group(
+        "scheduler", "Pre-render or pre-execute workflows on a cron schedule"
+    )
+    scheduling.add_argument(
+        "--schedule",
+        metavar="FILE",
+        help="JSON file of scheduled workflow jobs (see pmkit_mcp.scheduler)",
+    )
+    scheduling.add_argument(
+        "--schedule-concurrency",
+        type=int,
+        default=DEFAULT_SCHEDULE_CONCURRENCY,
+        help=f"Scheduled runs in flight at once (default: {DEFAULT_SCHEDULE_CONCURRENCY})",
+    )
+    scheduling.add_argument(
+        "--schedule-jitter",
+        type=float,
+        default=DEFAULT_JITTER_SECONDS,
+        help=f"Max random delay of each run, in seconds (default: {DEFAULT_JITTER_SECONDS:g})",
+    )
+    scheduling.add_argument(
+        "--schedule-catch-up",
+        type=float,
+        default=DEFAULT_CATCH_UP_SECONDS,
+        help=(
+            "Make up runs missed while down by at most this many seconds "
+            f"(default: {DEFAULT_CATCH_UP_SECONDS:g})"
+        ),
+    )
+    observability = parser.add_argument_group("metrics")
+    observability.add_argument(
+        "--metrics-file",
+        help="Periodically write Prometheus-text metrics to this file",
+    )
+    observability.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=15.0,
+        help="Seconds between metrics file writes (default: 15)",
+    )
+    observability.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="Serve GET /metrics on 127.0.0.1 at this port (stdio transport; 0 = off)",
+    )
+    http = parser.add_argument_group("http transport")
+    http.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    http.add_argument("--port", type=int, default=8000, help="Port to bind")
+    http.add_argument("--path", default="/mcp", help="URL path of the MCP endpoint")
+    http.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    http.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=64,
+        help="Max concurrent requests per worker before answering 503 (0 = unlimited)",
+    )
+    http.add_argument(
+        "--keep-alive", type=int, default=30, help="Idle keep-alive timeout in seconds"
+    )
+    http.add_argument(
+        "--stateless",
+        action="store_true",
+        help="Do not track sessions (implied when --workers > 1)",
+    )
+    http.add_argument(
+        "--json-response",
+        action="store_true",
+        help="Reply with JSON bodies instead of SSE streams",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for the pmkit-mcp command."""
+    args = _parse_args(argv)
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
         stream=sys.stderr,
     )
-    asyncio.run(run_server())
+
+    if args.transport == "http":
+        from pmkit_mcp.http_app import HttpSettings, run_http
+
+        settings = HttpSettings(
+            host=args.host,
+            port=args.port,
+            path=args.path,
+            workers=args.workers,
+            max_concurrency=args.max_concurrency,
+            keep_alive=args.keep_alive,
+            stateless=args.stateless,
+            json_response=args.json_response,
+            response_mode=args.response_mode,
+            render_cache_mb=args.render_cache_mb,
+            passage_index_mb=args.passage_index_mb,
+            metrics_file=args.metrics_file or "",
+            metrics_interval=args.metrics_interval,
+            catalog=os.pathsep.join(args.catalog),
+            watch=args.watch,
+            watch_interval=args.watch_interval,
+            context_memory_mb=args.context_memory_mb,
+            context_disk_mb=args.context_disk_mb,
+            context_ttl=args.context_ttl,
+            context_spill_dir=args.context_spill_dir or "",
+            session_drafts_mb=args.session_drafts_mb,
+            session_ttl=args.session_ttl,
+            llm_url=args.llm_url or "",
+            llm_model=args.llm_model,
+            llm_api=args.llm_api,
+            llm_concurrency=args.llm_concurrency,
+            llm_retries=args.llm_retries,
+            llm_timeout=args.llm_timeout,
+            llm_max_tokens=args.llm_max_tokens,
+            result_cache=args.result_cache or "",
+            result_cache_mb=args.result_cache_mb,
+            result_ttl=args.result_ttl,
+            profiles=args.profiles or "",
+            noise_patterns=args.noise_patterns or "",
+            cluster_min_lines=args.cluster_min_lines,
+            clusters=args.clusters,
+            schedule=args.schedule or "",
+            schedule_concurrency=args.schedule_concurrency,
+            schedule_jitter=args.schedule_jitter,
+            schedule_catch_up=args.schedule_catch_up,
+        )
+        logger.info(
+            "PM Kit MCP Server starting on http://%s:%d%s (%d worker(s), stateless=%s)",
+            settings.host,
+            settings.port,
+            settings.path,
+            settings.workers,
+            settings.stateless,
+        )
+        run_http(settings)
+        return
+
+    load_catalogs(args.catalog)
+    if args.noise_patterns:
+        load_noise_patterns(args.noise_patterns)
+    configure_clustering(make_cluster_settings(args.cluster_min_lines, args.clusters))
+    asyncio.run(
+        run_server(
+            args.response_mode,
+            make_render_cache(args.render_cache_mb),
+            metrics_file=args.metrics_file,
+            metrics_interval=args.metrics_interval,
+            metrics_port=args.metrics_port,
+            watch=args.watch,
+            catalogs=args.catalog,
+            watch_interval=args.watch_interval,
+            context_store=make_context_store(
+                args.context_memory_mb,
+                args.context_disk_mb,
+                args.context_ttl,
+                args.context_spill_dir,
+            ),
+            argument_drafts=make_argument_drafts(args.session_drafts_mb, args.session_ttl),
+            executor=make_executor(
+                args.llm_url,
+                args.llm_model,
+                args.llm_api,
+                max_concurrency=args.llm_concurrency,
+                max_retries=args.llm_retries,
+                timeout=args.llm_timeout,
+                max_tokens=args.llm_max_tokens,
+            ),
+            result_cache=make_result_cache(
+                args.result_cache, args.result_cache_mb, args.result_ttl
+            ),
+            schedule=load_schedule(args.schedule) if args.schedule else (),
+            schedule_concurrency=args.schedule_concurrency,
+            schedule_jitter=args.schedule_jitter,
+            schedule_catch_up=args.schedule_catch_up,
+            profiles=make_profile_store(args.profiles),
+            passage_cache=make_passage_index_cache(args.passage_index_mb),
+        )
+    )
 
 
 if __name__ == "__main__":
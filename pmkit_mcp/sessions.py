@@ -0,0 +1,200 @@
+"""Per-session state kept by the server.
+
+Rendering itself is stateless, but a few features work per client session:
+
+- :class:`SessionRegistry` holds counters for each session, such as
+  context-store savings. It is keyed weakly by the MCP session object, so the
+  counters disappear with the session. Requests handled outside a session
+  (direct handler calls in tests or embedding) share a single ``local`` state.
+- :class:`ArgumentDrafts` holds the partially filled arguments of workflow
+  calls made with ``pmkit_session: true``. A follow-up call then only sends
+  the fields that changed or were missing.
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from mcp.server.lowlevel.server import request_ctx
+from mcp.server.session import ServerSession
+
+
+@dataclass
+class SessionState:
+    """Counters for one client session.
+
+    Attributes:
+        label: Short, stable name for reporting (``session-1``, ...).
+        context_uploads: ``pmkit_put_context`` calls.
+        context_bytes_uploaded: Bytes received through ``pmkit_put_context``.
+        context_refs: ``ref:`` values resolved in workflow arguments.
+        context_bytes_saved: Bytes not sent thanks to those references.
+        draft_calls: Workflow calls merged into a stored argument draft.
+        draft_bytes_reused: Argument bytes taken from drafts instead of resent.
+    """
+
+    label: str
+    context_uploads: int = 0
+    context_bytes_uploaded: int = 0
+    context_refs: int = 0
+    context_bytes_saved: int = 0
+    draft_calls: int = 0
+    draft_bytes_reused: int = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        data = asdict(self)
+        del data["label"]
+        return data
+
+
+class SessionRegistry:
+    """Weakly-keyed map from live MCP sessions to their :class:`SessionState`."""
+
+    def __init__(self) -> None:
+        self._states: weakref.WeakKeyDictionary[ServerSession, SessionState] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._labels = itertools.count(1)
+        self._local: SessionState | None = None
+
+    def current(self) -> SessionState:
+        """Return the state of the session whose request is being handled."""
+        ctx = request_ctx.get(None)
+        if ctx is None:
+            if self._local is None:
+                self._local = SessionState("local")
+            return self._local
+        state = self._states.get(ctx.session)
+        if state is None:
+            state = self._states[ctx.session] = SessionState(f"session-{next(self._labels)}")
+        return state
+
+    def sessions(self) -> list[ServerSession]:
+        return list(self._states.keys())
+
+    def discard(self, session: ServerSession) -> None:
+        self._states.pop(session, None)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Counters of every live session (and of ``local``, if used), by label."""
+        states = list(self._states.values())
+        if self._local is not None:
+            states.append(self._local)
+        return {s.label: s.snapshot() for s in states}
+
+
+# ---------------------------------------------------------------------------
+# Argument drafts
+# ---------------------------------------------------------------------------
+
+DEFAULT_DRAFTS_MB = 64
+DEFAULT_DRAFT_TTL_SECONDS = 1800.0
+
+
+def _arguments_size(arguments: Mapping[str, Any]) -> int:
+    return sum(len(k) + len(v) if isinstance(v, str) else len(k) for k, v in arguments.items())
+
+
+@dataclass
+class _Draft:
+    arguments: dict[str, Any]
+    size: int
+    last_used: float
+
+
+class ArgumentDrafts:
+    """Partially filled workflow arguments, per (session, workflow).
+
+    Used from the event loop only, so no locking is needed.
+
+    Args:
+        max_bytes: Bound on the summed size of all drafts, in characters.
+            Least recently used drafts are dropped first.
+        ttl_seconds: Drafts not touched for this long are dropped.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_DRAFTS_MB << 20,
+        ttl_seconds: float = DEFAULT_DRAFT_TTL_SECONDS,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._drafts: OrderedDict[tuple[str, str], _Draft] = OrderedDict()  # LRU order
+        self._bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._drafts)
+
+    def merge(
+        self, session: str, workflow_id: str, patch: Mapping[str, Any]
+    ) -> tuple[dict[str, Any], int]:
+        """Apply ``patch`` on top of the stored draft and store the result.
+
+        Fields in ``patch`` replace stored values; all others are kept.
+
+        Returns:
+            The merged arguments, and the size of the stored values that the
+            caller did not have to resend.
+        """
+        now = time.monotonic()
+        self._expire(now)
+        key = (session, workflow_id)
+        previous = self._drafts.pop(key, None)
+        if previous is None:
+            merged, reused = dict(patch), 0
+        else:
+            self._bytes -= previous.size
+            merged = {**previous.arguments, **patch}
+            reused = _arguments_size(
+                {k: v for k, v in previous.arguments.items() if k not in patch}
+            )
+        size = _arguments_size(merged)
+        if size <= self.max_bytes:
+            self._drafts[key] = _Draft(merged, size, now)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._drafts.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+        return merged, reused
+
+    def discard(self, session: str, workflow_id: str) -> None:
+        draft = self._drafts.pop((session, workflow_id), None)
+        if draft is not None:
+            self._bytes -= draft.size
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.ttl_seconds
+        while self._drafts:
+            key, draft = next(iter(self._drafts.items()))
+            if draft.last_used > cutoff:
+                break
+            del self._drafts[key]
+            self._bytes -= draft.size
+            self.expirations += 1
+
+    def stats(self) -> dict[str, int]:
+        self._expire(time.monotonic())
+        return {
+            "drafts": len(self._drafts),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def make_argument_drafts(
+    megabytes: float = DEFAULT_DRAFTS_MB, ttl_seconds: float = DEFAULT_DRAFT_TTL_SECONDS
+) -> ArgumentDrafts:
+    """Build a draft store from a megabyte limit, as given on the command line."""
+    return ArgumentDrafts(int(megabytes * 1024 * 1024), ttl_seconds)
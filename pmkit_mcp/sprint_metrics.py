@@ -0,0 +1,454 @@
+"""Sprint metrics computed from pasted story lists.
+
+``sprint_review`` used to hand the model a raw story list and ask it for
+velocity, completion rate and carry-over. Adding up story points in a
+prompt is slow and often wrong, so the ``sprint_metrics`` preprocess stage
+parses the list and replaces it with computed tables.
+
+Accepted inputs:
+
+- Jira-style lines: ``ACME-342: Search filters (5 pts) [Done] @alice``.
+  Points are ``(5 pts)``, ``5 points`` or ``5sp``; the status is a
+  ``[bracketed]`` word or a known status; the assignee is ``@name``.
+- CSV or TSV exports with a header row, such as Jira's "Export CSV"
+  (``Issue key``, ``Summary``, ``Story Points``, ``Status``, ``Assignee``,
+  ``Issue Type``).
+- JSON: a list of stories, or a Jira search response (``{"issues": [...]}``)
+  with ``fields`` objects.
+
+Stories without a status count as done, since the field lists completed
+work. Any other status is carry-over. If most lines are not stories, the
+field is left as it is.
+
+Metrics are sums over columns of the parsed table, so cost is linear in the
+number of stories.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import re
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+DONE_STATUSES = frozenset(
+    {"done", "closed", "resolved", "complete", "completed", "released", "shipped", "accepted"}
+)
+KNOWN_STATUSES = DONE_STATUSES | {
+    "to do",
+    "todo",
+    "open",
+    "in progress",
+    "in review",
+    "code review",
+    "qa",
+    "testing",
+    "blocked",
+    "backlog",
+    "selected for development",
+}
+BUG_TYPES = frozenset({"bug", "defect", "incident", "hotfix"})
+# Custom fields Jira Cloud and Server commonly use for story points.
+JIRA_POINTS_FIELDS = (
+    "customfield_10016",
+    "customfield_10026",
+    "customfield_10028",
+    "customfield_10002",
+    "customfield_10004",
+)
+# Parse the field only when at least this share of its non-blank lines are stories.
+MIN_STORY_SHARE = 0.5
+
+
+@dataclass(frozen=True)
+class Story:
+    """One parsed story (or any other issue).
+
+    ``parent`` is the key of the parent issue, when an export lists one.
+    """
+
+    key: str
+    summary: str
+    points: float | None = None
+    status: str = ""
+    assignee: str = ""
+    issue_type: str = ""
+    parent: str = ""
+
+    @property
+    def done(self) -> bool:
+        return not self.status or self.status.casefold() in DONE_STATUSES
+
+    @property
+    def bug(self) -> bool:
+        return self.issue_type.casefold() in BUG_TYPES
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+ISSUE_KEY = re.compile(r"\b[A-Z][A-Z0-9]+-\d+\b")
+_POINTS = re.compile(
+    r"\(?\b(\d+(?:\.\d+)?)\s*(?:pts?|points?|sp|story points?)\b\)?", re.IGNORECASE
+)
+_BRACKET = re.compile(r"\[([^\]]{2,30})\]")
+_ASSIGNEE = re.compile(r"(?:^|\s)@([\w.-]+)")
+_BUG = re.compile(r"\b(?:bug|defect|hotfix)\b", re.IGNORECASE)
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_STATUS_WORDS = re.compile(
+    r"\s[-–—|]\s*("
+    + "|".join(re.escape(s) for s in sorted(KNOWN_STATUSES, key=len)[::-1])
+    + r")\s*$",
+    re.IGNORECASE,
+)
+
+
+def parse_story_line(line: str) -> Story | None:
+    """Parse one Jira-style line, or ``None`` if it has neither a key nor points."""
+    text = _BULLET.sub("", line).strip()
+    key_match = ISSUE_KEY.search(text)
+    points_match = _POINTS.search(text)
+    if not key_match and not points_match:
+        return None
+
+    status = assignee = issue_type = ""
+
+    def take_tag(match: re.Match[str]) -> str:
+        nonlocal status, issue_type
+        tag = match.group(1).strip()
+        if tag.casefold() in KNOWN_STATUSES:
+            status = tag
+        elif tag.casefold() in BUG_TYPES:
+            issue_type = tag
+        else:
+            return match.group(0)
+        return " "
+
+    text = _BRACKET.sub(take_tag, text)
+    if match := _ASSIGNEE.search(text):
+        assignee = match.group(1)
+        text = text[: match.start()] + " " + text[match.end() :]
+    if not status and (match := _STATUS_WORDS.search(text)):
+        status = match.group(1)
+    if not issue_type and _BUG.search(text):
+        issue_type = "Bug"
+
+    summary = text
+    for pattern in (ISSUE_KEY, _POINTS, _STATUS_WORDS):
+        summary = pattern.sub(" ", summary, count=1)
+    summary = re.sub(r"\s+", " ", summary).strip(" :-–—|,")
+    return Story(
+        key=key_match.group(0) if key_match else "",
+        summary=summary,
+        points=float(points_match.group(1)) if points_match else None,
+        status=status,
+        assignee=assignee,
+        issue_type=issue_type,
+    )
+
+
+_COLUMNS = {
+    "key": ("issue key", "key", "id", "issue id", "ticket"),
+    "summary": ("summary", "title", "name", "story"),
+    "points": (
+        "story points",
+        "custom field (story points)",
+        "custom field (story point estimate)",
+        "story point estimate",
+        "points",
+        "story_points",
+        "storypoints",
+        "estimate",
+        "sp",
+    ),
+    "status": ("status", "state"),
+    "assignee": ("assignee", "owner", "assigned to"),
+    "issue_type": ("issue type", "issuetype", "type", "issue_type"),
+    "parent": ("parent", "parent key", "parent issue", "parent_key"),
+}
+
+
+def _pick(record: Mapping[str, Any], column: str) -> Any:
+    for name in _COLUMNS[column]:
+        if record.get(name) not in (None, ""):
+            return record[name]
+    return None
+
+
+def _name(value: Any) -> str:
+    # Jira REST nests names: {"status": {"name": "Done"}}, {"assignee": {"displayName": ...}}.
+    if isinstance(value, Mapping):
+        value = (
+            value.get("displayName") or value.get("name") or value.get("value") or value.get("key")
+        )
+    return "" if value is None else str(value).strip()
+
+
+def _points(value: Any) -> float | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+def story_from_record(record: Mapping[str, Any]) -> Story | None:
+    """Build a story from a CSV row or JSON object, or ``None`` without key or summary."""
+    fields = record.get("fields")
+    if isinstance(fields, Mapping):
+        # Jira REST issue: story points live in a site-specific custom field.
+        merged = {k.casefold(): v for k, v in fields.items()}
+        if _pick(merged, "points") is None:
+            estimates = (fields.get(f) for f in JIRA_POINTS_FIELDS)
+            merged["story points"] = next((v for v in estimates if v is not None), None)
+        merged["key"] = record.get("key")
+    else:
+        merged = {str(k).strip().casefold(): v for k, v in record.items()}
+    key = _name(_pick(merged, "key"))
+    summary = _name(_pick(merged, "summary"))
+    if not key and not summary:
+        return None
+    return Story(
+        key=key,
+        summary=summary,
+        points=_points(_pick(merged, "points")),
+        status=_name(_pick(merged, "status")),
+        assignee=_name(_pick(merged, "assignee")),
+        issue_type=_name(_pick(merged, "issue_type")),
+        parent=_name(_pick(merged, "parent")),
+    )
+
+
+def _parse_json(text: str) -> list[Story] | None:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(data, Mapping):
+        data = data.get("issues") or data.get("stories") or data.get("values")
+    if not isinstance(data, list):
+        return None
+    stories = [story_from_record(r) for r in data if isinstance(r, Mapping)]
+    return [s for s in stories if s is not None]
+
+
+def _parse_table(lines: list[str]) -> list[Story] | None:
+    header = lines[0]
+    delimiter = max(",\t;", key=header.count)
+    if header.count(delimiter) == 0:
+        return None
+    names = [n.strip().casefold() for n in next(csv.reader([header], delimiter=delimiter))]
+    recognized = {c for c, aliases in _COLUMNS.items() if any(a in names for a in aliases)}
+    if not {"key", "summary"} & recognized or len(recognized) < 2:
+        return None
+    reader = csv.reader(io.StringIO("\n".join(lines[1:])), delimiter=delimiter)
+    stories = []
+    for row in reader:
+        # Keep the first of repeated columns (Jira exports repeat "Sprint", "Labels", ...).
+        record: dict[str, str] = {}
+        for name, value in zip(names, row):
+            record.setdefault(name, value)
+        if story := story_from_record(record):
+            stories.append(story)
+    return stories
+
+
+def parse_export(text: str) -> list[Story] | None:
+    """Parse a JSON or CSV/TSV export, or ``None`` if ``text`` is neither."""
+    stripped = text.strip()
+    if stripped[:1] in "[{" and (stories := _parse_json(stripped)) is not None:
+        return stories
+    lines = [line for line in stripped.splitlines() if line.strip()]
+    return _parse_table(lines) if lines else None
+
+
+def parse_stories(text: str) -> tuple[list[Story], list[str]]:
+    """Parse a pasted story list.
+
+    Returns:
+        The stories, and the non-blank lines that are not stories. For JSON
+        and CSV input the second list is empty.
+    """
+    if (stories := parse_export(text)) is not None:
+        return stories, []
+    lines = [line for line in text.splitlines() if line.strip()]
+    stories, other = [], []
+    for line in lines:
+        story = parse_story_line(line)
+        if story is None:
+            other.append(line.strip())
+        else:
+            stories.append(story)
+    return stories, other
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class AssigneeThroughput:
+    assignee: str
+    done: int
+    points: float
+    carried_over: int
+
+
+@dataclass(frozen=True)
+class SprintMetrics:
+    """Aggregates over one sprint's stories.
+
+    Attributes:
+        committed / completed / carried_over: Story counts.
+        committed_points / velocity / carried_over_points: Story point sums;
+            velocity is the points of completed stories.
+        unestimated: Stories without points.
+        bugs_fixed / bugs_open: Completed and carried-over bugs.
+        point_distribution: ``(points, completed stories)``, ascending.
+        assignees: Throughput by assignee, most points first.
+    """
+
+    committed: int
+    completed: int
+    carried_over: int
+    committed_points: float
+    velocity: float
+    carried_over_points: float
+    unestimated: int
+    bugs_fixed: int
+    bugs_open: int
+    point_distribution: tuple[tuple[float, int], ...]
+    assignees: tuple[AssigneeThroughput, ...]
+
+    @property
+    def completion_rate(self) -> float | None:
+        """Share of committed points completed, or of stories when nothing is estimated."""
+        if self.committed_points:
+            return self.velocity / self.committed_points
+        return self.completed / self.committed if self.committed else None
+
+
+def compute_metrics(stories: Iterable[Story]) -> SprintMetrics:
+    """Aggregate ``stories``."""
+    stories = list(stories)
+    # Column views of the table; every aggregate below is a sum over them.
+    done = [s.done for s in stories]
+    points = [s.points or 0.0 for s in stories]
+    bug = [s.bug for s in stories]
+
+    distribution: Counter[float] = Counter()
+    by_assignee: dict[str, list[float]] = defaultdict(lambda: [0, 0.0, 0])
+    for story, is_done, pts in zip(stories, done, points):
+        row = by_assignee[story.assignee or "Unassigned"]
+        if is_done:
+            row[0] += 1
+            row[1] += pts
+            if story.points is not None:
+                distribution[story.points] += 1
+        else:
+            row[2] += 1
+
+    return SprintMetrics(
+        committed=len(stories),
+        completed=sum(done),
+        carried_over=len(stories) - sum(done),
+        committed_points=sum(points),
+        velocity=sum(p for p, d in zip(points, done) if d),
+        carried_over_points=sum(p for p, d in zip(points, done) if not d),
+        unestimated=sum(s.points is None for s in stories),
+        bugs_fixed=sum(b and d for b, d in zip(bug, done)),
+        bugs_open=sum(b and not d for b, d in zip(bug, done)),
+        point_distribution=tuple(sorted(distribution.items())),
+        assignees=tuple(
+            sorted(
+                (
+                    AssigneeThroughput(name, int(r[0]), r[1], int(r[2]))
+                    for name, r in by_assignee.items()
+                ),
+                key=lambda a: (-a.points, -a.done, a.assignee),
+            )
+        ),
+    )
+
+
+def _pts(value: float) -> str:
+    return f"{value:g}"
+
+
+def _stories(count: int) -> str:
+    return f"{count} {'story' if count == 1 else 'stories'}"
+
+
+def _story_row(story: Story) -> str:
+    details = [
+        d
+        for d in (
+            _pts(story.points) + " pts" if story.points is not None else "",
+            story.assignee,
+            story.issue_type if story.bug else "",
+        )
+        if d
+    ]
+    if not story.done:
+        details.append(story.status)
+    head = f"{story.key} {story.summary}".strip()
+    return f"- {head} ({', '.join(details)})" if details else f"- {head}"
+
+
+def format_metrics(stories: Sequence[Story], other: Sequence[str] = ()) -> Iterator[str]:
+    """Lines of the computed summary that replaces the story list."""
+    m = compute_metrics(stories)
+    rate = m.completion_rate
+    yield f"[Computed locally from {_stories(m.committed)}]"
+    yield ""
+    yield "| Metric | Value |"
+    yield "|---|---|"
+    yield f"| Committed | {_stories(m.committed)}, {_pts(m.committed_points)} pts |"
+    yield f"| Completed (velocity) | {_stories(m.completed)}, {_pts(m.velocity)} pts |"
+    if rate is not None:
+        basis = "points" if m.committed_points else "stories"
+        yield f"| Completion rate | {rate:.0%} of {basis} |"
+    yield f"| Carry-over | {_stories(m.carried_over)}, {_pts(m.carried_over_points)} pts |"
+    if m.bugs_fixed or m.bugs_open:
+        yield f"| Bugs | {m.bugs_fixed} fixed, {m.bugs_open} open |"
+    if m.unestimated:
+        yield f"| Unestimated | {_stories(m.unestimated)} |"
+    if m.point_distribution:
+        yield ""
+        yield "Completed by size: " + ", ".join(
+            f"{_pts(p)} pts x{n}" for p, n in m.point_distribution
+        )
+    if len(m.assignees) > 1 or (m.assignees and m.assignees[0].assignee != "Unassigned"):
+        yield ""
+        yield "| Assignee | Done | Points | Carried over |"
+        yield "|---|---|---|---|"
+        for a in m.assignees:
+            yield f"| {a.assignee} | {a.done} | {_pts(a.points)} | {a.carried_over} |"
+    yield ""
+    yield "Completed:"
+    yield from (_story_row(s) for s in stories if s.done)
+    if m.carried_over:
+        yield ""
+        yield "Carried over:"
+        yield from (_story_row(s) for s in stories if not s.done)
+    if other:
+        yield ""
+        yield "Notes:"
+        yield from other
+
+
+def sprint_metrics_stage(lines: Iterable[str]) -> Iterator[str]:
+    """Preprocess stage: replace a story list by computed metrics and a compact list."""
+    buffered = list(lines)
+    stories, other = parse_stories("\n".join(buffered))
+    if not stories or len(stories) < MIN_STORY_SHARE * (len(stories) + len(other)):
+        yield from buffered
+        return
+    yield from format_metrics(stories, other)
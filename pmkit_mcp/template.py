@@ -0,0 +1,59 @@
+"""Compiled ``{{placeholder}}`` templates.
+
+A workflow's user prompt template is parsed once into alternating literal
+and slot segments. Rendering is then a single ``str.join`` over those
+segments, so its cost is linear in the size of the output and user values
+are never re-scanned for placeholders.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+NOT_PROVIDED = "(not provided)"
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A template split into literal text and named slots.
+
+    ``literals`` always has exactly one more entry than ``slots``: the
+    rendered output is ``literals[0] + value(slots[0]) + literals[1] + ...``.
+    """
+
+    literals: tuple[str, ...]
+    slots: tuple[str, ...]
+
+    @property
+    def placeholders(self) -> frozenset[str]:
+        """Distinct placeholder names referenced by the template."""
+        return frozenset(self.slots)
+
+    def render(self, context: Mapping[str, str], default: str = NOT_PROVIDED) -> str:
+        """Substitute context values into the slots in a single pass.
+
+        Args:
+            context: Mapping of placeholder names to values.
+            default: Value used for placeholders absent from ``context``.
+
+        Returns:
+            The rendered text. Values are inserted verbatim, so ``{{...}}``
+            sequences inside a value are never expanded.
+        """
+        literals = self.literals
+        parts = [literals[0]]
+        for slot, literal in zip(self.slots, literals[1:]):
+            parts.append(context.get(slot, default))
+            parts.append(literal)
+        return "".join(parts)
+
+
+def compile_template(template: str) -> CompiledTemplate:
+    """Parse a ``{{placeholder}}`` template into a :class:`CompiledTemplate`."""
+    pieces = PLACEHOLDER_PATTERN.split(template)
+    # re.split with one capture group alternates literal, name, literal, ...
+    return CompiledTemplate(literals=tuple(pieces[0::2]), slots=tuple(pieces[1::2]))
@@ -0,0 +1,21 @@
+"""Shared text helpers for the local analysis modules.
+
+Kept free of optional dependencies so that both the pure-Python passage
+index (:mod:`pmkit_mcp.passages`) and NumPy clustering
+(:mod:`pmkit_mcp.clustering`) can use it.
+"""
+
+from __future__ import annotations
+
+# Common English words that carry no topic, dropped from index and cluster terms.
+STOP_WORDS = frozenset(
+    """
+    a about above after again all also am an and any are as at be because been before
+    being but by can cannot could did do does doing don't for from get got had has have
+    having he her here him his how i i'm if in into is it it's its just let me more most
+    my no not now of off on once only or other our out over own really same she should so
+    some still such than that the their them then there these they this those through to
+    too under until up us very was we were what when where which while who why will with
+    would you your
+    """.split()
+)
@@ -0,0 +1,32 @@
+"""Fast local token estimation.
+
+No tokenizer download or network call is needed. The estimate follows the
+common rule of thumb for BPE tokenizers on English text: about four
+characters per token for ASCII text, and about three UTF-8 bytes per token
+for anything else. It is meant for budgeting, not for billing. Each call
+runs in a single linear pass.
+"""
+
+from __future__ import annotations
+
+ASCII_CHARS_PER_TOKEN = 4
+UTF8_BYTES_PER_TOKEN = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many LLM tokens ``text`` will occupy."""
+    if not text:
+        return 0
+    if text.isascii():
+        return -(-len(text) // ASCII_CHARS_PER_TOKEN)
+    return -(-len(text.encode("utf-8", "surrogatepass")) // UTF8_BYTES_PER_TOKEN)
+
+
+def chars_for_tokens(text: str, tokens: int) -> int:
+    """Approximate number of leading characters of ``text`` that fit in ``tokens``."""
+    if tokens <= 0 or not text:
+        return 0
+    total = estimate_tokens(text)
+    if tokens >= total:
+        return len(text)
+    return int(len(text) * tokens / total)
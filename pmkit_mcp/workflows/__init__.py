@@ -7,6 +7,11 @@ Each workflow is a self-contained prompt template with:
 - Output format specification
 """
 
-from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY, WorkflowDefinition
+from pmkit_mcp.workflows.registry import (
+    WORKFLOW_REGISTRY,
+    WorkflowDefinition,
+    WorkflowRegistry,
+    WorkflowSummary,
+)
 
-__all__ = ["WORKFLOW_REGISTRY", "WorkflowDefinition"]
+__all__ = ["WORKFLOW_REGISTRY", "WorkflowDefinition", "WorkflowRegistry", "WorkflowSummary"]
@@ -0,0 +1,275 @@
+"""Workflow catalogs stored as files, loaded lazily.
+
+A catalog is a directory with one subdirectory per workflow plus a prebuilt
+index::
+
+    catalog/
+    ├── index.json              # metadata of every workflow (built by build_index)
+    ├── release_digest/
+    │   ├── workflow.json       # id, name, description, fields, budget, ...
+    │   ├── system.md           # system prompt
+    │   └── user.md             # user prompt template with {{placeholders}}
+    └── ...
+
+:func:`load_catalog` reads only ``index.json`` and returns one
+:class:`CatalogWorkflow` summary per workflow. That is enough to list the
+tools, build help text and check for missing fields. The ``.md`` prompt
+bodies are read when the workflow is first rendered, i.e. when it is first
+looked up with ``WORKFLOW_REGISTRY[workflow_id]``. Startup time and memory
+therefore grow with the size of the index, not with the size of the prompts.
+
+Rebuild the index after editing any ``workflow.json``::
+
+    python scripts/build_catalog.py path/to/catalog
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any
+
+from pmkit_mcp.budget import TRUNCATION_POLICIES
+from pmkit_mcp.preprocess import STAGES
+from pmkit_mcp.workflows.registry import (
+    DEFAULT_PROMPT_BUDGET,
+    FieldSpec,
+    WorkflowDefinition,
+    WorkflowRegistry,
+    WorkflowSummary,
+)
+
+INDEX_FILE = "index.json"
+WORKFLOW_FILE = "workflow.json"
+SYSTEM_PROMPT_FILE = "system.md"
+USER_PROMPT_FILE = "user.md"
+INDEX_FORMAT = 1
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog directory or index is missing or malformed."""
+
+
+@dataclass(frozen=True, kw_only=True)
+class CatalogWorkflow(WorkflowSummary):
+    """Summary of a catalog workflow whose prompts are still on disk.
+
+    Attributes:
+        directory: The workflow's directory, holding ``system.md`` and ``user.md``.
+    """
+
+    directory: Path = field(compare=False)
+
+    def load(self) -> WorkflowDefinition:
+        """Read the prompt bodies and return the complete definition."""
+        try:
+            system_prompt = (self.directory / SYSTEM_PROMPT_FILE).read_text(encoding="utf-8")
+            user_prompt_template = (self.directory / USER_PROMPT_FILE).read_text(encoding="utf-8")
+        except FileNotFoundError as e:
+            raise CatalogError(f"Workflow {self.id!r} is missing {Path(e.filename).name}") from e
+        return WorkflowDefinition(
+            **_metadata_kwargs(self),
+            system_prompt=system_prompt,
+            user_prompt_template=user_prompt_template,
+        )
+
+
+def _metadata_kwargs(summary: WorkflowSummary) -> dict[str, Any]:
+    return {f.name: getattr(summary, f.name) for f in fields(WorkflowSummary)}
+
+
+# ---------------------------------------------------------------------------
+# (De)serialization
+# ---------------------------------------------------------------------------
+
+
+def _field_to_dict(spec: FieldSpec) -> dict[str, Any]:
+    data: dict[str, Any] = {"name": spec.name, "description": spec.description}
+    if spec.example:
+        data["example"] = spec.example
+    if spec.truncation != "middle":
+        data["truncation"] = spec.truncation
+    if spec.preprocess:
+        data["preprocess"] = list(spec.preprocess)
+    if spec.passage_budget:
+        data["passage_budget"] = spec.passage_budget
+        data["query_fields"] = list(spec.query_fields)
+    return data
+
+
+def _field_from_dict(data: Mapping[str, Any]) -> FieldSpec:
+    truncation = data.get("truncation", "middle")
+    if truncation not in TRUNCATION_POLICIES:
+        raise CatalogError(f"Field {data['name']!r} has unknown truncation {truncation!r}")
+    stages = tuple(data.get("preprocess", ()))
+    for stage in stages:
+        if stage not in STAGES:
+            raise CatalogError(f"Field {data['name']!r} has unknown preprocess stage {stage!r}")
+    return FieldSpec(
+        name=data["name"],
+        description=data.get("description", ""),
+        example=data.get("example", ""),
+        truncation=truncation,
+        preprocess=stages,
+        passage_budget=data.get("passage_budget", 0),
+        query_fields=tuple(data.get("query_fields", ())),
+    )
+
+
+def summary_to_dict(summary: WorkflowSummary) -> dict[str, Any]:
+    """Serialize workflow metadata (no prompts) to a JSON-compatible dict."""
+    return {
+        "id": summary.id,
+        "name": summary.name,
+        "description": summary.description,
+        "category": summary.category,
+        "output_format": summary.output_format,
+        "prompt_budget": summary.prompt_budget,
+        "required_fields": [_field_to_dict(f) for f in summary.required_fields],
+        "optional_fields": [_field_to_dict(f) for f in summary.optional_fields],
+    }
+
+
+def _summary_from_dict(data: Mapping[str, Any], directory: Path) -> CatalogWorkflow:
+    try:
+        return CatalogWorkflow(
+            id=data["id"],
+            name=data["name"],
+            description=data["description"],
+            category=data.get("category", "on-demand"),
+            output_format=data.get("output_format", "markdown"),
+            prompt_budget=data.get("prompt_budget", DEFAULT_PROMPT_BUDGET),
+            required_fields=tuple(_field_from_dict(f) for f in data.get("required_fields", ())),
+            optional_fields=tuple(_field_from_dict(f) for f in data.get("optional_fields", ())),
+            directory=directory,
+        )
+    except KeyError as e:
+        raise CatalogError(f"Workflow entry in {directory} is missing {e.args[0]!r}") from e
+    except CatalogError as e:
+        raise CatalogError(f"Workflow entry in {directory}: {e}") from e
+
+
+def _entry_directory(catalog_dir: Path, data: Any) -> Path:
+    """Return the directory of index entry ``data``, which must stay inside ``catalog_dir``."""
+    if not isinstance(data, Mapping):
+        raise CatalogError(f"{catalog_dir / INDEX_FILE}: workflow entries must be objects")
+    workflow_id = data.get("id")
+    if (
+        not isinstance(workflow_id, str)
+        or workflow_id in ("", ".", "..")
+        or "/" in workflow_id
+        or "\\" in workflow_id
+    ):
+        raise CatalogError(f"{catalog_dir / INDEX_FILE}: invalid workflow id {workflow_id!r}")
+    return catalog_dir / workflow_id
+
+
+# ---------------------------------------------------------------------------
+# Writing catalogs
+# ---------------------------------------------------------------------------
+
+
+def export_workflow(workflow: WorkflowDefinition, catalog_dir: str | Path) -> Path:
+    """Write ``workflow`` into ``catalog_dir/<id>/``. Does not update the index.
+
+    Returns:
+        The workflow's directory.
+    """
+    directory = Path(catalog_dir) / workflow.id
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / WORKFLOW_FILE).write_text(
+        json.dumps(summary_to_dict(workflow), indent=2, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    (directory / SYSTEM_PROMPT_FILE).write_text(workflow.system_prompt, encoding="utf-8")
+    (directory / USER_PROMPT_FILE).write_text(workflow.user_prompt_template, encoding="utf-8")
+    return directory
+
+
+def build_index(catalog_dir: str | Path) -> int:
+    """Scan ``catalog_dir/*/workflow.json`` and (re)write ``index.json``.
+
+    Returns:
+        The number of workflows indexed.
+
+    Raises:
+        CatalogError: If a workflow file is invalid or its id does not match
+            its directory name.
+    """
+    catalog_dir = Path(catalog_dir)
+    entries: list[dict[str, Any]] = []
+    for workflow_file in sorted(catalog_dir.glob(f"*/{WORKFLOW_FILE}")):
+        directory = workflow_file.parent
+        try:
+            data = json.loads(workflow_file.read_text(encoding="utf-8"))
+        except json.JSONDecodeError as e:
+            raise CatalogError(f"{workflow_file}: {e}") from e
+        summary = _summary_from_dict(data, directory)
+        if summary.id != directory.name:
+            raise CatalogError(
+                f"{workflow_file}: id {summary.id!r} does not match directory {directory.name!r}"
+            )
+        entries.append(summary_to_dict(summary))
+
+    index = {"format": INDEX_FORMAT, "workflows": entries}
+    (catalog_dir / INDEX_FILE).write_text(
+        json.dumps(index, separators=(",", ":"), ensure_ascii=False) + "\n", encoding="utf-8"
+    )
+    return len(entries)
+
+
+def write_catalog(workflows: Iterable[WorkflowDefinition], catalog_dir: str | Path) -> int:
+    """Export ``workflows`` into ``catalog_dir`` and build its index."""
+    for workflow in workflows:
+        export_workflow(workflow, catalog_dir)
+    return build_index(catalog_dir)
+
+
+# ---------------------------------------------------------------------------
+# Loading catalogs
+# ---------------------------------------------------------------------------
+
+
+def load_catalog(catalog_dir: str | Path) -> list[CatalogWorkflow]:
+    """Read a catalog's index and return lazily-loading workflow summaries.
+
+    Only ``index.json`` is read; prompt bodies stay on disk until each
+    workflow's :meth:`CatalogWorkflow.load` is called.
+
+    Raises:
+        CatalogError: If the index is missing, has an unsupported format, or
+            has an entry that is malformed or whose id is not a plain
+            directory name.
+    """
+    catalog_dir = Path(catalog_dir)
+    index_path = catalog_dir / INDEX_FILE
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except FileNotFoundError as e:
+        raise CatalogError(
+            f"No {INDEX_FILE} in {catalog_dir}; run scripts/build_catalog.py {catalog_dir}"
+        ) from e
+    except json.JSONDecodeError as e:
+        raise CatalogError(f"{index_path}: {e}") from e
+    if not isinstance(index, dict) or index.get("format") != INDEX_FORMAT:
+        found = index.get("format") if isinstance(index, dict) else None
+        raise CatalogError(f"{index_path}: unsupported index format {found!r}")
+    entries = index.get("workflows")
+    if not isinstance(entries, list):
+        raise CatalogError(f"{index_path}: 'workflows' must be a list")
+    return [_summary_from_dict(data, _entry_directory(catalog_dir, data)) for data in entries]
+
+
+def register_catalog(registry: WorkflowRegistry, catalog_dir: str | Path) -> int:
+    """Add every workflow of a catalog to ``registry`` in one update.
+
+    Catalog workflows replace registered workflows with the same id.
+
+    Returns:
+        The number of workflows registered.
+    """
+    workflows = load_catalog(catalog_dir)
+    registry.update({w.id: w for w in workflows})
+    return len(workflows)
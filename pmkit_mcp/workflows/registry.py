@@ -9,11 +9,22 @@ Each workflow includes:
 - required_fields: fields that must be provided
 - optional_fields: fields that enhance output if provided
 - output_format: expected output format (markdown, html, etc.)
+- prompt_budget: maximum estimated tokens for the rendered prompt
+
+Everything except the two prompts is also available on
+:class:`WorkflowSummary`, which is what the registry holds for workflows
+loaded from an external catalog (see :mod:`pmkit_mcp.workflows.catalog`)
+until they are first rendered.
 """
 
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass, field
+from typing import Any
+
+from pmkit_mcp.template import CompiledTemplate, compile_template
 
 
 @dataclass(frozen=True)
@@ -23,21 +34,67 @@ class FieldSpec:
     name: str
     description: str
     example: str = ""
+    # How to shorten this field when the prompt exceeds its budget (see pmkit_mcp.budget)
+    truncation: str = "middle"
+    # Normalization stages applied to pasted values before rendering (see pmkit_mcp.preprocess)
+    preprocess: tuple[str, ...] = ()
+    # Values over this many estimated tokens keep only their passages most relevant to
+    # the values of query_fields (see pmkit_mcp.passages); 0 keeps the whole value
+    passage_budget: int = 0
+    query_fields: tuple[str, ...] = ()
 
 
-@dataclass(frozen=True)
-class WorkflowDefinition:
-    """Complete definition of a PM Kit workflow."""
+# Preprocess stages by kind of paste
+CHAT_PASTE = ("noise", "quotes", "signatures", "timestamps", "whitespace", "dedupe")
+TICKET_PASTE = ("noise", "whitespace")
+TRANSCRIPT_PASTE = ("timestamps", "whitespace", "dedupe")
+MESSAGE_PASTE = ("quotes", "signatures", "whitespace", "dedupe")
+
+# Estimated tokens kept of a long source document (see FieldSpec.passage_budget)
+SOURCE_PASSAGE_BUDGET = 8_000
+
+
+# Estimated tokens allowed for a rendered prompt (system + user)
+DEFAULT_PROMPT_BUDGET = 100_000
+
+
+@dataclass(frozen=True, kw_only=True)
+class WorkflowSummary(ABC):
+    """Workflow metadata: everything needed to list, describe and validate a tool.
+
+    Tool listings, help text and missing-field checks only need a summary;
+    the prompt bodies are only needed to render. Concrete summaries say how
+    to get them in :meth:`load`.
+    """
 
     id: str
     name: str
     description: str
-    system_prompt: str
-    user_prompt_template: str
     required_fields: tuple[FieldSpec, ...] = ()
     optional_fields: tuple[FieldSpec, ...] = ()
     output_format: str = "markdown"
     category: str = "on-demand"
+    prompt_budget: int = DEFAULT_PROMPT_BUDGET
+
+    @abstractmethod
+    def load(self) -> WorkflowDefinition:
+        """Return the complete definition, reading prompt bodies if needed."""
+
+
+@dataclass(frozen=True, kw_only=True)
+class WorkflowDefinition(WorkflowSummary):
+    """Complete definition of a PM Kit workflow."""
+
+    system_prompt: str
+    user_prompt_template: str
+    compiled_template: CompiledTemplate = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Compile once at definition time so every render is a single join.
+        object.__setattr__(self, "compiled_template", compile_template(self.user_prompt_template))
+
+    def load(self) -> WorkflowDefinition:
+        return self
 
 
 # ---------------------------------------------------------------------------
@@ -79,10 +136,34 @@ DAILY_BRIEF = WorkflowDefinition(
         FieldSpec("current_date", "Date for the brief", "2026-01-13"),
     ),
     optional_fields=(
-        FieldSpec("slack_messages", "Recent Slack channel activity", "Paste Slack messages here"),
-        FieldSpec("jira_updates", "Jira ticket updates and sprint progress", "ACME-342: In Progress"),
-        FieldSpec("support_tickets", "Open and recent support tickets", "Ticket #1234: Dashboard slow"),
-        FieldSpec("community_activity", "Community posts and feature requests", "Feature request: dark mode"),
+        FieldSpec(
+            "slack_messages",
+            "Recent Slack channel activity",
+            "Paste Slack messages here",
+            truncation="drop_oldest_lines",
+            preprocess=CHAT_PASTE,
+        ),
+        FieldSpec(
+            "jira_updates",
+            "Jira ticket updates and sprint progress",
+            "ACME-342: In Progress",
+            truncation="drop_oldest_lines",
+            preprocess=TICKET_PASTE,
+        ),
+        FieldSpec(
+            "support_tickets",
+            "Open and recent support tickets",
+            "Ticket #1234: Dashboard slow",
+            truncation="drop_oldest_lines",
+            preprocess=TICKET_PASTE,
+        ),
+        FieldSpec(
+            "community_activity",
+            "Community posts and feature requests",
+            "Feature request: dark mode",
+            truncation="drop_oldest_lines",
+            preprocess=TICKET_PASTE,
+        ),
     ),
 )
 
@@ -133,9 +214,25 @@ MEETING_PREP = WorkflowDefinition(
     ),
     optional_fields=(
         FieldSpec("attendees", "List of attendees", "John (CTO), Sarah (VP Product)"),
-        FieldSpec("gong_calls", "Recent call transcripts or summaries", "Dec 20 QBR: discussed search"),
-        FieldSpec("support_tickets", "Open support tickets for this account", "Ticket #456: SSO request"),
-        FieldSpec("account_health", "Health score, NPS, contract details", "Health: 72/100, NPS: 7"),
+        FieldSpec(
+            "gong_calls",
+            "Recent call transcripts or summaries",
+            "Dec 20 QBR: discussed search",
+            preprocess=TRANSCRIPT_PASTE,
+        ),
+        FieldSpec(
+            "support_tickets",
+            "Open support tickets for this account",
+            "Ticket #456: SSO request",
+            truncation="drop_oldest_lines",
+            preprocess=TICKET_PASTE,
+        ),
+        FieldSpec(
+            "account_health",
+            "Health score, NPS, contract details",
+            "Health: 72/100, NPS: 7",
+            truncation="head",
+        ),
     ),
 )
 
@@ -174,10 +271,30 @@ VOC_CLUSTERING = WorkflowDefinition(
         FieldSpec("tenant_name", "Your company name", "Acme Corp"),
     ),
     optional_fields=(
-        FieldSpec("support_tickets", "Support ticket data", "47 tickets about search issues"),
-        FieldSpec("gong_insights", "Call transcript insights", "12 calls mentioning search frustration"),
-        FieldSpec("community_feedback", "Community posts and feature requests", "89-vote request for filters"),
-        FieldSpec("nps_verbatims", "NPS survey responses", "NPS 7: 'Search never finds what I need'"),
+        FieldSpec(
+            "support_tickets",
+            "Support ticket data",
+            "47 tickets about search issues",
+            preprocess=(*TICKET_PASTE, "cluster"),
+        ),
+        FieldSpec(
+            "gong_insights",
+            "Call transcript insights",
+            "12 calls mentioning search frustration",
+            preprocess=("timestamps", "whitespace", "cluster", "dedupe"),
+        ),
+        FieldSpec(
+            "community_feedback",
+            "Community posts and feature requests",
+            "89-vote request for filters",
+            preprocess=(*TICKET_PASTE, "cluster"),
+        ),
+        FieldSpec(
+            "nps_verbatims",
+            "NPS survey responses",
+            "NPS 7: 'Search never finds what I need'",
+            preprocess=("quotes", "signatures", "whitespace", "cluster", "dedupe"),
+        ),
     ),
 )
 
@@ -201,6 +318,8 @@ COMPETITOR_RESEARCH = WorkflowDefinition(
     user_prompt_template=(
         "Generate a competitor research report for {{tenant_name}}.\n\n"
         "## Time Period\nFrom: {{from_date}}\nTo: {{to_date}}\n\n"
+        "## Competitors\n{{competitors}}\n\n"
+        "## Focus Areas\n{{focus_areas}}\n\n"
         "## Competitor Updates\n{{competitor_changes}}\n\n"
         "## Feature Comparison\n{{feature_comparison}}\n\n"
         "## Output Format\n\n"
@@ -217,8 +336,22 @@ COMPETITOR_RESEARCH = WorkflowDefinition(
         FieldSpec("to_date", "End date for analysis", "2026-01-14"),
     ),
     optional_fields=(
-        FieldSpec("competitor_changes", "Recent competitor product updates", "Notion launched AI search"),
-        FieldSpec("feature_comparison", "Feature comparison data", "SSO: Us ❌, Notion ✅, Coda ✅"),
+        FieldSpec("competitors", "Competitors to track", "Notion, Coda"),
+        FieldSpec("focus_areas", "Product areas or features to focus on", "search, SSO, AI"),
+        FieldSpec(
+            "competitor_changes",
+            "Recent competitor product updates",
+            "Notion launched AI search",
+            passage_budget=SOURCE_PASSAGE_BUDGET,
+            query_fields=("competitors", "focus_areas"),
+        ),
+        FieldSpec(
+            "feature_comparison",
+            "Feature comparison data",
+            "SSO: Us ❌, Notion ✅, Coda ✅",
+            passage_budget=SOURCE_PASSAGE_BUDGET,
+            query_fields=("competitors", "focus_areas"),
+        ),
     ),
 )
 
@@ -307,7 +440,12 @@ PRD_DRAFT = WorkflowDefinition(
     required_fields=(
         FieldSpec("tenant_name", "Your company name", "Acme Corp"),
         FieldSpec("feature_name", "Name of the feature", "Search Filters"),
-        FieldSpec("customer_evidence", "Customer demand data", "47 support tickets about search"),
+        FieldSpec(
+            "customer_evidence",
+            "Customer demand data",
+            "47 support tickets about search",
+            preprocess=MESSAGE_PASTE,
+        ),
     ),
     optional_fields=(
         FieldSpec("epic_key", "Jira epic key", "ACME-100"),
@@ -362,10 +500,21 @@ SPRINT_REVIEW = WorkflowDefinition(
     ),
     optional_fields=(
         FieldSpec("team_name", "Team name", "Product Team"),
-        FieldSpec("completed_stories", "List of completed stories", "ACME-342: Search filters (5 pts)"),
+        FieldSpec(
+            "completed_stories",
+            "List of completed stories",
+            "ACME-342: Search filters (5 pts)",
+            # Before whitespace, which would merge the empty cells of TSV exports
+            preprocess=("noise", "sprint_metrics", "whitespace"),
+        ),
         FieldSpec("sprint_metrics", "Velocity, bug counts, etc.", "19 committed, 16 completed"),
         FieldSpec("blockers", "Blockers and issues encountered", "Redis connection pool issue"),
-        FieldSpec("customer_feedback", "Relevant customer feedback", "Globex: 'filters are game-changing'"),
+        FieldSpec(
+            "customer_feedback",
+            "Relevant customer feedback",
+            "Globex: 'filters are game-changing'",
+            preprocess=MESSAGE_PASTE,
+        ),
     ),
 )
 
@@ -377,6 +526,8 @@ PROTOTYPE_GENERATION = WorkflowDefinition(
     name="Prototype Generation",
     description="Generate a standalone interactive HTML prototype from a PRD or feature description.",
     output_format="html",
+    # Leave room in the context window for a full HTML document in the reply.
+    prompt_budget=60_000,
     system_prompt=(
         "You are a UI/UX engineer who creates interactive HTML prototypes from PRDs.\n\n"
         "CRITICAL: Output ONLY a complete, standalone HTML file. No markdown, no explanations, no code fences.\n\n"
@@ -452,13 +603,24 @@ RELEASE_NOTES = WorkflowDefinition(
     required_fields=(
         FieldSpec("product_name", "Your product name", "Acme Platform"),
         FieldSpec("release_version", "Version number", "v2.4.0"),
-        FieldSpec("completed_issues", "Completed Jira issues", "ACME-342: Search Filters"),
+        FieldSpec(
+            "completed_issues",
+            "Completed Jira issues",
+            "ACME-342: Search Filters",
+            # Before whitespace, which would merge the empty cells of TSV exports
+            preprocess=("noise", "release_issues", "whitespace"),
+        ),
     ),
     optional_fields=(
         FieldSpec("release_date", "Release date", "January 13, 2026"),
         FieldSpec("epic_summaries", "Epic summaries", "Search Improvements epic: 3 stories completed"),
         FieldSpec("related_prds", "Related PRD excerpts", "Search Filters PRD excerpt"),
-        FieldSpec("release_notes_template", "Previous release notes for format reference", ""),
+        FieldSpec(
+            "release_notes_template",
+            "Previous release notes for format reference",
+            "",
+            truncation="head",
+        ),
     ),
 )
 
@@ -567,8 +729,19 @@ FEATURE_IDEATION = WorkflowDefinition(
         FieldSpec("problem_statement", "The problem being solved", "Users can't find content efficiently"),
     ),
     optional_fields=(
-        FieldSpec("slack_discussions", "Relevant Slack threads", "#product: 'what about AI search?'"),
-        FieldSpec("customer_signals", "Customer feedback or research", "Globex: 'search is our #1 issue'"),
+        FieldSpec(
+            "slack_discussions",
+            "Relevant Slack threads",
+            "#product: 'what about AI search?'",
+            truncation="drop_oldest_lines",
+            preprocess=CHAT_PASTE,
+        ),
+        FieldSpec(
+            "customer_signals",
+            "Customer feedback or research",
+            "Globex: 'search is our #1 issue'",
+            preprocess=MESSAGE_PASTE,
+        ),
         FieldSpec("competitive_context", "What competitors are doing", "Notion launched AI search"),
         FieldSpec("constraints", "Technical, resource, or timeline constraints", "2 pods available, 10 weeks"),
     ),
@@ -620,12 +793,24 @@ ONE_PAGER = WorkflowDefinition(
     required_fields=(
         FieldSpec("tenant_name", "Your company name", "Acme Corp"),
         FieldSpec("purpose", "What is this one-pager for?", "Board meeting pre-read"),
-        FieldSpec("documents", "Source materials to synthesize", "Q1 search initiative results"),
+        FieldSpec(
+            "documents",
+            "Source materials to synthesize",
+            "Q1 search initiative results",
+            passage_budget=SOURCE_PASSAGE_BUDGET,
+            query_fields=("purpose", "requirements", "data_points", "current_status"),
+        ),
     ),
     optional_fields=(
         FieldSpec("audience", "Who will read this?", "C-suite"),
         FieldSpec("data_points", "Key metrics and numbers", "40% faster search, NPS +28%"),
-        FieldSpec("background", "Historical context", "Search was #1 pain point for 6 months"),
+        FieldSpec(
+            "background",
+            "Historical context",
+            "Search was #1 pain point for 6 months",
+            passage_budget=SOURCE_PASSAGE_BUDGET // 2,
+            query_fields=("purpose", "requirements", "data_points", "current_status"),
+        ),
         FieldSpec("current_status", "Current state", "Filters shipped, AI search next"),
         FieldSpec("requirements", "Specific requirements or constraints", "Must include ROI numbers"),
     ),
@@ -682,9 +867,105 @@ TLDR = WorkflowDefinition(
 # ---------------------------------------------------------------------------
 # Registry
 # ---------------------------------------------------------------------------
-WORKFLOW_REGISTRY: dict[str, WorkflowDefinition] = {
-    w.id: w
-    for w in [
+class WorkflowRegistry(dict[str, WorkflowSummary]):
+    """Mapping of workflow id to definition that tracks a change counter.
+
+    ``version`` increases on every mutation so that anything derived from the
+    registry (tool manifests, help text, render caches) can be memoized and
+    invalidated by comparing versions instead of rebuilding on every request.
+
+    Entries may be bare :class:`WorkflowSummary` objects (e.g. from an
+    external catalog). Indexing (``registry[id]``, ``get``) always returns a
+    full :class:`WorkflowDefinition`, loading it on first access and keeping
+    it; iteration (``values()``, ``items()``) and :meth:`summary` return the
+    stored entries without loading anything.
+    """
+
+    def __init__(self, workflows: Iterable[WorkflowSummary] = ()) -> None:
+        super().__init__((w.id, w) for w in workflows)
+        self.version = 1
+
+    def _changed(self) -> None:
+        self.version += 1
+
+    def register(self, workflow: WorkflowSummary) -> None:
+        """Add or replace a workflow under its own id."""
+        self[workflow.id] = workflow
+
+    def swap(self, updates: Mapping[str, WorkflowSummary], removals: Iterable[str] = ()) -> int:
+        """Replace and remove several workflows as one change.
+
+        The version is bumped once, so derived caches rebuild once. Callers
+        that already hold a definition (e.g. an in-flight render) keep using
+        it; only later lookups see the new entries.
+
+        Returns:
+            The new registry version.
+        """
+        for key in removals:
+            super().pop(key, None)
+        super().update(updates)
+        self._changed()
+        return self.version
+
+    def summary(self, key: str) -> WorkflowSummary:
+        """Return the stored entry for ``key`` without loading its prompts."""
+        return super().__getitem__(key)
+
+    def __getitem__(self, key: str) -> WorkflowDefinition:
+        entry = super().__getitem__(key)
+        if isinstance(entry, WorkflowDefinition):
+            return entry
+        definition = entry.load()
+        # Same workflow, now with its prompts: not a change, so no version bump.
+        # Skip the store if the entry was swapped out while loading.
+        if dict.get(self, key) is entry:
+            super().__setitem__(key, definition)
+        return definition
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def __setitem__(self, key: str, value: WorkflowSummary) -> None:
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args: Any, **kwargs: WorkflowSummary) -> None:
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key: str, default: WorkflowSummary) -> WorkflowDefinition:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, *default: Any) -> Any:
+        had_key = key in self
+        value = super().pop(key, *default)
+        if had_key:
+            self._changed()
+        return value
+
+    def popitem(self) -> tuple[str, WorkflowSummary]:
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self._changed()
+
+    def __ior__(self, other: Any) -> WorkflowRegistry:  # type: ignore[override,misc]
+        self.update(other)
+        return self
+
+
+WORKFLOW_REGISTRY = WorkflowRegistry(
+    [
         DAILY_BRIEF,
         MEETING_PREP,
         VOC_CLUSTERING,
@@ -699,4 +980,4 @@ WORKFLOW_REGISTRY: dict[str, WorkflowDefinition] = {
         ONE_PAGER,
         TLDR,
     ]
-}
+)
@@ -0,0 +1,313 @@
+"""Hot reload of workflow definitions.
+
+:class:`WorkflowWatcher` polls the files workflows come from and applies
+edits to a running registry without a restart. It watches
+``workflows/registry.py`` and, for each external catalog, ``index.json`` plus
+every workflow's ``system.md`` and ``user.md``. Polling uses only ``os.stat``,
+so no extra service or dependency is needed.
+
+When a file changes, only its source is re-read:
+
+- For ``registry.py``, only its module-level assignments are executed again,
+  against the live module's classes and constants. Class and function
+  definitions are not re-run, so ``isinstance`` checks keep working; edits to
+  them still need a restart.
+- For a catalog, its index is re-read.
+
+The new definitions are compared with the ones currently applied, and only
+workflows that actually differ are rebuilt (which also compiles their
+templates). The changes are then swapped into the registry with
+:meth:`WorkflowRegistry.swap`. That bumps the registry version, which
+invalidates the tool manifest, help text and render cache keys. Renders
+already in progress hold their own definition object, so they finish
+against the old version.
+
+Sources are layered in order: catalogs override built-ins, and later
+catalogs override earlier ones, matching ``--catalog`` at startup.
+"""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from pmkit_mcp.workflows import registry as registry_module
+from pmkit_mcp.workflows.catalog import (
+    INDEX_FILE,
+    SYSTEM_PROMPT_FILE,
+    USER_PROMPT_FILE,
+    load_catalog,
+    summary_to_dict,
+)
+from pmkit_mcp.workflows.registry import (
+    WorkflowDefinition,
+    WorkflowRegistry,
+    WorkflowSummary,
+)
+
+logger = logging.getLogger("pmkit_mcp.watch")
+
+DEFAULT_WATCH_INTERVAL = 1.0
+
+# (content key, entry factory): the key detects changes, the factory builds the entry
+_Entry = tuple[str, Callable[[], WorkflowSummary]]
+_Stamp = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class ReloadResult:
+    """Workflows changed by one reload.
+
+    Attributes:
+        updated: Ids that were added or replaced.
+        removed: Ids that were removed.
+        version: Registry version after the swap.
+    """
+
+    updated: tuple[str, ...]
+    removed: tuple[str, ...]
+    version: int
+
+
+def _stamp(path: Path) -> _Stamp | None:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _metadata_key(workflow: Any) -> str:
+    return json.dumps(summary_to_dict(workflow), sort_keys=True)
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+
+def _unchanged(workflow: WorkflowSummary) -> WorkflowSummary:
+    return workflow
+
+
+class _PendingDefinition:
+    """Stands in for ``WorkflowDefinition`` while ``registry.py`` is re-read.
+
+    It only records the arguments, so a workflow is built (and its template
+    compiled) only if they changed.
+    """
+
+    def __init__(self, **values: Any) -> None:
+        self.values = values
+
+    def key(self) -> str:
+        return repr(sorted(self.values.items()))
+
+    def build(self) -> WorkflowDefinition:
+        return WorkflowDefinition(**self.values)
+
+
+class _BuiltinSource:
+    """The built-in workflows in ``registry.py``."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.name = str(path)
+
+    def files(self) -> list[Path]:
+        return [self.path]
+
+    def load(self) -> dict[str, _Entry]:
+        tree = ast.parse(self.path.read_bytes(), filename=str(self.path))
+        definitions: list[ast.stmt] = [
+            node
+            for node in tree.body
+            if isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign))
+        ]
+        # Re-run only the assignments, against the live classes; definitions stay pending.
+        namespace = {
+            **vars(registry_module),
+            "WorkflowDefinition": _PendingDefinition,
+            "WorkflowRegistry": list,
+        }
+        code = compile(ast.Module(body=definitions, type_ignores=[]), str(self.path), "exec")
+        exec(code, namespace)
+        entries: dict[str, _Entry] = {}
+        for pending in namespace["WORKFLOW_REGISTRY"]:
+            entries[pending.values["id"]] = (pending.key(), pending.build)
+        return entries
+
+
+class _CatalogSource:
+    """An external catalog directory; prompts stay lazy."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.name = str(directory)
+        self._prompt_files: list[Path] = []
+
+    def files(self) -> list[Path]:
+        return [self.directory / INDEX_FILE, *self._prompt_files]
+
+    def load(self) -> dict[str, _Entry]:
+        entries: dict[str, _Entry] = {}
+        prompt_files: list[Path] = []
+        for wf in load_catalog(self.directory):
+            paths = [wf.directory / SYSTEM_PROMPT_FILE, wf.directory / USER_PROMPT_FILE]
+            prompt_files += paths
+            # Prompt edits are keyed by file stamp, so nothing is read until the next render.
+            key = "\0".join([_metadata_key(wf), *(str(_stamp(p)) for p in paths)])
+            entries[wf.id] = (key, partial(_unchanged, wf))
+        self._prompt_files = prompt_files
+        return entries
+
+
+# ---------------------------------------------------------------------------
+# Watcher
+# ---------------------------------------------------------------------------
+
+
+class WorkflowWatcher:
+    """Detect edited workflow sources and swap the changes into a registry.
+
+    Args:
+        registry: The registry to update, normally ``WORKFLOW_REGISTRY``.
+        catalogs: External catalog directories, in ``--catalog`` order.
+        registry_path: The built-in definitions module; defaults to
+            ``pmkit_mcp/workflows/registry.py``. ``None`` disables it.
+    """
+
+    def __init__(
+        self,
+        registry: WorkflowRegistry,
+        catalogs: Iterable[str | Path] = (),
+        registry_path: Path | None = Path(registry_module.__file__),
+    ) -> None:
+        self.registry = registry
+        self._sources: list[_BuiltinSource | _CatalogSource] = []
+        if registry_path is not None:
+            self._sources.append(_BuiltinSource(Path(registry_path)))
+        self._sources += [_CatalogSource(Path(d)) for d in catalogs]
+        self._entries: dict[int, dict[str, _Entry]] = {}
+        self._stamps: dict[int, dict[Path, _Stamp | None]] = {}
+        self._applied: dict[str, str] = {}
+        for i, source in enumerate(self._sources):
+            self._entries[i] = self._load(source) or {}
+            self._stamps[i] = self._stat(source)
+        # Record what is live now, so the first poll only reacts to real edits.
+        for workflow_id in self._all_ids():
+            owner = self._owner(workflow_id)
+            if owner is not None:
+                self._applied[workflow_id] = owner[0]
+
+    @staticmethod
+    def _stat(source: _BuiltinSource | _CatalogSource) -> dict[Path, _Stamp | None]:
+        return {path: _stamp(path) for path in source.files()}
+
+    @staticmethod
+    def _load(source: _BuiltinSource | _CatalogSource) -> dict[str, _Entry] | None:
+        try:
+            return source.load()
+        except Exception:
+            # A half-saved file must not take the server down; keep serving the old version.
+            logger.exception("Could not reload workflows from %s", source.name)
+            return None
+
+    def _all_ids(self) -> set[str]:
+        return {wid for entries in self._entries.values() for wid in entries}
+
+    def _owner(self, workflow_id: str) -> _Entry | None:
+        for i in reversed(range(len(self._sources))):
+            entry = self._entries[i].get(workflow_id)
+            if entry is not None:
+                return entry
+        return None
+
+    def scan(self) -> set[str]:
+        """Re-read changed sources and return the ids whose effective entry may differ.
+
+        Only file stamps are checked for unchanged sources. Safe to call from
+        a worker thread; the registry is not touched.
+        """
+        affected: set[str] = set()
+        for i, source in enumerate(self._sources):
+            stamps = self._stat(source)
+            if stamps == self._stamps[i]:
+                continue
+            self._stamps[i] = stamps
+            entries = self._load(source)
+            if entries is None:
+                continue
+            affected |= set(entries) | set(self._entries[i])
+            self._entries[i] = entries
+            # The catalog's prompt file list may have grown; stamp the new files too.
+            self._stamps[i] = self._stat(source)
+        return affected
+
+    def apply(self, affected: Iterable[str]) -> ReloadResult | None:
+        """Swap changed workflows into the registry as one versioned update.
+
+        Call on the thread that serves requests (the event loop), so no
+        request sees a partially applied reload.
+
+        Returns:
+            What changed, or ``None`` if nothing did.
+        """
+        updates: dict[str, WorkflowSummary] = {}
+        removals: list[str] = []
+        for workflow_id in sorted(affected):
+            owner = self._owner(workflow_id)
+            if owner is None:
+                if workflow_id in self._applied:
+                    removals.append(workflow_id)
+                    del self._applied[workflow_id]
+                continue
+            key, build = owner
+            if self._applied.get(workflow_id) == key:
+                continue
+            try:
+                updates[workflow_id] = build()
+            except Exception:
+                logger.exception("Could not rebuild workflow %s; keeping the old one", workflow_id)
+                continue
+            self._applied[workflow_id] = key
+
+        if not updates and not removals:
+            return None
+        version = self.registry.swap(updates, removals)
+        logger.info(
+            "Reloaded workflows (version %d): updated %s, removed %s",
+            version,
+            sorted(updates) or "none",
+            removals or "none",
+        )
+        return ReloadResult(tuple(sorted(updates)), tuple(removals), version)
+
+    def poll(self) -> ReloadResult | None:
+        """:meth:`scan` and :meth:`apply` in one step, for synchronous callers."""
+        return self.apply(self.scan())
+
+    async def run(
+        self,
+        on_change: Callable[[ReloadResult], Awaitable[Any]] | None = None,
+        interval: float = DEFAULT_WATCH_INTERVAL,
+    ) -> None:
+        """Poll every ``interval`` seconds until cancelled.
+
+        File reads and module execution run in a worker thread; the swap and
+        ``on_change`` (e.g. sending tools/list_changed) run on the event loop.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            affected = await asyncio.to_thread(self.scan)
+            result = self.apply(affected) if affected else None
+            if result is not None and on_change is not None:
+                await on_change(result)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Benchmark local pre-clustering of voc_clustering feedback.
+
+Generates synthetic feedback lines (a handful of themes written many ways,
+with exact repeats and one-off noise), clusters them with the ``cluster``
+preprocess stage and reports time, input and output size, and the
+summary's theme count.
+
+Requires NumPy (``pip install 'pmkit-mcp-server[cluster]'``).
+
+Usage:
+    python scripts/bench_cluster.py
+    python scripts/bench_cluster.py --lines 10000 100000 --clusters 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from pmkit_mcp.clustering import ClusterSettings, configure_clustering  # noqa: E402
+from pmkit_mcp.renderer import render_workflow  # noqa: E402
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY  # noqa: E402
+
+TOPICS = {
+    "search": (
+        ["search", "search results", "finding documents", "the search bar"],
+        [
+            "never finds what I need",
+            "is too slow",
+            "ignores exact matches",
+            "returns stale results",
+        ],
+    ),
+    "export": (
+        ["CSV export", "the export", "exporting reports", "excel export"],
+        ["puts dates in UTC", "times out on big reports", "drops custom columns", "is missing"],
+    ),
+    "sso": (
+        ["SSO", "SAML login", "single sign-on", "Okta integration"],
+        [
+            "is only on the enterprise plan",
+            "keeps logging us out",
+            "fails for new users",
+            "pricing is too high",
+        ],
+    ),
+    "mobile": (
+        ["the mobile app", "the iOS app", "android app", "mobile notifications"],
+        ["crashes on launch", "drains the battery", "is missing offline mode", "lags behind web"],
+    ),
+    "billing": (
+        ["billing", "invoices", "the pricing page", "seat pricing"],
+        ["charged us twice", "is confusing", "needs annual plans", "lacks PO numbers"],
+    ),
+}
+OPENERS = ["", "Honestly ", "NPS 6: ", "Ticket: ", "Customer says ", "Again, "]
+
+
+def feedback_lines(count: int, seed: int = 7) -> tuple[list[str], list[str]]:
+    """``count`` feedback lines and the topic each was generated from."""
+    rng = random.Random(seed)
+    lines, topics = [], []
+    names = list(TOPICS)
+    for i in range(count):
+        if rng.random() < 0.03:
+            lines.append(f"thanks team #{i}")
+            topics.append("noise")
+            continue
+        topic = rng.choice(names)
+        subjects, complaints = TOPICS[topic]
+        lines.append(f"{rng.choice(OPENERS)}{rng.choice(subjects)} {rng.choice(complaints)}")
+        topics.append(topic)
+    return lines, topics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--clusters", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--show", action="store_true", help="Print the largest summary")
+    args = parser.parse_args()
+
+    workflow = WORKFLOW_REGISTRY["voc_clustering"]
+    configure_clustering(ClusterSettings(min_lines=1, max_clusters=args.clusters))
+    print(f"{'lines':>9}  {'best ms':>9}  {'in KB':>9}  {'out KB':>7}  {'themes':>6}")
+    for count in args.lines:
+        lines, _ = feedback_lines(count)
+        paste = "\n".join(lines)
+        context = {"tenant_name": "Acme Corp", "nps_verbatims": paste}
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            rendered = render_workflow(workflow, context)
+            timings.append(time.perf_counter() - start)
+        (report,) = rendered.preprocessed
+        themes = rendered.user_prompt.count("\nTheme ")
+        print(
+            f"{count:>9,}  {min(timings) * 1e3:>9.1f}  {report.original_bytes / 1024:>9.0f}"
+            f"  {report.kept_bytes / 1024:>7.1f}  {themes:>6}"
+        )
+    if args.show:
+        print()
+        print(rendered.user_prompt)
+    configure_clustering(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Compare wire size and latency of the call_tool response modes.
+
+For each response mode this renders ``daily_brief`` with large pasted
+inputs, serializes the tool result the way the MCP SDK puts it on the wire,
+and parses it back the way a host would (including the extra ``json.loads``
+the ``json`` mode needs to reach the prompts).
+
+Usage:
+    python scripts/bench_encoding.py
+    python scripts/bench_encoding.py --sizes 1048576 10485760 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from mcp.types import CallToolResult  # noqa: E402
+
+from pmkit_mcp import responses  # noqa: E402
+from pmkit_mcp.renderer import render_workflow  # noqa: E402
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY  # noqa: E402
+
+DEFAULT_SIZES = [64 << 10, 1 << 20, 8 << 20]
+
+SAMPLE = (
+    '2026-01-13 09:14 alice: "Search is timing out again" for Globex\n'
+    "> quoted reply: can we get a repro?\n"
+    "\tbob: repro attached, see ticket #1234 \\ logs in /var/log/search\n"
+)
+
+
+def _to_result(content: object) -> CallToolResult:
+    if isinstance(content, CallToolResult):
+        return content
+    return CallToolResult(content=list(content), isError=False)  # type: ignore[arg-type]
+
+
+def measure(mode: str, size: int, repeat: int) -> tuple[int, float, float]:
+    """Return (wire_bytes, best_server_ms, best_client_ms) for one mode and input size."""
+    # Lift the token budget so the full input reaches the encoder.
+    workflow = replace(WORKFLOW_REGISTRY["daily_brief"], prompt_budget=sys.maxsize)
+    blob = (SAMPLE * (size // len(SAMPLE) + 1))[:size]
+    context = {
+        "user_name": "Jane PM",
+        "tenant_name": "Acme Corp",
+        "current_date": "2026-01-13",
+        "slack_messages": blob,
+    }
+    rendered = render_workflow(workflow, context)
+
+    server_times, client_times = [], []
+    wire = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = _to_result(responses.build_workflow_response(workflow, rendered, mode))
+        wire = result.model_dump_json(by_alias=True, exclude_none=True).encode()
+        server_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        parsed = CallToolResult.model_validate_json(wire)
+        if mode == "json":
+            prompt = json.loads(parsed.content[0].text)["user_prompt"]
+        else:
+            prompt = parsed.content[-1].text
+        client_times.append(time.perf_counter() - start)
+        assert prompt == rendered.user_prompt
+
+    return len(wire), min(server_times) * 1e3, min(client_times) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Bytes of pasted input"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fast = responses.orjson is not None
+    variants: list[tuple[str, str, bool]] = [("json (stdlib)", "json", False)]
+    if fast:
+        variants.append(("json (orjson)", "json", True))
+    variants += [("blocks", "blocks", fast), ("structured", "structured", fast)]
+
+    orjson_module = responses.orjson
+    print(f"{'input':>10}  {'mode':<14}  {'wire bytes':>12}  {'server ms':>9}  {'client ms':>9}")
+    for size in args.sizes:
+        for label, mode, use_orjson in variants:
+            responses.orjson = orjson_module if use_orjson else None
+            wire, server_ms, client_ms = measure(mode, size, args.repeat)
+            print(f"{size:>10,}  {label:<14}  {wire:>12,}  {server_ms:>9.2f}  {client_ms:>9.2f}")
+        print()
+    responses.orjson = orjson_module
+
+
+if __name__ == "__main__":
+    main()
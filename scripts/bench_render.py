@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Benchmark render_prompt against total input size.
+
+Renders ``daily_brief`` with every optional field filled to a growing size
+and reports time per render and throughput. Because templates are compiled
+once into literal/slot segments, time per byte should stay roughly flat as
+the input grows (linear total cost).
+
+Usage:
+    python scripts/bench_render.py
+    python scripts/bench_render.py --sizes 1024 1048576 8388608 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from pmkit_mcp.renderer import render_prompt  # noqa: E402
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY  # noqa: E402
+
+DEFAULT_SIZES = [1 << 10, 16 << 10, 256 << 10, 1 << 20, 4 << 20, 16 << 20]
+
+
+def _build_context(workflow_id: str, size_per_field: int) -> dict[str, str]:
+    """Fill required fields with short values and optional fields with ``size_per_field`` bytes."""
+    workflow = WORKFLOW_REGISTRY[workflow_id]
+    line = "2026-01-13 09:14 #eng-search alice: reindex finished, p95 {{latency}} down 40%\n"
+    blob = (line * (size_per_field // len(line) + 1))[:size_per_field]
+    context = {f.name: f.example or f.name for f in workflow.required_fields}
+    context.update({f.name: blob for f in workflow.optional_fields})
+    return context
+
+
+def bench(workflow_id: str, sizes: list[int], repeat: int) -> list[tuple[int, float]]:
+    """Return ``(total_input_bytes, best_seconds)`` for each size."""
+    workflow = WORKFLOW_REGISTRY[workflow_id]
+    results: list[tuple[int, float]] = []
+    for size in sizes:
+        context = _build_context(workflow_id, size)
+        total = sum(len(v) for v in context.values())
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            render_prompt(workflow, context)
+            timings.append(time.perf_counter() - start)
+        results.append((total, min(timings)))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workflow", default="daily_brief")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Bytes per optional field"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = bench(args.workflow, args.sizes, args.repeat)
+
+    print(f"{'input bytes':>14}  {'best ms':>10}  {'MB/s':>10}  {'ns/byte':>8}")
+    per_byte = []
+    for total, seconds in results:
+        ns_per_byte = seconds * 1e9 / total
+        per_byte.append(ns_per_byte)
+        mb_per_s = total / seconds / 1e6
+        print(f"{total:>14,}  {seconds * 1e3:>10.3f}  {mb_per_s:>10.1f}  {ns_per_byte:>8.3f}")
+
+    # Small inputs are dominated by fixed overhead; judge linearity on the large half.
+    tail = per_byte[len(per_byte) // 2 :]
+    if len(tail) > 1:
+        spread = max(tail) / statistics.median(tail)
+        print(f"\nns/byte spread over largest inputs: {spread:.2f}x (≈1.0 means linear)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Build the index of an external workflow catalog.
+
+Scans ``<catalog>/*/workflow.json`` and writes ``<catalog>/index.json``, the
+only file the server reads at startup (see pmkit_mcp/workflows/catalog.py).
+Run it after adding or editing a workflow.
+
+Usage:
+    python scripts/build_catalog.py path/to/catalog
+    python scripts/build_catalog.py path/to/catalog --export-builtins
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from pmkit_mcp.workflows.catalog import CatalogError, build_index, export_workflow  # noqa: E402
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("catalog", type=Path, help="Catalog directory")
+    parser.add_argument(
+        "--export-builtins",
+        action="store_true",
+        help="First write the built-in workflows into the catalog, as a starting point",
+    )
+    args = parser.parse_args()
+
+    if args.export_builtins:
+        for workflow_id in WORKFLOW_REGISTRY:
+            export_workflow(WORKFLOW_REGISTRY[workflow_id], args.catalog)
+            print(f"  Exported: {workflow_id}/")
+
+    try:
+        count = build_index(args.catalog)
+    except CatalogError as e:
+        sys.exit(f"error: {e}")
+    print(f"Indexed {count} workflow(s) in {args.catalog / 'index.json'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,27 +2,51 @@
 """Generate Claude Cowork plugin command files from the workflow registry.
 
 Reads WorkflowDefinition objects from pmkit_mcp/workflows/registry.py and
-generates one markdown command file per workflow in plugin/commands/.
+generates one markdown command file per workflow in plugin/commands/ and one
+skill per workflow in plugin/skills/.
+
+Builds are incremental. plugin/.build-manifest.json records, per workflow, a
+hash of its inputs (the definition plus this generator's source) and of each
+output file. A workflow whose inputs and outputs still match is skipped
+without regenerating it. Outputs are only written when their content
+changes, so untouched files keep their mtimes. Workflows are built in
+parallel.
 
 Usage:
-    python scripts/build_plugin.py
+    python scripts/build_plugin.py           # regenerate what changed
+    python scripts/build_plugin.py --check   # exit 1 if any output is stale; writes nothing
+    python scripts/build_plugin.py --watch   # rebuild whenever registry.py changes
+    python scripts/build_plugin.py --force   # ignore the manifest
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
+import os
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 # Ensure the project root is on sys.path so we can import pmkit_mcp
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from pmkit_mcp.workflows.catalog import summary_to_dict
 from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY, WorkflowDefinition
+from pmkit_mcp.workflows.watch import WorkflowWatcher
 
 PLUGIN_DIR = PROJECT_ROOT / "plugin"
 COMMANDS_DIR = PLUGIN_DIR / "commands"
 SKILLS_DIR = PLUGIN_DIR / "skills"
+MANIFEST_PATH = PLUGIN_DIR / ".build-manifest.json"
+
+# Changing the generator changes every output, so its source is part of each input hash.
+GENERATOR_HASH = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
 
 # Map workflow IDs to shorter slash-command names
 COMMAND_NAME_MAP: dict[str, str] = {
@@ -194,35 +218,202 @@ Fill in the following template with the collected values. Replace each {{{{place
     return content
 
 
-def main() -> None:
-    COMMANDS_DIR.mkdir(parents=True, exist_ok=True)
-    SKILLS_DIR.mkdir(parents=True, exist_ok=True)
-
-    generated_commands = []
-    generated_skills = []
-
-    for wf_id, workflow in WORKFLOW_REGISTRY.items():
-        command_name = COMMAND_NAME_MAP.get(wf_id, wf_id.replace("_", "-"))
-
-        # Generate command file
-        filepath = COMMANDS_DIR / f"{command_name}.md"
-        content = generate_command_file(workflow, command_name)
-        filepath.write_text(content)
-        generated_commands.append(command_name)
-        print(f"  Generated: commands/{command_name}.md")
-
-        # Generate skill file
-        skill_dir = SKILLS_DIR / command_name
-        skill_dir.mkdir(parents=True, exist_ok=True)
-        skill_filepath = skill_dir / "SKILL.md"
-        skill_content = generate_skill_file(workflow, command_name)
-        skill_filepath.write_text(skill_content)
-        generated_skills.append(command_name)
-        print(f"  Generated: skills/{command_name}/SKILL.md")
-
-    print(f"\nGenerated {len(generated_commands)} command files in {COMMANDS_DIR}")
-    print(f"Generated {len(generated_skills)} skill files in {SKILLS_DIR}")
+# ---------------------------------------------------------------------------
+# Incremental build
+# ---------------------------------------------------------------------------
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_hash(path: Path) -> str | None:
+    try:
+        return _sha256(path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
+
+
+def input_hash(workflow: WorkflowDefinition, command_name: str) -> str:
+    """Hash everything a workflow's generated files depend on."""
+    payload = json.dumps(
+        [
+            GENERATOR_HASH,
+            command_name,
+            summary_to_dict(workflow),
+            workflow.system_prompt,
+            workflow.user_prompt_template,
+        ],
+        sort_keys=True,
+    )
+    return _sha256(payload.encode())
+
+
+def generate_outputs(workflow: WorkflowDefinition, command_name: str) -> dict[str, bytes]:
+    """Generated files for one workflow, keyed by path relative to plugin/."""
+    return {
+        f"commands/{command_name}.md": generate_command_file(workflow, command_name).encode(),
+        f"skills/{command_name}/SKILL.md": generate_skill_file(workflow, command_name).encode(),
+    }
+
+
+@dataclass
+class WorkflowBuild:
+    """Outcome of building one workflow's outputs."""
+
+    workflow_id: str
+    manifest_entry: dict[str, object]
+    skipped: bool = False
+    written: list[str] = field(default_factory=list)
+    stale: list[str] = field(default_factory=list)
+
+
+def build_workflow(
+    workflow: WorkflowDefinition,
+    previous: dict | None,
+    *,
+    check: bool = False,
+    force: bool = False,
+) -> WorkflowBuild:
+    """Regenerate one workflow's files if its inputs or outputs changed.
+
+    With ``check``, nothing is written; outputs that would change are listed
+    in ``stale`` instead.
+    """
+    command_name = COMMAND_NAME_MAP.get(workflow.id, workflow.id.replace("_", "-"))
+    digest = input_hash(workflow, command_name)
+    if (
+        not force
+        and previous is not None
+        and previous.get("input") == digest
+        and all(_file_hash(PLUGIN_DIR / p) == h for p, h in previous["outputs"].items())
+    ):
+        return WorkflowBuild(workflow.id, previous, skipped=True)
+
+    result = WorkflowBuild(workflow.id, {"input": digest, "outputs": {}})
+    for rel_path, content in generate_outputs(workflow, command_name).items():
+        content_hash = _sha256(content)
+        result.manifest_entry["outputs"][rel_path] = content_hash  # type: ignore[index]
+        if _file_hash(PLUGIN_DIR / rel_path) == content_hash:
+            continue
+        if check:
+            result.stale.append(rel_path)
+        else:
+            _write_atomic(PLUGIN_DIR / rel_path, content)
+            result.written.append(rel_path)
+    return result
+
+
+def _load_manifest() -> dict[str, dict]:
+    try:
+        return json.loads(MANIFEST_PATH.read_text())["workflows"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return {}
+
+
+def build(*, check: bool = False, force: bool = False, jobs: int | None = None) -> int:
+    """Build all workflows; return the number of stale outputs (``check``) or 0."""
+    manifest = _load_manifest()
+    workflow_ids = list(WORKFLOW_REGISTRY)
+    written: list[str] = []
+    entries: dict[str, dict] = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(
+                build_workflow,
+                WORKFLOW_REGISTRY[wid],
+                manifest.get(wid),
+                check=check,
+                force=force,
+            )
+            for wid in workflow_ids
+        ]
+        for future in futures:
+            result = future.result()
+            if result.stale:
+                # Fail fast: the first stale output is enough to fail the check.
+                pool.shutdown(wait=False, cancel_futures=True)
+                for rel_path in result.stale:
+                    print(f"  Stale: {rel_path}")
+                print("\nGenerated plugin files are out of date; run scripts/build_plugin.py")
+                return len(result.stale)
+            entries[result.workflow_id] = result.manifest_entry
+            written += result.written
+
+    # Outputs of workflows that no longer exist
+    orphans = [
+        rel_path
+        for wid, entry in manifest.items()
+        if wid not in entries
+        for rel_path in entry["outputs"]
+        if (PLUGIN_DIR / rel_path).exists()
+    ]
+    if check:
+        for rel_path in orphans:
+            print(f"  Stale (workflow removed): {rel_path}")
+        if not orphans:
+            print(f"Plugin files are up to date ({len(entries)} workflows)")
+        return len(orphans)
+
+    for rel_path in orphans:
+        (PLUGIN_DIR / rel_path).unlink()
+        print(f"  Removed: {rel_path}")
+    for rel_path in written:
+        print(f"  Generated: {rel_path}")
+    _write_atomic(
+        MANIFEST_PATH,
+        (json.dumps({"workflows": entries}, indent=2, sort_keys=True) + "\n").encode(),
+    )
+    total = sum(len(entry["outputs"]) for entry in entries.values())
+    print(
+        f"\n{len(written)} file(s) written, "
+        f"{total - len(written)} unchanged across {len(entries)} workflows"
+    )
     print("Hand-written commands (pmkit-help.md, pmkit-setup.md) are not overwritten.")
+    return 0
+
+
+def watch(interval: float, jobs: int | None) -> None:
+    """Rebuild whenever registry.py changes, until interrupted."""
+    watcher = WorkflowWatcher(WORKFLOW_REGISTRY)
+    build(jobs=jobs)
+    print("\nWatching pmkit_mcp/workflows/registry.py (Ctrl-C to stop)")
+    print("Restart after editing this script; generator changes are not reloaded.")
+    while True:
+        time.sleep(interval)
+        result = watcher.poll()
+        if result is not None:
+            print(f"\nChanged: {', '.join(result.updated + result.removed)}")
+            build(jobs=jobs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--check", action="store_true", help="Exit 1 if any generated file is stale; write nothing"
+    )
+    mode.add_argument("--watch", action="store_true", help="Rebuild when registry.py changes")
+    parser.add_argument("--force", action="store_true", help="Ignore the build manifest")
+    parser.add_argument("--interval", type=float, default=1.0, help="Watch poll interval (s)")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel workers")
+    args = parser.parse_args()
+
+    if args.watch:
+        try:
+            watch(args.interval, args.jobs)
+        except KeyboardInterrupt:
+            pass
+        return
+    sys.exit(1 if build(check=args.check, force=args.force, jobs=args.jobs) else 0)
 
 
 if __name__ == "__main__":
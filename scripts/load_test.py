@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Local load test for the Streamable HTTP transport.
+
+Starts ``pmkit-mcp --transport http`` with an increasing number of worker
+processes, drives it with concurrent MCP ``tools/call`` requests from several
+client processes, and reports requests/sec for each worker count so that
+scaling with cores can be compared.
+
+Usage:
+    python scripts/load_test.py
+    python scripts/load_test.py --workers 1 2 4 8 --duration 10 --connections 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+HEADERS = {
+    "content-type": "application/json",
+    "accept": "application/json, text/event-stream",
+}
+
+REQUEST_BODY = json.dumps(
+    {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {
+            "name": "daily_brief",
+            "arguments": {
+                "user_name": "Jane PM",
+                "tenant_name": "Acme Corp",
+                "current_date": "2026-01-13",
+                "slack_messages": "#eng-search: reindex finished, p95 down 40%\n" * 200,
+            },
+        },
+    }
+).encode()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server did not become ready at {url}")
+
+
+async def _drive(url: str, connections: int, duration: float) -> tuple[int, int]:
+    """Send requests on ``connections`` keep-alive connections; return (ok, errors)."""
+    ok = errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+
+        async def loop() -> None:
+            nonlocal ok, errors
+            while time.monotonic() < deadline:
+                try:
+                    resp = await client.post(url, content=REQUEST_BODY, headers=HEADERS)
+                    if resp.status_code == 200:
+                        ok += 1
+                    else:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+
+        await asyncio.gather(*(loop() for _ in range(connections)))
+    return ok, errors
+
+
+def _client_process(
+    url: str, connections: int, duration: float, out: multiprocessing.Queue
+) -> None:
+    out.put(asyncio.run(_drive(url, connections, duration)))
+
+
+def run_one(workers: int, clients: int, connections: int, duration: float) -> tuple[float, int]:
+    """Run a load test against a fresh server with ``workers`` processes."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "pmkit_mcp",
+            "--transport",
+            "http",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--max-concurrency",
+            "0",
+            "--stateless",
+            "--json-response",
+        ],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(base + "/healthz")
+        queue: multiprocessing.Queue = multiprocessing.Queue()
+        per_client = max(1, connections // clients)
+        procs = [
+            multiprocessing.Process(
+                target=_client_process, args=(base + "/mcp", per_client, duration, queue)
+            )
+            for _ in range(clients)
+        ]
+        for p in procs:
+            p.start()
+        results = [queue.get() for _ in procs]
+        for p in procs:
+            p.join()
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    ok = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    return ok / duration, errors
+
+
+def main() -> None:
+    cores = os.cpu_count() or 1
+    default_workers = sorted({w for w in (1, 2, 4, 8, cores) if w <= cores})
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument(
+        "--clients", type=int, default=max(2, cores // 2), help="Load-generator processes"
+    )
+    parser.add_argument(
+        "--connections", type=int, default=64, help="Total concurrent connections across clients"
+    )
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per run")
+    args = parser.parse_args()
+
+    print(
+        f"cores={cores} clients={args.clients} connections={args.connections} "
+        f"duration={args.duration}s\n"
+    )
+    print(f"{'workers':>7}  {'req/s':>10}  {'speedup':>7}  {'errors':>6}")
+    baseline = None
+    for workers in args.workers:
+        rps, errors = run_one(workers, args.clients, args.connections, args.duration)
+        baseline = baseline or rps
+        print(f"{workers:>7}  {rps:>10.1f}  {rps / baseline:>6.2f}x  {errors:>6}")
+
+
+if __name__ == "__main__":
+    main()
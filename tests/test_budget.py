@@ -0,0 +1,83 @@
+"""Tests for token estimation and prompt budget enforcement."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+
+from pmkit_mcp.budget import fit_to_budget, truncate
+from pmkit_mcp.tokens import estimate_tokens
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY
+
+LOG = "".join(f"2026-01-{d:02d} 09:00 alice: update number {d}\n" for d in range(1, 29)) * 40
+
+
+def test_estimate_tokens_scales_with_length() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("a" * 4000) == 1000
+    # Non-ASCII text costs more tokens per character.
+    assert estimate_tokens("é" * 300) > estimate_tokens("e" * 300)
+
+
+@pytest.mark.parametrize("policy", ["head", "tail", "middle", "drop_oldest_lines"])
+def test_truncate_respects_limit(policy: str) -> None:
+    shortened = truncate(LOG, 500, policy)
+    assert estimate_tokens(shortened) <= 500 + 1
+    assert "trimmed to fit the prompt budget" in shortened
+
+
+def test_truncate_policies_keep_the_right_end() -> None:
+    assert truncate(LOG, 200, "head").startswith(LOG[:100])
+    assert truncate(LOG, 200, "tail").endswith(LOG[-100:])
+    middle = truncate(LOG, 200, "middle")
+    assert middle.startswith(LOG[:50]) and middle.endswith(LOG[-50:])
+
+
+def test_drop_oldest_lines_cuts_on_line_boundaries() -> None:
+    kept = truncate(LOG, 200, "drop_oldest_lines").split("\n", 1)[1]
+    assert kept.endswith(LOG[-60:])
+    assert kept.startswith("2026-01-")
+
+
+def test_truncate_unknown_policy_rejected() -> None:
+    with pytest.raises(ValueError):
+        truncate(LOG, 10, "random")
+
+
+def test_fit_to_budget_noop_when_small() -> None:
+    wf = WORKFLOW_REGISTRY["daily_brief"]
+    context = {"user_name": "Alice", "tenant_name": "Acme", "current_date": "2026-01-15"}
+    result = fit_to_budget(wf, context)
+    assert result.context == context
+    assert result.trims == ()
+    assert not result.over_budget
+
+
+def test_fit_to_budget_trims_largest_optional_fields_only() -> None:
+    wf = replace(WORKFLOW_REGISTRY["daily_brief"], prompt_budget=3_000)
+    context = {
+        "user_name": "Alice " * 200,
+        "tenant_name": "Acme",
+        "current_date": "2026-01-15",
+        "slack_messages": LOG,
+        "jira_updates": LOG,
+        "support_tickets": "Ticket #1: small",
+    }
+    result = fit_to_budget(wf, context)
+    assert result.estimated_tokens <= wf.prompt_budget
+    trimmed = {t.field: t for t in result.trims}
+    assert set(trimmed) == {"slack_messages", "jira_updates"}
+    assert trimmed["slack_messages"].policy == "drop_oldest_lines"
+    assert trimmed["slack_messages"].trimmed_tokens > 0
+    # Required and small fields survive intact.
+    assert result.context["user_name"] == context["user_name"]
+    assert result.context["support_tickets"] == "Ticket #1: small"
+
+
+def test_fit_to_budget_reports_over_budget_when_required_fields_too_large() -> None:
+    wf = replace(WORKFLOW_REGISTRY["tldr"], prompt_budget=100)
+    result = fit_to_budget(wf, {"source_content": LOG})
+    assert result.over_budget
+    assert result.context["source_content"] == LOG
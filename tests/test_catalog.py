@@ -0,0 +1,113 @@
+"""Tests for file-backed workflow catalogs with lazy prompt loading."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from pmkit_mcp.renderer import render_workflow
+from pmkit_mcp.workflows.catalog import (
+    CatalogError,
+    CatalogWorkflow,
+    build_index,
+    load_catalog,
+    register_catalog,
+    write_catalog,
+)
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY, WorkflowDefinition, WorkflowRegistry
+
+ARGS = {"user_name": "Alice", "tenant_name": "Acme", "current_date": "2026-01-15"}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    write_catalog([WORKFLOW_REGISTRY[wid] for wid in WORKFLOW_REGISTRY], tmp_path)
+    return tmp_path
+
+
+def test_round_trip_preserves_builtin_workflows(catalog) -> None:
+    """Every built-in workflow loads back from a catalog unchanged."""
+    registry = WorkflowRegistry(load_catalog(catalog))
+    assert set(registry) == set(WORKFLOW_REGISTRY)
+    for wid in WORKFLOW_REGISTRY:
+        assert registry[wid] == WORKFLOW_REGISTRY[wid]
+    assert render_workflow(registry["daily_brief"], ARGS) == render_workflow(
+        WORKFLOW_REGISTRY["daily_brief"], ARGS
+    )
+
+
+def test_prompts_load_on_first_lookup_only(catalog) -> None:
+    """Loading a catalog reads only the index; prompts are read when first needed."""
+    registry = WorkflowRegistry(load_catalog(catalog))
+    (catalog / "tldr" / "system.md").write_text("Edited after indexing")
+    version = registry.version
+
+    summary = registry.summary("tldr")
+    assert isinstance(summary, CatalogWorkflow)
+    assert not hasattr(summary, "system_prompt")
+
+    definition = registry["tldr"]
+    assert isinstance(definition, WorkflowDefinition)
+    assert definition.system_prompt == "Edited after indexing"
+    assert registry.summary("tldr") is definition
+    assert registry.version == version
+
+
+def test_missing_prompt_file_raises_catalog_error(catalog) -> None:
+    registry = WorkflowRegistry(load_catalog(catalog))
+    (catalog / "tldr" / "user.md").unlink()
+    with pytest.raises(CatalogError, match="user.md"):
+        registry["tldr"]
+
+
+def test_missing_index_raises_catalog_error(tmp_path) -> None:
+    with pytest.raises(CatalogError, match="index.json"):
+        load_catalog(tmp_path)
+
+
+def test_build_index_rejects_mismatched_id(catalog) -> None:
+    path = catalog / "tldr" / "workflow.json"
+    data = json.loads(path.read_text())
+    path.write_text(json.dumps({**data, "id": "not_tldr"}))
+    with pytest.raises(CatalogError, match="does not match"):
+        build_index(catalog)
+
+
+def test_register_catalog_bumps_version_once(catalog) -> None:
+    registry = WorkflowRegistry()
+    version = registry.version
+    assert register_catalog(registry, catalog) == 13
+    assert registry.version == version + 1
+
+
+def _rewrite_index(catalog, **changes) -> None:
+    path = catalog / "index.json"
+    index = json.loads(path.read_text())
+    index["workflows"][0] = {**index["workflows"][0], **changes}
+    path.write_text(json.dumps(index))
+
+
+@pytest.mark.parametrize("workflow_id", ["../x", "a/b", "a\\b", "..", "", None])
+def test_load_catalog_rejects_ids_outside_the_catalog(catalog, workflow_id) -> None:
+    _rewrite_index(catalog, id=workflow_id)
+    with pytest.raises(CatalogError, match="invalid workflow id"):
+        load_catalog(catalog)
+
+
+def test_load_catalog_rejects_malformed_entries(catalog) -> None:
+    path = catalog / "index.json"
+    index = json.loads(path.read_text())
+    path.write_text(json.dumps({**index, "workflows": ["tldr"]}))
+    with pytest.raises(CatalogError, match="must be objects"):
+        load_catalog(catalog)
+
+
+def test_load_catalog_rejects_unknown_field_options(catalog) -> None:
+    field = {"name": "notes", "description": "Notes"}
+    _rewrite_index(catalog, required_fields=[{**field, "truncation": "sideways"}])
+    with pytest.raises(CatalogError, match="unknown truncation 'sideways'"):
+        load_catalog(catalog)
+    _rewrite_index(catalog, required_fields=[{**field, "preprocess": ["no_such_stage"]}])
+    with pytest.raises(CatalogError, match="unknown preprocess stage 'no_such_stage'"):
+        load_catalog(catalog)
@@ -0,0 +1,94 @@
+"""Tests for local pre-clustering of feedback fields."""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from pmkit_mcp.clustering import (  # noqa: E402
+    ClusterSettings,
+    cluster_lines,
+    configure_clustering,
+    make_cluster_settings,
+)
+from pmkit_mcp.renderer import render_workflow  # noqa: E402
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY  # noqa: E402
+
+TOPICS = {
+    "search": (
+        ["search", "search results", "the search bar"],
+        ["is too slow", "misses exact matches"],
+    ),
+    "export": (["CSV export", "the export"], ["puts dates in UTC", "times out on big reports"]),
+    "mobile": (["the mobile app", "the iOS app"], ["crashes on launch", "drains the battery"]),
+}
+
+
+def _feedback(count: int) -> tuple[list[str], dict[str, str]]:
+    rng = random.Random(3)
+    lines, topic_of = [], {}
+    for _ in range(count):
+        topic = rng.choice(list(TOPICS))
+        subjects, complaints = TOPICS[topic]
+        prefix = rng.choice(["", "NPS 5: ", "Ticket: "])
+        line = f"{prefix}{rng.choice(subjects)} {rng.choice(complaints)}"
+        lines.append(line)
+        topic_of[line] = topic
+    return lines, topic_of
+
+
+@pytest.fixture
+def clustering() -> Iterator[None]:
+    configure_clustering(ClusterSettings(min_lines=50, max_clusters=3))
+    yield
+    configure_clustering(None)
+
+
+def test_themes_are_recovered_with_exact_counts() -> None:
+    lines, topic_of = _feedback(3000)
+    result = cluster_lines([*lines, "", "ok", "ok"], ClusterSettings(min_lines=1, max_clusters=3))
+    assert result.total == 3002
+    assert result.unclustered == 2  # "ok" has no recurring terms
+    assert result.unclustered_examples == (("ok", 2),)
+    assert sum(c.count for c in result.clusters) == 3000
+    assert [c.count for c in result.clusters] == sorted(
+        (c.count for c in result.clusters), reverse=True
+    )
+    for cluster in result.clusters:
+        topics = {topic_of[text] for text, _ in cluster.examples}
+        assert len(topics) == 1, cluster
+        assert len(cluster.examples) == 3
+        assert all(repeats > 1 for _, repeats in cluster.examples)
+
+
+def test_same_input_same_summary() -> None:
+    lines, _ = _feedback(500)
+    settings = ClusterSettings(min_lines=1, max_clusters=4)
+    assert cluster_lines(lines, settings) == cluster_lines(lines, settings)
+    assert make_cluster_settings(0) is None
+
+
+def test_stage_is_a_pass_through_unless_enabled() -> None:
+    lines, _ = _feedback(200)
+    context = {"tenant_name": "Acme", "support_tickets": "\n".join(lines)}
+    rendered = render_workflow(WORKFLOW_REGISTRY["voc_clustering"], context)
+    assert "Pre-clustered" not in rendered.user_prompt
+
+
+def test_large_fields_are_condensed(clustering: None) -> None:
+    lines, _ = _feedback(20_000)
+    context = {
+        "tenant_name": "Acme",
+        "support_tickets": "\n".join(lines),
+        "nps_verbatims": "Search is slow\nLove the export",  # below min_lines
+    }
+    rendered = render_workflow(WORKFLOW_REGISTRY["voc_clustering"], context)
+    assert "[Pre-clustered locally: 20,000 lines in 3 themes." in rendered.user_prompt
+    assert "Search is slow\nLove the export" in rendered.user_prompt
+    (report,) = rendered.preprocessed
+    assert report.field == "support_tickets" and "cluster" in report.stages
+    assert report.kept_bytes * 50 < report.original_bytes
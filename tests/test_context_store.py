@@ -0,0 +1,128 @@
+"""Tests for the content-addressed context store and ref resolution."""
+
+from __future__ import annotations
+
+import pytest
+
+from pmkit_mcp.context_store import (
+    REF_PREFIX,
+    ContextRefError,
+    ContextStore,
+    content_hash,
+    parse_ref,
+    resolve_refs,
+)
+from pmkit_mcp.renderer import render_batch
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ContextStore(max_memory_bytes=100, max_disk_bytes=250, spill_dir=tmp_path)
+    yield store
+    store.close()
+
+
+def test_put_is_content_addressed_and_idempotent(store) -> None:
+    digest, size = store.put("héllo")
+    assert digest == content_hash("héllo")
+    assert size == len("héllo".encode())
+    assert store.put("héllo") == (digest, size)
+    assert store.get(digest) == "héllo"
+    assert store.stats()["entries"] == 1
+
+
+def test_least_recently_used_blobs_spill_to_disk_and_stay_readable(store, tmp_path) -> None:
+    first, _ = store.put("a" * 60)
+    second, _ = store.put("b" * 60)
+    (spill_dir,) = tmp_path.iterdir()
+    assert (spill_dir / first).exists()
+    assert not (spill_dir / second).exists()
+    assert store.stats()["spills"] == 1
+    assert store.stats()["memory_bytes"] == 60
+    assert store.get(first) == "a" * 60
+
+
+def test_spilled_blobs_keep_line_endings(store) -> None:
+    text = "line one\r\nline two\rline three\n" * 3
+    digest, _ = store.put(text)
+    store.put("x" * 90)
+    assert store.stats()["spills"] == 1
+    assert store.get(digest) == text
+    assert content_hash(store.get(digest)) == digest
+
+
+def test_disk_limit_evicts_oldest_spilled_blob(store) -> None:
+    digests = [store.put(ch * 60)[0] for ch in "abcdef"]
+    # 60 bytes in memory; four spilled blobs would exceed the 250 byte disk budget.
+    assert store.stats()["disk_bytes"] <= 250
+    assert store.get(digests[0]) is None
+    assert store.get(digests[-1]) == "f" * 60
+
+
+def test_unused_blobs_expire(tmp_path, monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr("pmkit_mcp.context_store.time.monotonic", lambda: now[0])
+    store = ContextStore(ttl_seconds=10, spill_dir=tmp_path)
+    digest, _ = store.put("short-lived")
+    now[0] += 5
+    assert store.get(digest) == "short-lived"  # use refreshes the TTL
+    now[0] += 9
+    assert store.get(digest) == "short-lived"
+    now[0] += 11
+    assert store.get(digest) is None
+    assert store.stats()["expirations"] == 1
+
+
+def test_close_removes_temporary_spill_directory() -> None:
+    store = ContextStore(max_memory_bytes=1)
+    digest, _ = store.put("spilled")
+    spill_dir = store._spill_dir
+    assert spill_dir is not None and (spill_dir / digest).exists()
+    store.close()
+    assert not spill_dir.exists()
+
+
+def test_stores_sharing_a_spill_dir_keep_apart(tmp_path) -> None:
+    stores = [ContextStore(max_memory_bytes=1, spill_dir=tmp_path) for _ in range(2)]
+    digests = [store.put("same text")[0] for store in stores]
+    assert len(list(tmp_path.iterdir())) == 2
+    stores[0].close()
+    assert stores[1].get(digests[1]) == "same text"
+    stores[1].close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parse_ref_accepts_only_sha256_refs() -> None:
+    digest = "ab" * 32
+    assert parse_ref(f"{REF_PREFIX}{digest}") == digest
+    assert parse_ref(f"{REF_PREFIX} {digest.upper()} ") == digest
+    assert parse_ref("ref:not-a-hash") is None
+    assert parse_ref("plain text") is None
+    assert parse_ref(42) is None
+
+
+def test_resolve_refs_substitutes_content_and_counts_savings(store) -> None:
+    digest, size = store.put("x" * 80)
+    ref = REF_PREFIX + digest
+    resolved = resolve_refs({"source_content": ref, "audience": "execs"}, store)
+    assert resolved.arguments == {"source_content": "x" * 80, "audience": "execs"}
+    assert resolved.refs == 1
+    assert resolved.bytes_saved == size - len(ref)
+
+    with pytest.raises(ContextRefError) as excinfo:
+        resolve_refs({"source_content": REF_PREFIX + "0" * 64}, store)
+    assert excinfo.value.field == "source_content"
+
+
+def test_render_batch_resolves_refs_per_item(store) -> None:
+    digest, _ = store.put("Filters shipped")
+    results = render_batch(
+        [
+            ("tldr", {"source_content": REF_PREFIX + digest}),
+            ("tldr", {"source_content": REF_PREFIX + "0" * 64}),
+        ],
+        context_store=store,
+    )
+    assert "Filters shipped" in results[0].rendered.user_prompt
+    assert results[0].context_refs == 1
+    assert "pmkit_put_context" in results[1].error
@@ -0,0 +1,199 @@
+"""Tests for server-side prompt execution against a local fake model endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import anyio
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from pmkit_mcp.executor import ExecutorError, ExecutorSettings, LLMExecutor
+from pmkit_mcp.renderer import render_workflow
+from pmkit_mcp.server import create_server
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY
+
+CHUNKS = ["- Filters ", "shipped", " on time"]
+
+
+class FakeModelServer:
+    """Streams ``CHUNKS`` in the OpenAI or Anthropic SSE format.
+
+    ``fail_with`` holds statuses to answer before succeeding; every request's
+    headers and JSON body are recorded in ``requests``.
+    """
+
+    def __init__(self, chunk_delay: float = 0.0) -> None:
+        self.fail_with: list[int] = []
+        self.requests: list[tuple[dict[str, str], dict]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chunk_delay = chunk_delay
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                body = json.loads(self.rfile.read(int(self.headers["content-length"])))
+                with fake._lock:
+                    fake.requests.append((dict(self.headers.items()), body))
+                    status = fake.fail_with.pop(0) if fake.fail_with else 200
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                try:
+                    if status != 200:
+                        self.send_response(status)
+                        self.send_header("retry-after", "0")
+                        self.end_headers()
+                        self.wfile.write(b'{"error": "nope"}')
+                        return
+                    self.send_response(200)
+                    self.send_header("content-type", "text/event-stream")
+                    self.end_headers()
+                    for event in fake.events(self.path):
+                        self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                        self.wfile.flush()
+                        time.sleep(fake.chunk_delay)
+                    if self.path.endswith("/chat/completions"):
+                        self.wfile.write(b"data: [DONE]\n\n")
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+    @staticmethod
+    def events(path: str) -> list[dict]:
+        if path.endswith("/messages"):
+            return [
+                {"type": "message_start", "message": {"id": "msg_1"}},
+                *(
+                    {"type": "content_block_delta", "delta": {"type": "text_delta", "text": c}}
+                    for c in CHUNKS
+                ),
+                {"type": "message_stop"},
+            ]
+        return [{"choices": [{"delta": {"content": c}}]} for c in CHUNKS]
+
+
+@pytest.fixture
+def model_server():
+    server = FakeModelServer()
+    yield server
+    server.httpd.shutdown()
+
+
+def _executor(url: str, **overrides) -> LLMExecutor:
+    settings = {"base_url": url, "model": "fake-1", "api_key": "k", "backoff": 0.0}
+    return LLMExecutor(ExecutorSettings(**{**settings, **overrides}))
+
+
+async def test_openai_stream_is_forwarded_chunk_by_chunk(model_server) -> None:
+    received: list[str] = []
+
+    async def on_token(text: str) -> None:
+        received.append(text)
+
+    async with _executor(model_server.url) as executor:
+        completion = await executor.complete("be brief", "what shipped?", on_token)
+    assert received == CHUNKS
+    assert completion.text == "".join(CHUNKS)
+    assert completion.attempts == 1
+    headers, body = model_server.requests[0]
+    assert headers["authorization"] == "Bearer k"
+    assert body["stream"] is True
+    assert body["messages"][0] == {"role": "system", "content": "be brief"}
+
+
+async def test_anthropic_dialect(model_server) -> None:
+    async with _executor(model_server.url, api="anthropic") as executor:
+        completion = await executor.complete("be brief", "what shipped?")
+    assert completion.text == "".join(CHUNKS)
+    headers, body = model_server.requests[0]
+    assert headers["x-api-key"] == "k"
+    assert body["system"] == "be brief"
+    assert body["messages"] == [{"role": "user", "content": "what shipped?"}]
+
+
+async def test_retryable_failures_are_retried(model_server) -> None:
+    model_server.fail_with = [503, 429]
+    async with _executor(model_server.url) as executor:
+        completion = await executor.complete("s", "u")
+        assert executor.retries == 2
+    assert completion.attempts == 3
+    assert completion.text == "".join(CHUNKS)
+
+
+async def test_attempts_are_counted_per_call(model_server) -> None:
+    model_server.fail_with = [503]
+    async with _executor(model_server.url) as executor:
+        completions = await asyncio.gather(*(executor.complete("s", f"u{i}") for i in range(4)))
+        assert executor.requests == 5
+    assert sorted(c.attempts for c in completions) == [1, 1, 1, 2]
+
+
+async def test_client_errors_and_exhausted_retries_raise(model_server) -> None:
+    model_server.fail_with = [400]
+    async with _executor(model_server.url) as executor:
+        with pytest.raises(ExecutorError) as excinfo:
+            await executor.complete("s", "u")
+    assert excinfo.value.status == 400
+    assert len(model_server.requests) == 1
+
+    model_server.fail_with = [503, 503]
+    async with _executor(model_server.url, max_retries=1) as executor:
+        with pytest.raises(ExecutorError) as excinfo:
+            await executor.complete("s", "u")
+    assert excinfo.value.status == 503
+
+
+async def test_concurrent_executions_are_bounded() -> None:
+    model_server = FakeModelServer(chunk_delay=0.02)
+    try:
+        workflow = WORKFLOW_REGISTRY["tldr"]
+        prompts = [render_workflow(workflow, {"source_content": f"item {i}"}) for i in range(6)]
+        async with _executor(model_server.url, max_concurrency=2) as executor:
+            outputs = await asyncio.gather(*(executor.execute(p) for p in prompts))
+    finally:
+        model_server.httpd.shutdown()
+    assert [o.text for o in outputs] == ["".join(CHUNKS)] * 6
+    assert model_server.max_in_flight == 2
+
+
+async def test_server_executes_workflows_and_streams_progress(model_server) -> None:
+    executor = _executor(model_server.url)
+    server = create_server(executor=executor)
+    progress: list[str] = []
+
+    async def on_progress(done: float, total: float | None, message: str | None) -> None:
+        progress.append(message or "")
+
+    try:
+        async with create_connected_server_and_client_session(server) as client:
+            with anyio.fail_after(10):
+                result = await client.call_tool(
+                    "tldr", {"source_content": "Filters shipped"}, progress_callback=on_progress
+                )
+                prompts = await client.call_tool(
+                    "tldr", {"source_content": "Filters shipped", "pmkit_execute": False}
+                )
+                batch = await client.call_tool(
+                    "pmkit_render_batch",
+                    {"items": [{"workflow_id": "tldr", "arguments": {"source_content": "x"}}]},
+                )
+    finally:
+        await executor.aclose()
+
+    assert json.loads(result.content[0].text)["output"] == "".join(CHUNKS)
+    assert "".join(progress) == "".join(CHUNKS)
+    assert "user_prompt" in json.loads(prompts.content[0].text)
+    assert json.loads(batch.content[0].text)["results"][0]["output"] == "".join(CHUNKS)
@@ -0,0 +1,93 @@
+"""Tests for the Streamable HTTP transport."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+from pmkit_mcp.http_app import HttpSettings, create_app
+from pmkit_mcp.server import _parse_args
+
+HEADERS = {
+    "content-type": "application/json",
+    "accept": "application/json, text/event-stream",
+}
+
+
+def _rpc(method: str, params: dict | None = None) -> str:
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}})
+
+
+def test_settings_round_trip_through_env() -> None:
+    """Worker processes must rebuild identical settings from the environment."""
+    settings = HttpSettings(port=9001, workers=1, max_concurrency=8, json_response=True)
+    assert HttpSettings.from_env(settings.to_env()) == settings
+
+
+def test_multiple_workers_imply_stateless() -> None:
+    """Sessions cannot span worker processes, so workers > 1 forces stateless mode."""
+    assert HttpSettings(workers=4).stateless is True
+    assert HttpSettings(workers=1).stateless is False
+
+
+def test_invalid_worker_count_rejected() -> None:
+    with pytest.raises(ValueError):
+        HttpSettings(workers=0)
+    with pytest.raises(ValueError, match="clusters"):
+        HttpSettings(clusters=0)
+
+
+def test_cli_parses_http_options() -> None:
+    args = _parse_args(["--transport", "http", "--workers", "3", "--keep-alive", "5"])
+    assert args.transport == "http"
+    assert args.workers == 3
+    assert args.keep_alive == 5
+
+
+def test_cli_rejects_fewer_than_one_cluster() -> None:
+    assert _parse_args(["--clusters", "4"]).clusters == 4
+    with pytest.raises(SystemExit):
+        _parse_args(["--clusters", "0"])
+
+
+def test_healthz() -> None:
+    with TestClient(create_app(HttpSettings(stateless=True))) as client:
+        resp = client.get("/healthz")
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "ok"
+
+
+def test_stateless_tools_call_over_http() -> None:
+    """A stateless JSON-mode server answers tools/call without a prior initialize."""
+    app = create_app(HttpSettings(stateless=True, json_response=True))
+    params = {
+        "name": "daily_brief",
+        "arguments": {"user_name": "Alice", "tenant_name": "Acme", "current_date": "2026-01-15"},
+    }
+    with TestClient(app) as client:
+        resp = client.post("/mcp", content=_rpc("tools/call", params), headers=HEADERS)
+    assert resp.status_code == 200
+    text = resp.json()["result"]["content"][0]["text"]
+    assert "Alice" in json.loads(text)["user_prompt"]
+
+
+def test_tools_manifest_supports_conditional_get() -> None:
+    """GET /tools returns an ETag and answers 304 when it still matches."""
+    with TestClient(create_app(HttpSettings(stateless=True))) as client:
+        first = client.get("/tools")
+        etag = first.headers["etag"]
+        second = client.get("/tools", headers={"if-none-match": etag})
+    assert first.status_code == 200
+    assert len(first.json()["tools"]) == 18
+    assert second.status_code == 304
+
+
+def test_metrics_endpoint_exposes_prometheus_text() -> None:
+    with TestClient(create_app(HttpSettings(stateless=True, json_response=True))) as client:
+        client.post("/mcp", content=_rpc("tools/list"), headers=HEADERS)
+        resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert 'pmkit_tool_calls_total{tool="tools/list"} 1' in resp.text
@@ -0,0 +1,81 @@
+"""Tests for per-tool metrics and their Prometheus exposition."""
+
+from __future__ import annotations
+
+import urllib.request
+
+import pytest
+
+from pmkit_mcp.metrics import (
+    Histogram,
+    ServerMetrics,
+    argument_bytes,
+    render_prometheus,
+    serve_metrics,
+    write_metrics_file,
+)
+
+
+def test_histogram_buckets_and_quantiles() -> None:
+    histogram = Histogram((1.0, 2.0, 4.0))
+    for value in (0.5, 1.0, 1.5, 3.0, 10.0):
+        histogram.observe(value)
+    # Upper bounds are inclusive, as in Prometheus' "le".
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5
+    assert histogram.max == 10.0
+    assert 1.0 <= histogram.quantile(0.5) <= 2.0
+    assert histogram.quantile(1.0) == 10.0
+    assert Histogram((1.0,)).quantile(0.5) == 0.0
+
+
+def test_argument_bytes_counts_utf8() -> None:
+    assert argument_bytes({"a": "xyz"}) == 4
+    assert argument_bytes({"a": "é"}) == 3
+    assert argument_bytes({"items": [1, 2]}) == len("items") + len("[1,2]")
+
+
+def test_unknown_tools_share_one_label() -> None:
+    metrics = ServerMetrics(known_tools=lambda name: name == "tldr")
+    metrics.tool("tldr").calls += 1
+    metrics.tool("random-1").calls += 1
+    metrics.tool("random-2").calls += 1
+    assert [name for name, _ in metrics.items()] == ["_unknown", "tldr"]
+    assert metrics.tool("whatever").calls == 2
+
+
+def test_render_prometheus_histogram_is_cumulative() -> None:
+    metrics = ServerMetrics()
+    tool = metrics.tool("tldr")
+    tool.calls = 2
+    tool.latency.observe(0.0001)
+    tool.latency.observe(20.0)
+    text = render_prometheus(
+        metrics,
+        {"hits": 1, "misses": 2, "evictions": 0, "entries": 1, "bytes": 10, "max_bytes": 100},
+    )
+    assert 'pmkit_tool_calls_total{tool="tldr"} 2' in text
+    assert 'pmkit_tool_latency_seconds_bucket{tool="tldr",le="0.0005"} 1' in text
+    assert 'pmkit_tool_latency_seconds_bucket{tool="tldr",le="10.0"} 1' in text
+    assert 'pmkit_tool_latency_seconds_bucket{tool="tldr",le="+Inf"} 2' in text
+    assert "pmkit_render_cache_misses_total 2" in text
+
+
+def test_write_metrics_file_replaces_atomically(tmp_path) -> None:
+    target = tmp_path / "pmkit.prom"
+    write_metrics_file(target, "a 1\n")
+    write_metrics_file(target, "a 2\n")
+    assert target.read_text() == "a 2\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["pmkit.prom"]
+
+
+def test_serve_metrics_over_http() -> None:
+    httpd = serve_metrics("127.0.0.1", 0, lambda: "pmkit_up 1\n")
+    try:
+        port = httpd.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as resp:
+            assert resp.read() == b"pmkit_up 1\n"
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/other")
+    finally:
+        httpd.shutdown()
@@ -0,0 +1,138 @@
+"""Tests for BM25 passage selection of long source documents."""
+
+from __future__ import annotations
+
+import json
+
+from pmkit_mcp.passages import (
+    MAX_PASSAGE_TOKENS,
+    PassageIndex,
+    PassageIndexCache,
+    chunk_passages,
+    make_passage_index_cache,
+    select_context,
+    terms,
+)
+from pmkit_mcp.server import create_server
+from pmkit_mcp.tokens import estimate_tokens
+from tests.test_server import _call_tool
+
+FILLER = (
+    "The office move to the new building happens in March with parking changes. "
+    "Marketing events include three conferences and a partner summit. "
+)
+SEARCH = "Search results: filters shipped in Q1 and search latency dropped 40%."
+ROI = "Search ROI: tickets about searching fell by a third, saving two support hires."
+
+
+def _document(paragraphs: int = 400) -> str:
+    body = [FILLER * 3 for _ in range(paragraphs)]
+    body[paragraphs // 4] = SEARCH
+    body[paragraphs * 3 // 4] = ROI
+    return "\n\n".join(body)
+
+
+def test_terms_and_chunking() -> None:
+    assert terms("The filters, Searching & ROI's") == ["filter", "search", "roi"]
+    passages = chunk_passages(_document(50) + "\n\n" + "x" * 20_000)
+    assert all(estimate_tokens(p) <= MAX_PASSAGE_TOKENS for p in passages)
+    assert "".join(passages).count("x") == 20_000
+
+
+def test_bm25_ranks_relevant_passages_first() -> None:
+    index = PassageIndex(_document())
+    scores = index.scores("search ROI numbers")
+    best = max(scores, key=scores.get)
+    assert ROI in index.passages[best]
+    assert {i for i in scores if scores[i] > 0} == {
+        i for i, p in enumerate(index.passages) if SEARCH in p or ROI in p
+    }
+
+
+def test_select_context_keeps_order_within_budget() -> None:
+    document = _document()
+    context = {"documents": document, "purpose": "Q1 search results and ROI", "audience": "CEO"}
+    cache = PassageIndexCache(1 << 24)
+    fields = [("documents", 2_000, ("purpose",)), ("audience", 2_000, ("purpose",))]
+    selected, (report,) = select_context(fields, context, cache)
+    text = selected["documents"]
+    assert text.index(SEARCH) < text.index(ROI)
+    assert "less relevant passages omitted" in text
+    assert report.kept_tokens <= 2_000 and report.original_tokens > 40_000
+    assert selected["audience"] == "CEO"
+    assert not report.cached
+
+    # Same document, different query: the index is reused.
+    _, (again,) = select_context(fields, {**context, "purpose": "search latency"}, cache)
+    assert again.cached
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+    # Without query values, or within budget, fields are left alone.
+    assert select_context(fields, {"documents": document}, cache)[1] == ()
+    assert select_context([("documents", 10**6, ("purpose",))], context, cache)[1] == ()
+
+
+def test_budget_counts_omission_markers() -> None:
+    # Matches everywhere, so most passages are kept with a marker between each.
+    document = "\n\n".join(
+        ("search " if i % 2 else "ROI ") + FILLER * 3 + ("café " if i % 3 else "")
+        for i in range(2_000)
+    )
+    for budget in (300, 2_000, 8_000):
+        fields = [("documents", budget, ("purpose",))]
+        selected, (report,) = select_context(fields, {"documents": document, "purpose": "ROI"})
+        assert report.kept_tokens == estimate_tokens(selected["documents"]) <= budget
+        assert report.kept_passages > 1
+
+
+def test_index_cache_is_bounded_by_size() -> None:
+    documents = [_document(100 + i) for i in range(3)]
+    size = PassageIndex(documents[0]).size
+    cache = PassageIndexCache(size * 5 // 2)
+    for document in documents:
+        cache.get(document)
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["entries"] == 2
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert not cache.get(documents[0])[1] and cache.get(documents[2])[1]
+
+    # An index over the whole bound is returned but not kept.
+    small = PassageIndexCache(size // 2)
+    _, cached = small.get(documents[0])
+    assert not cached and small.stats()["entries"] == 0
+    assert make_passage_index_cache(0) is None
+
+
+async def test_one_pager_result_reports_passages() -> None:
+    server = create_server()
+    arguments = {
+        "tenant_name": "Acme",
+        "purpose": "Board pre-read on Q1 search ROI",
+        "documents": _document(),
+    }
+    content = await _call_tool(server, "one_pager", arguments)
+    result = json.loads(content[0].text)
+    (report,) = result["passages"]
+    assert report["field"] == "documents"
+    assert ROI in result["user_prompt"]
+    assert result["user_prompt"].count("parking changes") < 20
+
+
+async def test_competitor_research_queries_on_competitors_and_focus() -> None:
+    server = create_server()
+    arguments = {
+        "tenant_name": "Acme",
+        "from_date": "2026-01-01",
+        "to_date": "2026-01-14",
+        "competitors": "Notion",
+        "focus_areas": "search ROI",
+        "competitor_changes": _document(),
+        "feature_comparison": _document(),
+    }
+    content = await _call_tool(server, "competitor_research", arguments)
+    result = json.loads(content[0].text)
+    reports = {r["field"]: r for r in result["passages"]}
+    assert set(reports) == {"competitor_changes", "feature_comparison"}
+    assert reports["competitor_changes"]["query_fields"] == ["competitors", "focus_areas"]
+    assert result["user_prompt"].count(ROI) == 2
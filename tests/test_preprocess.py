@@ -0,0 +1,148 @@
+"""Tests for the pasted-field normalization pipeline."""
+
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from pmkit_mcp.preprocess import add_noise_patterns, preprocess, preprocess_context
+from pmkit_mcp.renderer import render_workflow
+from pmkit_mcp.server import create_server
+from pmkit_mcp.workflows.registry import (
+    CHAT_PASTE,
+    MESSAGE_PASTE,
+    TRANSCRIPT_PASTE,
+    WORKFLOW_REGISTRY,
+)
+from tests.test_server import _call_tool
+
+SLACK_PASTE = """\
+[10:01 AM] alex has joined the channel
+
+
+[10:02 AM] sam:    filters   shipped to beta customers today
+View thread
+[10:05 AM] sam: Filters shipped to beta customers today!
+"""
+
+EMAIL_PASTE = """\
+Loving the new export, but CSV dates are in UTC.
+
+On Tue, Oct 13, 2026 at 9:12 AM Support <support@acme.io> wrote:
+> Thanks for reaching out, we shipped export yesterday.
+> Let us know how it goes.
+
+--
+Jamie Lee
+VP Operations, Globex
+Sent from my iPhone
+"""
+
+
+def test_chat_paste_is_cleaned() -> None:
+    assert preprocess(SLACK_PASTE, CHAT_PASTE) == "sam: filters shipped to beta customers today"
+
+
+def test_message_paste_drops_quotes_and_signatures() -> None:
+    assert preprocess(EMAIL_PASTE, MESSAGE_PASTE) == (
+        "Loving the new export, but CSV dates are in UTC."
+    )
+
+
+def test_standalone_quotes_are_kept() -> None:
+    quote = "> customer quote: exports take all morning"
+    evidence = f"Interview with Globex:\n{quote}\n\n{EMAIL_PASTE}\n{quote} (again)"
+    assert preprocess(evidence, MESSAGE_PASTE) == (
+        f"Interview with Globex:\n{quote}\n\n"
+        f"Loving the new export, but CSV dates are in UTC.\n\n{quote} (again)"
+    )
+
+
+def test_transcript_paste_strips_timestamps_and_repeats() -> None:
+    transcript = (
+        "00:01:02 Jo: we keep losing deals on SSO pricing\n"
+        "00:04:10 Jo: We keep losing deals on SSO pricing.\n"
+        "00:05:00 Ok"
+    )
+    assert preprocess(transcript, TRANSCRIPT_PASTE) == (
+        "Jo: we keep losing deals on SSO pricing\nOk"
+    )
+
+
+def test_short_lines_are_not_deduped() -> None:
+    tickets = "PM-1 Export to CSV\nStatus: Done\nPM-2 Saved filters\nStatus: Done"
+    assert preprocess(tickets, ("dedupe",)) == tickets
+
+
+def test_noise_is_found_past_the_first_chunk() -> None:
+    paste = [f"line {i} about search filters" for i in range(1_000)]
+    paste[700] = "bob has joined the channel"
+    paste[900] = "This message was deleted."
+    kept = preprocess("\n".join(paste), ("noise",)).splitlines()
+    assert len(kept) == 998 and not any("channel" in k or "deleted" in k for k in kept)
+
+
+def test_custom_noise_patterns_and_unknown_stage() -> None:
+    assert add_noise_patterns([r"^\s*zz-test-bot:", ""]) == 1
+    assert preprocess("zz-test-bot: deploy ok\nreal work", ("noise",)) == "real work"
+    # Patterns with inline flags cannot share one alternation but still apply.
+    assert add_noise_patterns([r"(?s)^zz-other-bot:"]) == 1
+    assert preprocess("zz-other-bot: hi\nzz-test-bot: x\nkeep", ("noise",)) == "keep"
+    with pytest.raises(ValueError, match="Unknown preprocess stage"):
+        preprocess("x", ("nope",))
+
+
+def test_context_report_counts_bytes() -> None:
+    context = {"slack_messages": SLACK_PASTE, "tenant_name": "Acme  Corp"}
+    cleaned, (report,) = preprocess_context(
+        [("slack_messages", CHAT_PASTE), ("tenant_name", ())], context
+    )
+    assert cleaned["tenant_name"] == "Acme  Corp"  # no stages: untouched
+    assert report.field == "slack_messages"
+    assert report.original_bytes == len(SLACK_PASTE.encode())
+    assert report.kept_bytes == len(cleaned["slack_messages"].encode())
+    # Values that are already clean are not reported.
+    assert preprocess_context([("slack_messages", CHAT_PASTE)], cleaned)[1] == ()
+
+
+def test_large_paste_is_linear() -> None:
+    lines = [
+        f"[{i % 12 + 1}:{i % 60:02d} PM] user{i % 50}: update number {i} on the rollout"
+        for i in range(50_000)
+    ]
+    paste = "\n".join(lines + lines)
+    start = time.perf_counter()
+    cleaned = preprocess(paste, CHAT_PASTE)
+    assert time.perf_counter() - start < 10
+    assert cleaned.count("\n") == len(lines) - 1
+
+
+def test_render_workflow_reports_preprocessing() -> None:
+    workflow = WORKFLOW_REGISTRY["daily_brief"]
+    rendered = render_workflow(
+        workflow,
+        {
+            "user_name": "Sam",
+            "tenant_name": "Acme",
+            "current_date": "2026-10-19",
+            "slack_messages": SLACK_PASTE,
+        },
+    )
+    assert "has joined the channel" not in rendered.user_prompt
+    assert [p.field for p in rendered.preprocessed] == ["slack_messages"]
+
+
+async def test_tool_result_reports_preprocessing() -> None:
+    server = create_server()
+    arguments = {
+        "user_name": "Sam",
+        "tenant_name": "Acme",
+        "current_date": "2026-10-19",
+        "slack_messages": SLACK_PASTE,
+    }
+    content = await _call_tool(server, "daily_brief", arguments)
+    (report,) = json.loads(content[0].text)["preprocessed"]
+    assert report["stages"] == list(CHAT_PASTE)
+    assert report["kept_bytes"] < report["original_bytes"]
@@ -0,0 +1,112 @@
+"""Tests for per-client profiles of recurring workflow fields."""
+
+from __future__ import annotations
+
+import json
+import os
+from types import SimpleNamespace
+
+import anyio
+from mcp.server.auth.middleware.auth_context import auth_context_var
+from mcp.server.auth.middleware.bearer_auth import AuthenticatedUser
+from mcp.server.auth.provider import AccessToken
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+from mcp.shared.memory import create_connected_server_and_client_session
+from mcp.types import Implementation
+
+from pmkit_mcp.profiles import ProfileStore, client_identity
+from pmkit_mcp.server import create_server
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY
+
+
+def test_learn_persist_and_fill(tmp_path) -> None:
+    path = tmp_path / "profiles.json"
+    store = ProfileStore(path)
+    assert store.get("desktop") == {}
+    assert store.learn("desktop", {"tenant_name": " Acme ", "user_name": "ref:abc", "x": "y"})
+    assert not store.learn("desktop", {"tenant_name": "Acme"})  # unchanged: no write
+    assert store.writes == 1
+    assert json.loads(path.read_text()) == {"desktop": {"tenant_name": "Acme"}}
+
+    brief = WORKFLOW_REGISTRY.summary("daily_brief")
+    filled = store.fill("desktop", brief, {"user_name": "Sam"})
+    assert filled == {"user_name": "Sam", "tenant_name": "Acme"}
+    # Explicit arguments win over the profile.
+    assert store.fill("desktop", brief, {"tenant_name": "Globex"})["tenant_name"] == "Globex"
+    # Only fields the workflow has are filled.
+    assert "tenant_name" not in store.fill("desktop", WORKFLOW_REGISTRY.summary("tldr"), {})
+
+    # Another process (or a hand edit) changing the file invalidates the cache.
+    path.write_text(json.dumps({"desktop": {"tenant_name": "Initech"}}))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert store.get("desktop") == {"tenant_name": "Initech"}
+    assert ProfileStore(path).get("desktop") == {"tenant_name": "Initech"}
+
+
+async def _call(server, client_name: str, name: str, arguments: dict) -> str:
+    async with create_connected_server_and_client_session(
+        server, client_info=Implementation(name=client_name, version="1")
+    ) as client:
+        with anyio.fail_after(10):
+            result = await client.call_tool(name, arguments)
+    return result.content[0].text
+
+
+async def test_profile_skips_missing_fields_round_trip(tmp_path) -> None:
+    store = ProfileStore(tmp_path / "profiles.json")
+    server = create_server(profiles=store)
+    first = {"user_name": "Sam", "tenant_name": "Acme Corp", "current_date": "2026-10-19"}
+    assert "Acme Corp" in await _call(server, "desktop", "daily_brief", first)
+
+    # A new conversation from the same client only sends what changed.
+    text = await _call(server, "desktop", "daily_brief", {"current_date": "2026-10-20"})
+    assert "Acme Corp" in text and "2026-10-20" in text
+    # The profile also serves other workflows with the same fields.
+    dates = {"from_date": "2026-10-01", "to_date": "2026-10-14"}
+    text = await _call(server, "desktop", "competitor_research", dates)
+    assert "Acme Corp" in text
+
+    # Other clients have their own profile.
+    text = await _call(server, "cursor", "daily_brief", {"current_date": "2026-10-20"})
+    assert "**tenant_name**" in text and "**user_name**" in text
+
+
+async def test_batch_items_are_filled_but_not_learned_from(tmp_path) -> None:
+    store = ProfileStore(tmp_path / "profiles.json")
+    store.learn("desktop", {"tenant_name": "Acme Corp", "user_name": "Sam"})
+    server = create_server(profiles=store)
+    items = [
+        {"workflow_id": "daily_brief", "arguments": {"user_name": pm, "current_date": "2026-10-20"}}
+        for pm in ("Kim", "Lee")
+    ]
+    text = await _call(server, "desktop", "pmkit_render_batch", {"items": items})
+    assert text.count("Acme Corp") == 2 and "Lee" in text
+    assert store.writes == 1
+    assert store.get("desktop")["user_name"] == "Sam"
+
+
+def test_http_profiles_need_an_authenticated_user() -> None:
+    session = SimpleNamespace(
+        client_params=SimpleNamespace(clientInfo=Implementation(name="Claude Desktop", version="1"))
+    )
+
+    def identity(request: object | None, token: AccessToken | None = None) -> str | None:
+        ctx = RequestContext(
+            request_id=1, meta=None, session=session, lifespan_context=None, request=request
+        )
+        ctx_token = request_ctx.set(ctx)
+        auth_token = auth_context_var.set(AuthenticatedUser(token) if token else None)
+        try:
+            return client_identity()
+        finally:
+            auth_context_var.reset(auth_token)
+            request_ctx.reset(ctx_token)
+
+    assert identity(None) == "Claude Desktop"  # stdio
+    # Every user of the same app sends the same name over HTTP; don't share a profile.
+    assert identity(object()) is None
+    token = AccessToken(token="t", client_id="desktop-app", scopes=[], subject="sam@acme.test")
+    assert identity(object(), token) == "user:sam@acme.test"
+    assert client_identity() is None  # outside a request
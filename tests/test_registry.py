@@ -4,7 +4,15 @@ from __future__ import annotations
 
 import re
 
-from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY, FieldSpec, WorkflowDefinition
+import pytest
+
+from pmkit_mcp.budget import TRUNCATION_POLICIES
+from pmkit_mcp.preprocess import STAGES
+from pmkit_mcp.workflows.registry import (
+    WORKFLOW_REGISTRY,
+    WorkflowRegistry,
+    WorkflowSummary,
+)
 
 
 def test_registry_has_13_workflows() -> None:
@@ -75,3 +83,49 @@ def test_field_specs_have_descriptions() -> None:
     for wf in WORKFLOW_REGISTRY.values():
         for field in (*wf.required_fields, *wf.optional_fields):
             assert field.description, f"{wf.id}.{field.name}: missing description"
+
+
+def test_registry_version_bumps_on_mutation() -> None:
+    """Every mutation of a WorkflowRegistry must advance its version."""
+    registry = WorkflowRegistry([WORKFLOW_REGISTRY["tldr"]])
+    start = registry.version
+    registry.register(WORKFLOW_REGISTRY["prd_draft"])
+    assert registry.version == start + 1
+    registry.pop("prd_draft")
+    registry.update({"daily_brief": WORKFLOW_REGISTRY["daily_brief"]})
+    del registry["daily_brief"]
+    assert registry.version == start + 4
+    registry.pop("missing", None)
+    assert registry.version == start + 4
+
+
+def test_truncation_policies_are_valid() -> None:
+    """Every FieldSpec must use a known truncation policy."""
+    for wf in WORKFLOW_REGISTRY.values():
+        assert wf.prompt_budget > 0, f"{wf.id}: prompt_budget must be positive"
+        for field in (*wf.required_fields, *wf.optional_fields):
+            assert field.truncation in TRUNCATION_POLICIES, f"{wf.id}.{field.name}"
+
+
+def test_preprocess_stages_are_valid() -> None:
+    """Every FieldSpec must name registered preprocess stages."""
+    for wf in WORKFLOW_REGISTRY.values():
+        for field in (*wf.required_fields, *wf.optional_fields):
+            for stage in field.preprocess:
+                assert stage in STAGES, f"{wf.id}.{field.name}: {stage}"
+
+
+def test_passage_query_fields_exist() -> None:
+    """Passage selection must query fields of the same workflow."""
+    for wf in WORKFLOW_REGISTRY.values():
+        names = {f.name for f in (*wf.required_fields, *wf.optional_fields)}
+        for field in (*wf.required_fields, *wf.optional_fields):
+            assert field.passage_budget >= 0, f"{wf.id}.{field.name}"
+            assert bool(field.passage_budget) == bool(field.query_fields), f"{wf.id}.{field.name}"
+            assert set(field.query_fields) <= names - {field.name}, f"{wf.id}.{field.name}"
+
+
+def test_summary_is_abstract() -> None:
+    """Only summaries that can load their prompts are instantiable."""
+    with pytest.raises(TypeError):
+        WorkflowSummary(id="x", name="X", description="x")  # type: ignore[abstract]
@@ -0,0 +1,126 @@
+"""Tests for parsing and grouping release-notes issue lists."""
+
+from __future__ import annotations
+
+import json
+import time
+
+from pmkit_mcp.preprocess import preprocess_context
+from pmkit_mcp.release_issues import parse_issue_line, release_issues_stage
+from pmkit_mcp.renderer import render_workflow
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY
+
+PASTE = """\
+Release 2.4 board export
+- ACME-342: [Story] Search filters
+  - ACME-343: Filter UI
+  - ACME-344: Filter API
+- ACME-350: Fix CSV export dates
+- ACME-342: Search filters
+- ACME-360 (Improvement) Faster dashboard loads [Breaking]
+- ACME-361: Sub-task: Cache warmup (sub-task of ACME-360)
+- ACME-370: Sub-task: Orphan work item (parent: ACME-999)
+- ACME-380: Rework billing pipeline
+Thanks all!
+"""
+
+
+def _stage(text: str) -> str:
+    return "\n".join(release_issues_stage(text.splitlines()))
+
+
+def test_parse_issue_line() -> None:
+    parsed = parse_issue_line("  - ACME-361: Sub-task: Cache warmup (sub-task of ACME-360)")
+    assert parsed is not None
+    assert (parsed.key, parsed.title, parsed.issue_type, parsed.parent, parsed.indent) == (
+        "ACME-361",
+        "Cache warmup",
+        "Sub-task",
+        "ACME-360",
+        2,
+    )
+    assert parse_issue_line("Thanks all!") is None
+
+
+def test_lines_are_deduped_folded_and_grouped() -> None:
+    assert _stage(PASTE) == (
+        "[Parsed locally: 11 lines -> 5 issues; 1 duplicate dropped, 3 sub-tasks folded]\n"
+        "\n"
+        "### New Features (1)\n"
+        "- ACME-342 Search filters (+2 sub-tasks)\n"
+        "\n"
+        "### Improvements (1)\n"
+        "- ACME-360 Faster dashboard loads [BREAKING] (+1 sub-task)\n"
+        "\n"
+        "### Bug Fixes (1)\n"
+        "- ACME-350 Fix CSV export dates\n"
+        "\n"
+        "### Unclassified (as pasted)\n"
+        "- ACME-380: Rework billing pipeline\n"
+        "- ACME-370: Sub-task: Orphan work item (parent: ACME-999)\n"
+        "Release 2.4 board export\n"
+        "Thanks all!"
+    )
+
+
+def test_csv_and_jira_json_exports() -> None:
+    csv_export = (
+        "Issue key,Summary,Issue Type,Parent\n"
+        "ACME-1,Saved views,Story,\n"
+        "ACME-2,Saved views API,Sub-task,ACME-1\n"
+        "ACME-3,Login loop on Safari,Bug,\n"
+    )
+    text = _stage(csv_export)
+    assert "- ACME-1 Saved views (+1 sub-task)" in text
+    assert "### Bug Fixes (1)\n- ACME-3 Login loop on Safari" in text
+
+    issues = [
+        {"key": "ACME-7", "fields": {"summary": "Audit log", "issuetype": {"name": "Story"}}},
+        {
+            "key": "ACME-8",
+            "fields": {
+                "summary": "Audit log export",
+                "issuetype": {"name": "Sub-task", "subtask": True},
+                "parent": {"key": "ACME-7", "fields": {"summary": "Audit log"}},
+            },
+        },
+    ]
+    text = _stage(json.dumps({"issues": issues}))
+    assert "- ACME-7 Audit log (+1 sub-task)" in text
+
+
+def test_pastes_without_keys_pass_through() -> None:
+    notes = ["Big release!", "Search is much faster now, and export works"]
+    assert list(release_issues_stage(notes)) == notes
+
+
+def test_large_release_is_compact() -> None:
+    lines = [f"- ACME-{i % 3000}: Fix issue number {i % 3000}" for i in range(60_000)]
+    start = time.perf_counter()
+    text = _stage("\n".join(lines))
+    assert time.perf_counter() - start < 5
+    assert text.startswith("[Parsed locally: 60,000 lines -> 3,000 issues; 57,000 duplicates")
+
+
+def test_release_notes_prompt_carries_the_grouped_list() -> None:
+    workflow = WORKFLOW_REGISTRY["release_notes"]
+    context = {"product_name": "Acme", "release_version": "v2.4.0", "completed_issues": PASTE}
+    prompt = render_workflow(workflow, context).user_prompt
+    assert "### Bug Fixes (1)\n- ACME-350 Fix CSV export dates" in prompt
+    assert "ACME-343" not in prompt
+
+
+def test_tsv_with_empty_cells_through_field_pipeline() -> None:
+    tsv = (
+        "Issue key\tSummary\tIssue Type\tParent\n"
+        "ACME-1\tSearch filters\tStory\t\n"
+        "ACME-2\tFilter UI\t\tACME-1\n"
+        "ACME-3\tFix CSV export dates\tBug\t\n"
+    )
+    workflow = WORKFLOW_REGISTRY["release_notes"]
+    stages = [(f.name, f.preprocess) for f in workflow.required_fields]
+    cleaned, _ = preprocess_context(stages, {"completed_issues": tsv})
+    text = cleaned["completed_issues"]
+    assert "- ACME-1 Search filters (+1 sub-task)" in text
+    assert "- ACME-3 Fix CSV export dates" in text
+    assert "Unclassified" not in text
@@ -0,0 +1,57 @@
+"""Tests for the rendered-result LRU cache."""
+
+from __future__ import annotations
+
+import pytest
+from mcp.types import TextContent
+
+from pmkit_mcp.render_cache import RenderCache, cache_key
+
+
+def _result(size: int) -> list[TextContent]:
+    return [TextContent(type="text", text="x" * size)]
+
+
+def test_cache_key_ignores_argument_order() -> None:
+    a = cache_key("tldr", 1, {"a": "1", "b": "2"}, "json")
+    b = cache_key("tldr", 1, {"b": "2", "a": "1"}, "json")
+    assert a == b
+
+
+def test_cache_key_changes_with_version_and_values() -> None:
+    base = cache_key("tldr", 1, {"a": "1"})
+    assert base != cache_key("tldr", 2, {"a": "1"})
+    assert base != cache_key("tldr", 1, {"a": "2"})
+    assert base != cache_key("prd_draft", 1, {"a": "1"})
+
+
+def test_hits_and_misses_are_counted() -> None:
+    cache = RenderCache(max_bytes=1000)
+    assert cache.get("k") is None
+    cache.put("k", _result(10))
+    assert cache.get("k")[0].text == "x" * 10
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (1, 1, 1, 10)
+
+
+def test_evicts_least_recently_used_by_bytes() -> None:
+    cache = RenderCache(max_bytes=100)
+    cache.put("a", _result(40))
+    cache.put("b", _result(40))
+    cache.get("a")  # "b" is now least recently used
+    cache.put("c", _result(40))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.evictions == 1
+    assert cache.current_bytes == 80
+
+
+def test_oversized_results_are_not_cached() -> None:
+    cache = RenderCache(max_bytes=10)
+    assert cache.put("big", _result(11)) is False
+    assert len(cache) == 0
+
+
+def test_max_bytes_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        RenderCache(0)
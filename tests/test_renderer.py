@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
+from dataclasses import replace
+
+import pytest
+
 from pmkit_mcp.renderer import (
+    MAX_BATCH_ITEMS,
     build_field_summary,
     build_missing_fields_message,
+    render_batch,
     render_prompt,
+    render_workflow,
 )
 from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY
 
@@ -75,3 +82,52 @@ def test_build_field_summary_includes_required_and_optional() -> None:
     assert "Optional" in summary
     assert "feature_name" in summary
     assert "epic_key" in summary
+
+
+def test_render_prompt_does_not_expand_placeholders_in_values() -> None:
+    """Placeholder syntax pasted into a value must survive rendering untouched."""
+    wf = WORKFLOW_REGISTRY["daily_brief"]
+    context = {
+        "user_name": "{{tenant_name}}",
+        "tenant_name": "Acme",
+        "current_date": "2026-01-15",
+    }
+    _, user = render_prompt(wf, context)
+    assert "Generate a daily brief for {{tenant_name}} at Acme" in user
+
+
+def test_render_workflow_enforces_prompt_budget() -> None:
+    """render_workflow trims optional fields so the prompt fits the budget."""
+    wf = replace(WORKFLOW_REGISTRY["daily_brief"], prompt_budget=2_000)
+    context = {
+        "user_name": "Alice",
+        "tenant_name": "Acme",
+        "current_date": "2026-01-15",
+        "slack_messages": "09:00 bob: deploy done\n" * 5_000,
+    }
+    rendered = render_workflow(wf, context)
+    assert rendered.estimated_tokens <= 2_000
+    assert [t.field for t in rendered.trims] == ["slack_messages"]
+    assert "Alice" in rendered.user_prompt
+
+
+def test_render_batch_returns_results_in_input_order() -> None:
+    """Batch items are rendered independently and reported in input order."""
+    brief = {"user_name": "Alice", "tenant_name": "Acme", "current_date": "2026-01-15"}
+    items = [
+        ("daily_brief", brief),
+        ("not_a_workflow", {}),
+        ("tldr", {}),
+        ("tldr", {"source_content": "Sprint 42 shipped search filters"}),
+    ]
+    results = render_batch(items, max_workers=2)
+    assert [r.index for r in results] == [0, 1, 2, 3]
+    assert results[0].ok and "Alice" in results[0].rendered.user_prompt
+    assert "Unknown workflow" in results[1].error
+    assert "source_content" in results[2].error
+    assert results[3].ok and "Sprint 42" in results[3].rendered.user_prompt
+
+
+def test_render_batch_rejects_oversized_batches() -> None:
+    with pytest.raises(ValueError):
+        render_batch([("tldr", {"source_content": "x"})] * (MAX_BATCH_ITEMS + 1))
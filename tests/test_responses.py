@@ -0,0 +1,77 @@
+"""Tests for tool result encoding."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from mcp.types import CallToolResult
+
+from pmkit_mcp.budget import FieldTrim
+from pmkit_mcp.renderer import RenderedPrompt
+from pmkit_mcp.responses import build_workflow_response, dumps
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY
+
+SYSTEM = "system prompt"
+USER = 'pasted "transcript"\nline two'
+RENDERED = RenderedPrompt(
+    system_prompt=SYSTEM, user_prompt=USER, estimated_tokens=10, prompt_budget=100
+)
+
+
+def test_json_mode_matches_legacy_shape() -> None:
+    """The default mode keeps the single indented JSON block."""
+    wf = WORKFLOW_REGISTRY["tldr"]
+    content = build_workflow_response(wf, RENDERED, "json")
+    assert len(content) == 1
+    data = json.loads(content[0].text)
+    assert data == {
+        "workflow": wf.name,
+        "output_format": wf.output_format,
+        "system_prompt": SYSTEM,
+        "user_prompt": USER,
+    }
+
+
+def test_blocks_mode_sends_prompts_verbatim() -> None:
+    """Blocks mode returns metadata, then the raw system and user prompts."""
+    wf = WORKFLOW_REGISTRY["tldr"]
+    meta, system, user = build_workflow_response(wf, RENDERED, "blocks")
+    assert system.text == SYSTEM
+    assert user.text == USER
+    metadata = json.loads(meta.text)
+    assert metadata["workflow_id"] == "tldr"
+    assert metadata["user_prompt_chars"] == len(USER)
+
+
+def test_structured_mode_puts_metadata_in_structured_content() -> None:
+    wf = WORKFLOW_REGISTRY["tldr"]
+    result = build_workflow_response(wf, RENDERED, "structured")
+    assert isinstance(result, CallToolResult)
+    assert [c.text for c in result.content] == [SYSTEM, USER]
+    assert result.structuredContent["output_format"] == wf.output_format
+
+
+def test_unknown_mode_rejected() -> None:
+    with pytest.raises(ValueError):
+        build_workflow_response(WORKFLOW_REGISTRY["tldr"], RENDERED, "xml")
+
+
+def test_dumps_round_trips() -> None:
+    obj = {"a": 'ü\n"q"', "b": [1, 2]}
+    assert json.loads(dumps(obj)) == obj
+    assert json.loads(dumps(obj, indent=True)) == obj
+
+
+def test_truncation_report_included_when_fields_trimmed() -> None:
+    """Trimmed fields are reported in both the json result and the metadata."""
+    wf = WORKFLOW_REGISTRY["tldr"]
+    trim = FieldTrim("source_content", "middle", 500, 100, 2000, 400)
+    rendered = RenderedPrompt(SYSTEM, USER, 120, 100, trims=(trim,), over_budget=True)
+
+    data = json.loads(build_workflow_response(wf, rendered, "json")[0].text)
+    assert data["truncated"][0]["trimmed_tokens"] == 400
+    assert data["over_budget"] is True
+
+    result = build_workflow_response(wf, rendered, "structured")
+    assert result.structuredContent["truncated"][0]["field"] == "source_content"
@@ -0,0 +1,133 @@
+"""Tests for the persistent result cache."""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import anyio
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from pmkit_mcp import result_cache as result_cache_module
+from pmkit_mcp.result_cache import ResultCache, parse_ttls, result_key
+from pmkit_mcp.server import create_server
+from tests.test_executor import CHUNKS, FakeModelServer, _executor
+
+PARAMS = {"model": "fake-1", "temperature": 0.2}
+
+
+def test_key_covers_prompts_and_model_parameters() -> None:
+    key = result_key("system", "user", PARAMS)
+    assert key == result_key("system", "user", dict(reversed(PARAMS.items())))
+    assert key != result_key("system", "user2", PARAMS)
+    assert key != result_key("systemuser", "", PARAMS)
+    assert key != result_key("system", "user", {**PARAMS, "temperature": 0.7})
+
+
+def test_hit_miss_and_persistence(tmp_path) -> None:
+    path = tmp_path / "results.db"
+    cache = ResultCache(path)
+    assert cache.get("k") is None
+    assert cache.put("k", "prd_draft", "on-demand", "# PRD", "fake-1")
+    assert cache.get("k") == ("# PRD", "fake-1")
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    cache.close()
+
+    reopened = ResultCache(path)
+    assert reopened.get("k") == ("# PRD", "fake-1")
+    reopened.close()
+
+
+def test_ttl_by_workflow_then_category(tmp_path, monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(result_cache_module.time, "time", lambda: now[0])
+    cache = ResultCache(tmp_path / "r.db", ttls={"daily_brief": 60})
+    assert cache.ttl_for("daily_brief", "autonomous") == 60
+    assert cache.ttl_for("sprint_summary", "autonomous") == 3 * 3600
+    assert cache.ttl_for("unknown", "experimental") == cache.default_ttl
+
+    cache.put("brief", "daily_brief", "autonomous", "brief", "m")
+    cache.put("prd", "prd_draft", "on-demand", "prd", "m")
+    now[0] += 61
+    assert cache.get("brief") is None
+    assert cache.get("prd") == ("prd", "m")
+    cache.close()
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path, monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(result_cache_module.time, "time", lambda: now[0])
+    cache = ResultCache(tmp_path / "r.db", max_bytes=25)
+    for key in ("a", "b"):
+        now[0] += 1
+        cache.put(key, "tldr", "on-demand", key * 10, "m")
+    now[0] += 1
+    cache.get("a")  # "b" is now least recently used
+    now[0] += 1
+    cache.put("c", "tldr", "on-demand", "c" * 10, "m")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] == 20
+    assert not cache.put("huge", "tldr", "on-demand", "x" * 26, "m")
+    cache.close()
+
+
+def _write_many(path: str, worker: int) -> int:
+    cache = ResultCache(path)
+    for i in range(50):
+        cache.put(f"{worker}-{i}", "tldr", "on-demand", f"output {worker} {i}", "m")
+    cache.close()
+    return worker
+
+
+def test_concurrent_writers_share_one_database(tmp_path) -> None:
+    path = str(tmp_path / "shared.db")
+    ResultCache(path).close()
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(4, mp_context=context) as pool:
+        assert sorted(pool.map(_write_many, [path] * 4, range(4))) == [0, 1, 2, 3]
+    cache = ResultCache(path)
+    assert cache.stats()["entries"] == 200
+    assert cache.get("3-49") == ("output 3 49", "m")
+    cache.close()
+
+
+def test_parse_ttls() -> None:
+    assert parse_ttls(" daily_brief=3600, on-demand=86400 ,") == {
+        "daily_brief": 3600.0,
+        "on-demand": 86400.0,
+    }
+    with pytest.raises(ValueError):
+        parse_ttls("daily_brief")
+
+
+async def test_server_answers_repeated_executions_from_cache(tmp_path) -> None:
+    model_server = FakeModelServer()
+    executor = _executor(model_server.url)
+    cache = ResultCache(tmp_path / "r.db")
+    server = create_server(executor=executor, result_cache=cache)
+    arguments = {"source_content": "Filters shipped"}
+    try:
+        async with create_connected_server_and_client_session(server) as client:
+            with anyio.fail_after(10):
+                first = await client.call_tool("tldr", arguments)
+                second = await client.call_tool("tldr", arguments)
+                forced = await client.call_tool("tldr", {**arguments, "pmkit_no_cache": True})
+                batch = await client.call_tool(
+                    "pmkit_render_batch",
+                    {"items": [{"workflow_id": "tldr", "arguments": arguments}]},
+                )
+    finally:
+        await executor.aclose()
+        model_server.httpd.shutdown()
+        cache.close()
+
+    assert "cached" not in json.loads(first.content[0].text)
+    second_result = json.loads(second.content[0].text)
+    assert second_result["output"] == "".join(CHUNKS)
+    assert second_result["cached"] is True
+    assert "cached" not in json.loads(forced.content[0].text)
+    assert json.loads(batch.content[0].text)["results"][0]["cached"] is True
+    assert len(model_server.requests) == 2
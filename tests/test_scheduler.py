@@ -0,0 +1,260 @@
+"""Tests for cron parsing and the workflow scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import anyio
+import pytest
+from starlette.testclient import TestClient
+
+from pmkit_mcp.executor import ExecutorSettings, LLMExecutor
+from pmkit_mcp.http_app import HttpSettings, create_app
+from pmkit_mcp.render_cache import RenderCache
+from pmkit_mcp.result_cache import ResultCache
+from pmkit_mcp.scheduler import (
+    CronSpec,
+    MemoryLedger,
+    ScheduledJob,
+    ScheduleError,
+    Scheduler,
+    parse_schedule,
+)
+from pmkit_mcp.server import create_server, start_scheduler, unsaved_schedule_reason
+from tests.test_server import _call_tool
+
+LONDON = ZoneInfo("Europe/London")
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def _ts(text: str, tz: ZoneInfo = LONDON) -> float:
+    return datetime.fromisoformat(text).replace(tzinfo=tz).timestamp()
+
+
+def _local(timestamp: float, tz: ZoneInfo = LONDON) -> str:
+    return datetime.fromtimestamp(timestamp, tz).strftime("%a %Y-%m-%d %H:%M")
+
+
+def test_cron_next_after() -> None:
+    weekdays = CronSpec.parse("30 7 * * mon-fri")
+    friday_morning = _ts("2026-10-16 08:00")
+    assert _local(weekdays.next_after(friday_morning, LONDON)) == "Mon 2026-10-19 07:30"
+    assert _local(CronSpec.parse("*/15 * * * *").next_after(_ts("2026-10-16 08:00"), LONDON)) == (
+        "Fri 2026-10-16 08:15"
+    )
+    # Both day fields restricted: either one matches, as in cron.
+    either = CronSpec.parse("0 9 1 * 1")
+    assert _local(either.next_after(_ts("2026-10-16 10:00"), LONDON)) == "Mon 2026-10-19 09:00"
+    assert _local(CronSpec.parse("@monthly").next_after(friday_morning, LONDON)) == (
+        "Sun 2026-11-01 00:00"
+    )
+    # Local wall time is kept across the end of daylight saving time.
+    daily = CronSpec.parse("30 7 * * *")
+    after = daily.next_after(_ts("2026-10-31 08:00", NEW_YORK), NEW_YORK)
+    assert _local(after, NEW_YORK) == "Sun 2026-11-01 07:30"
+    assert after - _ts("2026-10-31 07:30", NEW_YORK) == 25 * 3600
+
+
+@pytest.mark.parametrize("spec", ["* * * *", "61 * * * *", "0 0 * * 8", "*/0 * * * *", "x * * * *"])
+def test_invalid_cron(spec: str) -> None:
+    with pytest.raises(ScheduleError):
+        CronSpec.parse(spec)
+
+
+def test_parse_schedule_fills_job_fields() -> None:
+    (job,) = parse_schedule(
+        {
+            "timezone": "Europe/London",
+            "jobs": [
+                {
+                    "tenant": "Acme Corp",
+                    "user": "Sam",
+                    "workflow_id": "daily_brief",
+                    "cron": "30 7 * * 1-5",
+                    "arguments": {"slack_messages": "#eng: filters shipped"},
+                }
+            ],
+        }
+    )
+    assert job.name == "Acme Corp/Sam/daily_brief"
+    assert job.arguments_for(_ts("2026-10-19 07:30")) == {
+        "slack_messages": "#eng: filters shipped",
+        "tenant_name": "Acme Corp",
+        "user_name": "Sam",
+        "current_date": "2026-10-19",
+    }
+
+    bad_jobs = [
+        {"workflow_id": "daily_brief", "cron": "0 7 * * *"},  # no tenant or user
+        {"tenant": "A", "user": "B", "workflow_id": "nope", "cron": "0 7 * * *"},
+        {"tenant": "A", "user": "B", "workflow_id": "daily_brief", "cron": "0 0 31 2 *"},
+        {"tenant": "A", "user": "B", "workflow_id": "daily_brief"},
+    ]
+    for entry in bad_jobs:
+        with pytest.raises(ScheduleError):
+            parse_schedule({"jobs": [entry]})
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _job(name: str, cron: str = "0 7 * * *") -> ScheduledJob:
+    return ScheduledJob(
+        name,
+        "daily_brief",
+        CronSpec.parse(cron),
+        LONDON,
+        tenant="Acme",
+        user=name,
+    )
+
+
+async def test_runs_when_due_with_bounded_concurrency() -> None:
+    clock = FakeClock(_ts("2026-10-19 06:59"))
+    active, peak, ran = 0, 0, []
+
+    async def run_job(job: ScheduledJob, arguments: dict) -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        ran.append((job.name, arguments["current_date"]))
+
+    jobs = [_job(f"user{i}") for i in range(5)]
+    scheduler = Scheduler(
+        jobs, run_job, max_concurrency=2, jitter=60, clock=clock, rng=random.Random(1)
+    )
+    await scheduler.start()
+    assert 0 < scheduler.tick() <= 120
+    assert not ran
+
+    clock.now += 120  # 07:01, past every jittered start
+    assert scheduler.tick() > 23 * 3600
+    await scheduler.wait_idle()
+    assert sorted(ran) == [(f"user{i}", "2026-10-19") for i in range(5)]
+    assert peak == 2
+    stats = scheduler.stats()["jobs"]["user0"]
+    assert stats["runs"] == 1
+    assert stats["next_due"].startswith("2026-10-20T07:00")
+
+
+async def test_missed_runs_are_caught_up_once() -> None:
+    calls = []
+
+    async def run_job(job: ScheduledJob, arguments: dict) -> None:
+        calls.append(arguments["current_date"])
+
+    # Started at 09:00, two hours after the 07:00 run: it is made up.
+    clock = FakeClock(_ts("2026-10-19 09:00"))
+    ledger = MemoryLedger()
+    scheduler = Scheduler([_job("a")], run_job, jitter=0, clock=clock, ledger=ledger)
+    await scheduler.start()
+    scheduler.tick()
+    await scheduler.wait_idle()
+    assert calls == ["2026-10-19"]
+    assert scheduler.stats()["jobs"]["a"]["catch_ups"] == 1
+
+    # A restart with the same ledger does not repeat it.
+    again = Scheduler([_job("a")], run_job, jitter=0, clock=clock, ledger=ledger)
+    await again.start()
+    again.tick()
+    await again.wait_idle()
+    assert calls == ["2026-10-19"]
+
+    # Suspended for three days: the missed runs coalesce into one.
+    clock.now = _ts("2026-10-22 12:00")
+    again.tick()
+    await again.wait_idle()
+    assert calls == ["2026-10-19", "2026-10-20"]
+    assert again.stats()["jobs"]["a"]["next_due"].startswith("2026-10-23T07:00")
+
+    # Beyond the catch-up window nothing is made up.
+    late = Scheduler([_job("b")], run_job, jitter=0, catch_up=3600, clock=clock)
+    await late.start()
+    late.tick()
+    await late.wait_idle()
+    assert len(calls) == 2
+
+
+def test_result_cache_ledger_claims_each_run_once(tmp_path) -> None:
+    first, second = ResultCache(tmp_path / "r.db"), ResultCache(tmp_path / "r.db")
+    assert first.last_run("job") is None
+    assert first.claim_run("job", 100.0)
+    assert not second.claim_run("job", 100.0)
+    assert second.claim_run("job", 200.0)
+    assert first.last_run("job") == 200.0
+    first.close()
+    second.close()
+
+
+def test_result_cache_ledger_forgets_claims_outside_the_window(tmp_path) -> None:
+    cache = ResultCache(tmp_path / "r.db")
+    for due in range(0, 10_000, 100):
+        assert cache.claim_run("job", float(due), retain=1_000)
+    (count,) = cache._db.execute("SELECT COUNT(*) FROM scheduled_runs").fetchone()
+    assert count == 11
+    assert cache.last_run("job") == 9_900.0
+    assert not cache.claim_run("job", 9_000.0, retain=1_000)
+    cache.close()
+
+
+async def test_scheduled_run_fills_the_render_cache() -> None:
+    render_cache = RenderCache(1 << 20)
+    server = create_server(render_cache=render_cache)
+    (job,) = parse_schedule(
+        {
+            "jobs": [
+                {"tenant": "Acme", "user": "Sam", "workflow_id": "daily_brief", "cron": "* * * * *"}
+            ]
+        }
+    )
+    task = start_scheduler(server, [job], jitter=0)
+    try:
+        with anyio.fail_after(5):
+            while not server.scheduler.stats()["jobs"] or (
+                server.scheduler.stats()["jobs"][job.name]["runs"] == 0
+            ):
+                await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+    assert render_cache.stats()["entries"] == 1
+
+    arguments = job.arguments_for(time.time())
+    await _call_tool(server, "daily_brief", arguments)
+    assert render_cache.stats()["hits"] == 1
+    stats = await _call_tool(server, "pmkit_stats")
+    assert '"scheduler"' in stats[0].text
+
+
+async def test_schedule_needs_a_cache_for_its_output(tmp_path) -> None:
+    render_cache = RenderCache(1 << 20)
+    executor = LLMExecutor(ExecutorSettings(base_url="http://127.0.0.1:9/v1", model="m"))
+    result_cache = ResultCache(tmp_path / "results.db")
+    assert unsaved_schedule_reason(None, None, None) == "rendered runs need --render-cache-mb"
+    assert unsaved_schedule_reason(render_cache, None, None) is None
+    assert unsaved_schedule_reason(render_cache, executor, None) == (
+        "executed runs need --result-cache"
+    )
+    assert unsaved_schedule_reason(None, executor, result_cache) is None
+    result_cache.close()
+    await executor.aclose()
+
+
+def test_http_app_does_not_schedule_without_a_cache(tmp_path, caplog) -> None:
+    schedule = tmp_path / "schedule.json"
+    job = {"tenant": "Acme", "user": "Sam", "workflow_id": "daily_brief", "cron": "* * * * *"}
+    schedule.write_text(json.dumps({"jobs": [job]}), encoding="utf-8")
+    with TestClient(create_app(HttpSettings(stateless=True, schedule=str(schedule)))):
+        pass
+    assert "Not starting the scheduler: rendered runs need --render-cache-mb" in caplog.text
@@ -3,13 +3,25 @@
 from __future__ import annotations
 
 import json
+from dataclasses import replace
 
+import anyio
 import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+from mcp.types import CallToolRequest, CallToolRequestParams, ElicitResult, ListToolsRequest
 
-from mcp.types import CallToolRequest, CallToolRequestParams, ListToolsRequest
-
-from pmkit_mcp.server import create_server
-from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY
+from pmkit_mcp.metrics import ServerMetrics
+from pmkit_mcp.render_cache import RenderCache
+from pmkit_mcp.renderer import MAX_BATCH_ITEMS
+from pmkit_mcp.server import (
+    create_server,
+    get_help_text,
+    get_tool_manifest,
+    get_workflow_details,
+    is_known_tool,
+)
+from pmkit_mcp.workflows.catalog import CatalogWorkflow, register_catalog, write_catalog
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY, WorkflowDefinition
 
 
 @pytest.fixture
@@ -37,9 +49,9 @@ async def _call_tool(server, name: str, arguments: dict | None = None):
 
 
 async def test_list_tools(server) -> None:
-    """Server should expose exactly 15 tools (13 workflows + 2 utility)."""
+    """Server should expose exactly 18 tools (13 workflows + 5 utility)."""
     tools = await _list_tools(server)
-    assert len(tools) == 15
+    assert len(tools) == 18
 
 
 async def test_list_tools_contains_help(server) -> None:
@@ -121,3 +133,249 @@ async def test_call_unknown_tool(server) -> None:
     content = await _call_tool(server, "not_a_real_tool")
     text = content[0].text
     assert "Unknown tool" in text
+
+
+async def test_list_tools_manifest_is_memoized(server) -> None:
+    """Repeated tools/list calls reuse the same Tool objects and expose an ETag."""
+    handler = server.request_handlers[ListToolsRequest]
+    first = (await handler(ListToolsRequest(method="tools/list"))).root
+    second = (await handler(ListToolsRequest(method="tools/list"))).root
+    assert all(a is b for a, b in zip(first.tools, second.tools))
+    assert first.meta["pmkit/etag"] == second.meta["pmkit/etag"]
+    assert first.meta["pmkit/registryVersion"] == WORKFLOW_REGISTRY.version
+
+
+async def test_list_tools_manifest_rebuilt_when_registry_changes(server) -> None:
+    """Registering a workflow invalidates the cached manifest and changes the ETag."""
+    before = get_tool_manifest()
+    extra = replace(WORKFLOW_REGISTRY["tldr"], id="tldr_copy")
+    WORKFLOW_REGISTRY.register(extra)
+    try:
+        tools = await _list_tools(server)
+        assert "tldr_copy" in {t.name for t in tools}
+        assert get_tool_manifest().etag != before.etag
+    finally:
+        del WORKFLOW_REGISTRY["tldr_copy"]
+    assert get_tool_manifest().etag == before.etag
+
+
+async def test_help_and_details_text_cached_per_registry_version(server) -> None:
+    """Discovery text is reused until the registry changes, then rebuilt."""
+    assert get_help_text() is get_help_text()
+    assert get_workflow_details("prd_draft") is get_workflow_details("prd_draft")
+
+    WORKFLOW_REGISTRY.register(replace(WORKFLOW_REGISTRY["tldr"], id="tldr_copy"))
+    try:
+        content = await _call_tool(server, "pmkit_help")
+        assert "tldr_copy" in content[0].text
+        content = await _call_tool(server, "pmkit_workflow_details", {"workflow_id": "tldr_copy"})
+        assert "TL;DR" in content[0].text
+    finally:
+        del WORKFLOW_REGISTRY["tldr_copy"]
+    assert "tldr_copy" not in get_help_text()
+
+
+async def test_blocks_response_mode_returns_separate_prompts() -> None:
+    """A server in blocks mode returns metadata plus the two prompts as text blocks."""
+    server = create_server(response_mode="blocks")
+    content = await _call_tool(
+        server,
+        "daily_brief",
+        {"user_name": "Alice", "tenant_name": "Acme", "current_date": "2026-01-15"},
+    )
+    assert len(content) == 3
+    assert json.loads(content[0].text)["workflow_id"] == "daily_brief"
+    assert content[1].text == WORKFLOW_REGISTRY["daily_brief"].system_prompt
+    assert "Alice" in content[2].text
+
+
+async def test_call_render_batch(server) -> None:
+    """pmkit_render_batch returns one entry per item with per-item errors."""
+    content = await _call_tool(
+        server,
+        "pmkit_render_batch",
+        {
+            "items": [
+                {"workflow_id": "tldr", "arguments": {"source_content": "Filters shipped"}},
+                {"workflow_id": "daily_brief", "arguments": {"user_name": "Alice"}},
+            ]
+        },
+    )
+    results = json.loads(content[0].text)["results"]
+    assert [r["status"] for r in results] == ["ok", "error"]
+    assert "Filters shipped" in results[0]["user_prompt"]
+    assert "tenant_name" in results[1]["error"]
+
+
+async def test_render_batch_reports_malformed_items(server) -> None:
+    """Bad entries are per-item errors; an oversized batch is an error result."""
+    items = [
+        "tldr",
+        {"workflow_id": "tldr", "arguments": ["Filters shipped"]},
+        {"workflow_id": "tldr", "arguments": {"source_content": "Filters shipped"}},
+    ]
+    content = await _call_tool(server, "pmkit_render_batch", {"items": items})
+    results = json.loads(content[0].text)["results"]
+    assert [(r["index"], r["status"]) for r in results] == [(0, "error"), (1, "error"), (2, "ok")]
+    assert "workflow_id" in results[0]["error"]
+
+    content = await _call_tool(server, "pmkit_render_batch", {"items": "tldr"})
+    assert content[0].text == "`items` must be a list."
+    too_many = [items[2]] * (MAX_BATCH_ITEMS + 1)
+    content = await _call_tool(server, "pmkit_render_batch", {"items": too_many})
+    assert content[0].text.startswith("Batch too large")
+
+
+async def test_render_cache_serves_repeat_calls_and_honors_bypass() -> None:
+    """Identical calls hit the cache; pmkit_no_cache forces a fresh render."""
+    cache = RenderCache(max_bytes=1 << 20)
+    server = create_server(render_cache=cache)
+    args = {"user_name": "Alice", "tenant_name": "Acme", "current_date": "2026-01-15"}
+
+    first = await _call_tool(server, "daily_brief", args)
+    second = await _call_tool(server, "daily_brief", dict(reversed(list(args.items()))))
+    assert first[0].text == second[0].text
+    assert cache.stats()["hits"] == 1
+
+    third = await _call_tool(server, "daily_brief", {**args, "pmkit_no_cache": True})
+    assert json.loads(third[0].text)["user_prompt"] == json.loads(first[0].text)["user_prompt"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+async def test_stats_tool_reports_per_tool_metrics() -> None:
+    """pmkit_stats reports calls, errors, latency and argument sizes per tool."""
+    metrics = ServerMetrics(known_tools=is_known_tool)
+    server = create_server(render_cache=RenderCache(max_bytes=1 << 20), metrics=metrics)
+    await _list_tools(server)
+    await _call_tool(server, "tldr", {"source_content": "x" * 5000})
+    await _call_tool(server, "no_such_tool", {})
+
+    content = await _call_tool(server, "pmkit_stats")
+    stats = json.loads(content[0].text)
+    tldr = stats["tools"]["tldr"]
+    assert tldr["calls"] == 1
+    assert tldr["in_flight"] == 0
+    assert tldr["argument_bytes"]["max"] > 5000
+    # The SDK also lists tools itself when it meets an unlisted tool name.
+    assert stats["tools"]["tools/list"]["calls"] >= 1
+    assert stats["tools"]["_unknown"]["calls"] == 1
+    assert "no_such_tool" not in stats["tools"]
+    assert stats["render_cache"]["misses"] == 1
+
+
+async def test_context_refs_render_like_inline_values(server) -> None:
+    """A ref: value from pmkit_put_context renders exactly like the inline text."""
+    blob = "Customer said the export is slow. " * 2000
+    put = json.loads((await _call_tool(server, "pmkit_put_context", {"content": blob}))[0].text)
+    assert put["ref"].startswith("ref:") and put["bytes"] == len(blob)
+
+    inline = await _call_tool(server, "tldr", {"source_content": blob})
+    by_ref = await _call_tool(server, "tldr", {"source_content": put["ref"]})
+    assert by_ref[0].text == inline[0].text
+
+    batch = await _call_tool(
+        server,
+        "pmkit_render_batch",
+        {"items": [{"workflow_id": "tldr", "arguments": {"source_content": put["ref"]}}]},
+    )
+    item = json.loads(batch[0].text)["results"][0]
+    assert item["user_prompt"] == json.loads(inline[0].text)["user_prompt"]
+
+    unknown = await _call_tool(server, "tldr", {"source_content": "ref:" + "0" * 64})
+    assert "pmkit_put_context" in unknown[0].text
+
+    stats = json.loads((await _call_tool(server, "pmkit_stats"))[0].text)
+    session = stats["sessions"]["local"]
+    assert session["context_refs"] == 2
+    assert session["context_bytes_saved"] == 2 * (len(blob) - len(put["ref"]))
+    assert stats["context_store"]["entries"] == 1
+
+
+async def test_session_drafts_render_like_one_shot_call(server) -> None:
+    """Fields sent across pmkit_session calls render exactly like one full call."""
+    full = {"user_name": "Alice", "tenant_name": "Acme", "current_date": "2026-01-15"}
+    one_shot = await _call_tool(server, "daily_brief", full)
+
+    first = await _call_tool(
+        server, "daily_brief", {"user_name": "Bob", "tenant_name": "Acme", "pmkit_session": True}
+    )
+    assert "current_date" in first[0].text and "remembered" in first[0].text
+    patched = await _call_tool(
+        server,
+        "daily_brief",
+        {"user_name": "Alice", "current_date": "2026-01-15", "pmkit_session": True},
+    )
+    assert patched[0].text == one_shot[0].text
+
+    # Without the flag nothing is merged; a reset starts the draft over.
+    plain = await _call_tool(server, "daily_brief", {"current_date": "2026-01-15"})
+    assert "tenant_name" in plain[0].text
+    reset = await _call_tool(
+        server,
+        "daily_brief",
+        {"current_date": "2026-01-15", "pmkit_session": True, "pmkit_session_reset": True},
+    )
+    assert "tenant_name" in reset[0].text
+
+    session = json.loads((await _call_tool(server, "pmkit_stats"))[0].text)["sessions"]["local"]
+    assert session["draft_calls"] == 3
+    assert session["draft_bytes_reused"] == len("tenant_name") + len("Acme")
+
+
+async def test_catalog_workflow_listed_without_loading_prompts(server, tmp_path) -> None:
+    """Catalog workflows are listed and described from the index, loaded on first call."""
+    external = replace(WORKFLOW_REGISTRY["tldr"], id="ext_tldr", name="External TLDR")
+    write_catalog([external], tmp_path)
+    register_catalog(WORKFLOW_REGISTRY, tmp_path)
+    try:
+        assert "ext_tldr" in {t.name for t in await _list_tools(server)}
+        details = await _call_tool(server, "pmkit_workflow_details", {"workflow_id": "ext_tldr"})
+        assert "External TLDR" in details[0].text
+        missing = await _call_tool(server, "ext_tldr", {})
+        assert "source_content" in missing[0].text
+        assert isinstance(WORKFLOW_REGISTRY.summary("ext_tldr"), CatalogWorkflow)
+
+        content = await _call_tool(server, "ext_tldr", {"source_content": "Filters shipped"})
+        assert "Filters shipped" in json.loads(content[0].text)["user_prompt"]
+        assert isinstance(WORKFLOW_REGISTRY.summary("ext_tldr"), WorkflowDefinition)
+    finally:
+        del WORKFLOW_REGISTRY["ext_tldr"]
+
+
+async def test_missing_fields_result_carries_schema(server) -> None:
+    """Without elicitation, the text is unchanged and the missing fields come as a schema."""
+    handler = server.request_handlers[CallToolRequest]
+    result = await handler(
+        CallToolRequest(
+            method="tools/call",
+            params=CallToolRequestParams(name="daily_brief", arguments={"user_name": "Sam"}),
+        )
+    )
+    result = result.root
+    assert "tenant_name" in result.content[0].text
+    assert result.structuredContent["status"] == "needs_input"
+    schema = result.structuredContent["schema"]
+    assert schema["required"] == ["tenant_name", "current_date"]
+    assert set(schema["properties"]) == {"tenant_name", "current_date"}
+
+
+async def test_missing_fields_are_elicited_in_the_same_call(server) -> None:
+    requested = []
+    answer = ElicitResult(action="accept", content={"tenant_name": "Acme", "current_date": "1/15"})
+
+    async def on_elicit(context, params) -> ElicitResult:
+        requested.append(params.requestedSchema)
+        return answer
+
+    async with create_connected_server_and_client_session(
+        server, elicitation_callback=on_elicit
+    ) as client:
+        with anyio.fail_after(10):
+            result = await client.call_tool("daily_brief", {"user_name": "Sam"})
+            answer = ElicitResult(action="decline")
+            declined = await client.call_tool("daily_brief", {"user_name": "Sam"})
+
+    assert requested[0]["required"] == ["tenant_name", "current_date"]
+    assert "Acme" in json.loads(result.content[0].text)["user_prompt"]
+    assert declined.structuredContent["missing"] == ["tenant_name", "current_date"]
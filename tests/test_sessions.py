@@ -0,0 +1,49 @@
+"""Tests for per-session argument drafts."""
+
+from __future__ import annotations
+
+from pmkit_mcp.sessions import ArgumentDrafts
+
+
+def test_merge_keeps_earlier_fields_and_reports_reused_size() -> None:
+    drafts = ArgumentDrafts()
+    merged, reused = drafts.merge("s1", "tldr", {"source_content": "long text", "audience": "a"})
+    assert reused == 0
+    merged, reused = drafts.merge("s1", "tldr", {"audience": "execs"})
+    assert merged == {"source_content": "long text", "audience": "execs"}
+    assert reused == len("source_content") + len("long text")
+    # Drafts are per session and per workflow.
+    assert drafts.merge("s2", "tldr", {"x": "1"})[0] == {"x": "1"}
+    assert drafts.merge("s1", "one_pager", {"x": "1"})[0] == {"x": "1"}
+
+
+def test_discard_starts_over() -> None:
+    drafts = ArgumentDrafts()
+    drafts.merge("s1", "tldr", {"source_content": "text"})
+    drafts.discard("s1", "tldr")
+    assert drafts.merge("s1", "tldr", {})[0] == {}
+    assert drafts.stats()["bytes"] == 0
+
+
+def test_memory_bound_evicts_least_recently_used_drafts() -> None:
+    drafts = ArgumentDrafts(max_bytes=30)
+    drafts.merge("s1", "tldr", {"f": "x" * 10})
+    drafts.merge("s2", "tldr", {"f": "y" * 10})
+    drafts.merge("s1", "tldr", {})  # touch s1
+    drafts.merge("s3", "tldr", {"f": "z" * 10})
+    assert drafts.stats()["evictions"] == 1
+    assert drafts.merge("s2", "tldr", {})[0] == {}
+    # A draft larger than the whole budget is used for the call but not kept.
+    merged, _ = drafts.merge("s4", "tldr", {"f": "w" * 100})
+    assert merged == {"f": "w" * 100}
+    assert drafts.stats()["bytes"] <= 30
+
+
+def test_untouched_drafts_expire(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr("pmkit_mcp.sessions.time.monotonic", lambda: now[0])
+    drafts = ArgumentDrafts(ttl_seconds=10)
+    drafts.merge("s1", "tldr", {"source_content": "text"})
+    now[0] += 11
+    assert drafts.merge("s1", "tldr", {})[0] == {}
+    assert drafts.stats()["expirations"] == 1
@@ -0,0 +1,114 @@
+"""Tests for sprint metrics computed from pasted story lists."""
+
+from __future__ import annotations
+
+import json
+
+from pmkit_mcp.preprocess import preprocess_context
+from pmkit_mcp.renderer import render_workflow
+from pmkit_mcp.sprint_metrics import (
+    Story,
+    compute_metrics,
+    parse_stories,
+    parse_story_line,
+    sprint_metrics_stage,
+)
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY
+
+STORY_LINES = """\
+- ACME-342: Search filters (5 pts) [Done] @alice
+- ACME-343: Saved searches (8 pts) [In Progress] @bob
+- ACME-350: [Bug] Fix CSV export dates (2 pts) @alice
+- ACME-351: Onboarding checklist 3 points - In Review @carol
+- ACME-360: Docs update @bob
+Great sprint overall!
+"""
+
+
+def test_parse_story_line() -> None:
+    assert parse_story_line("ACME-351: Onboarding checklist 3 points - In Review @carol") == Story(
+        "ACME-351", "Onboarding checklist", 3.0, "In Review", "carol"
+    )
+    assert parse_story_line("* [Bug] Fix login (2 pts)") == Story(
+        "", "Fix login", 2.0, issue_type="Bug"
+    )
+    assert parse_story_line("Great sprint overall!") is None
+
+
+def test_metrics_from_lines() -> None:
+    stories, other = parse_stories(STORY_LINES)
+    assert other == ["Great sprint overall!"]
+    m = compute_metrics(stories)
+    assert (m.committed, m.completed, m.carried_over) == (5, 3, 2)
+    assert (m.committed_points, m.velocity, m.carried_over_points) == (18, 7, 11)
+    assert m.completion_rate == 7 / 18
+    assert (m.unestimated, m.bugs_fixed, m.bugs_open) == (1, 1, 0)
+    assert m.point_distribution == ((2.0, 1), (5.0, 1))
+    assert [(a.assignee, a.done, a.points, a.carried_over) for a in m.assignees] == [
+        ("alice", 2, 7.0, 0),
+        ("bob", 1, 0.0, 1),
+        ("carol", 0, 0.0, 1),
+    ]
+
+
+def test_csv_and_jira_json_exports() -> None:
+    csv_export = (
+        "Issue key,Summary,Custom field (Story Points),Status,Assignee,Issue Type,Sprint,Sprint\n"
+        'ACME-1,"Search, faster",5,Done,Alice,Story,S1,S2\n'
+        "ACME-2,Export dates,3,In Progress,Bob,Bug,S2,\n"
+    )
+    stories, other = parse_stories(csv_export)
+    assert other == []
+    assert stories == [
+        Story("ACME-1", "Search, faster", 5.0, "Done", "Alice", "Story"),
+        Story("ACME-2", "Export dates", 3.0, "In Progress", "Bob", "Bug"),
+    ]
+
+    issue = {
+        "key": "ACME-9",
+        "fields": {
+            "summary": "Login",
+            "status": {"name": "Closed"},
+            "assignee": {"displayName": "Dee"},
+            "issuetype": {"name": "Bug"},
+            "customfield_10016": 2.0,
+        },
+    }
+    stories, _ = parse_stories(json.dumps({"issues": [issue]}))
+    assert stories == [Story("ACME-9", "Login", 2.0, "Closed", "Dee", "Bug")]
+    assert compute_metrics(stories).bugs_fixed == 1
+
+
+def test_stage_leaves_prose_alone() -> None:
+    notes = ["We shipped filters.", "Velocity was up.", "ACME-1 follow-up next sprint"]
+    assert list(sprint_metrics_stage(notes)) == notes
+
+
+def test_sprint_review_gets_the_computed_table() -> None:
+    workflow = WORKFLOW_REGISTRY["sprint_review"]
+    context = {
+        "tenant_name": "Acme",
+        "sprint_name": "Sprint 42",
+        "sprint_start": "2026-01-06",
+        "sprint_end": "2026-01-17",
+        "completed_stories": STORY_LINES,
+    }
+    prompt = render_workflow(workflow, context).user_prompt
+    assert "| Completed (velocity) | 3 stories, 7 pts |" in prompt
+    assert "| Completion rate | 39% of points |" in prompt
+    assert "- ACME-343 Saved searches (8 pts, bob, In Progress)" in prompt
+    assert "[Done]" not in prompt
+
+
+def test_tsv_with_empty_cells_through_field_pipeline() -> None:
+    tsv = (
+        "Issue key\tSummary\tAssignee\tStatus\tStory Points\n"
+        "ACME-1\tSearch filters\t\tDone\t8\n"
+        "ACME-2\tSaved searches\tBob\tDone\t5\n"
+        "ACME-3\tExport dates\tBob\tIn Progress\t3\n"
+    )
+    workflow = WORKFLOW_REGISTRY["sprint_review"]
+    stages = [(f.name, f.preprocess) for f in workflow.optional_fields]
+    cleaned, _ = preprocess_context(stages, {"completed_stories": tsv})
+    assert "| Completed (velocity) | 2 stories, 13 pts |" in cleaned["completed_stories"]
+    assert "| Unassigned | 1 | 8 | 0 |" in cleaned["completed_stories"]
@@ -0,0 +1,46 @@
+"""Tests for compiled prompt templates."""
+
+from __future__ import annotations
+
+from pmkit_mcp.template import NOT_PROVIDED, compile_template
+from pmkit_mcp.workflows.registry import WORKFLOW_REGISTRY
+
+
+def test_compile_template_splits_literals_and_slots() -> None:
+    """Literals and slots must alternate, with one more literal than slot."""
+    compiled = compile_template("Hi {{name}}, welcome to {{place}}!")
+    assert compiled.literals == ("Hi ", ", welcome to ", "!")
+    assert compiled.slots == ("name", "place")
+
+
+def test_compile_template_without_placeholders() -> None:
+    """A template with no placeholders renders to itself."""
+    compiled = compile_template("plain text")
+    assert compiled.slots == ()
+    assert compiled.render({}) == "plain text"
+
+
+def test_render_uses_default_for_missing_values() -> None:
+    """Missing slots render as the not-provided marker."""
+    compiled = compile_template("{{a}}-{{b}}")
+    assert compiled.render({"a": "x"}) == f"x-{NOT_PROVIDED}"
+
+
+def test_render_repeated_placeholder() -> None:
+    """A placeholder used twice is filled in both places."""
+    compiled = compile_template("{{a}} and {{a}}")
+    assert compiled.render({"a": "x"}) == "x and x"
+    assert compiled.placeholders == frozenset({"a"})
+
+
+def test_render_does_not_expand_placeholders_inside_values() -> None:
+    """User values containing {{...}} must be inserted verbatim."""
+    compiled = compile_template("{{first}} / {{second}}")
+    rendered = compiled.render({"first": "literal {{second}}", "second": "B"})
+    assert rendered == "literal {{second}} / B"
+
+
+def test_registry_definitions_are_precompiled() -> None:
+    """Every workflow carries a compiled form matching its template."""
+    for wf in WORKFLOW_REGISTRY.values():
+        assert wf.compiled_template == compile_template(wf.user_prompt_template)
@@ -0,0 +1,140 @@
+"""Tests for hot reload of workflow definitions."""
+
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+
+import anyio
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+from mcp.types import ServerNotification, ToolListChangedNotification
+
+from pmkit_mcp.server import create_server
+from pmkit_mcp.workflows import registry as registry_module
+from pmkit_mcp.workflows.catalog import build_index, load_catalog, write_catalog
+from pmkit_mcp.workflows.registry import (
+    WORKFLOW_REGISTRY,
+    FieldSpec,
+    WorkflowDefinition,
+    WorkflowRegistry,
+)
+from pmkit_mcp.workflows.watch import WorkflowWatcher
+
+TLDR_PHRASE = "You are a communication expert helping PMs write concise"
+
+
+def _touch(path: Path, text: str) -> None:
+    """Rewrite ``path`` and move its mtime forward so the change is always visible."""
+    before = path.stat().st_mtime_ns
+    path.write_text(text)
+    os.utime(path, ns=(before + 10**9, before + 10**9))
+
+
+@pytest.fixture
+def builtin_copy(tmp_path):
+    path = tmp_path / "registry.py"
+    shutil.copy(registry_module.__file__, path)
+    registry = WorkflowRegistry(WORKFLOW_REGISTRY[wid] for wid in WORKFLOW_REGISTRY)
+    return path, registry
+
+
+def test_edit_to_registry_py_reloads_only_that_workflow(builtin_copy) -> None:
+    path, registry = builtin_copy
+    watcher = WorkflowWatcher(registry, registry_path=path)
+    assert watcher.poll() is None
+
+    before = {wid: registry[wid] for wid in registry}
+    source = path.read_text()
+    assert TLDR_PHRASE in source
+    _touch(path, source.replace(TLDR_PHRASE, "You write very short summaries"))
+
+    version = registry.version
+    result = watcher.poll()
+    assert result is not None
+    assert result.updated == ("tldr",)
+    assert result.removed == ()
+    assert registry.version == version + 1
+
+    reloaded = registry["tldr"]
+    assert isinstance(reloaded, WorkflowDefinition)
+    assert reloaded.system_prompt.startswith("You write very short summaries")
+    # In-flight renders keep the definition they already hold.
+    assert before["tldr"].system_prompt.startswith(TLDR_PHRASE)
+    assert all(registry[wid] is before[wid] for wid in registry if wid != "tldr")
+    assert watcher.poll() is None
+
+
+def test_reload_uses_live_classes_and_compiles_only_changed_templates(
+    builtin_copy, monkeypatch
+) -> None:
+    path, registry = builtin_copy
+    watcher = WorkflowWatcher(registry, registry_path=path)
+    compiled: list[str] = []
+    compile_template = registry_module.compile_template
+
+    def counting_compile(template: str):
+        compiled.append(template)
+        return compile_template(template)
+
+    monkeypatch.setattr(registry_module, "compile_template", counting_compile)
+    _touch(path, path.read_text().replace(TLDR_PHRASE, "You write very short summaries"))
+    result = watcher.poll()
+    assert result is not None and result.updated == ("tldr",)
+
+    reloaded = registry["tldr"]
+    assert type(reloaded) is WorkflowDefinition
+    assert all(type(f) is FieldSpec for f in reloaded.required_fields + reloaded.optional_fields)
+    assert compiled == [reloaded.user_prompt_template]
+
+
+def test_broken_edit_keeps_serving_old_definitions(builtin_copy) -> None:
+    path, registry = builtin_copy
+    watcher = WorkflowWatcher(registry, registry_path=path)
+    version = registry.version
+    _touch(path, path.read_text() + "\nthis is not python\n")
+    assert watcher.poll() is None
+    assert registry.version == version
+
+
+def test_catalog_edits_and_removals_are_applied(tmp_path) -> None:
+    write_catalog([WORKFLOW_REGISTRY["tldr"], WORKFLOW_REGISTRY["one_pager"]], tmp_path)
+    registry = WorkflowRegistry(load_catalog(tmp_path))
+    watcher = WorkflowWatcher(registry, catalogs=[tmp_path], registry_path=None)
+    registry["tldr"]  # load the prompts once
+
+    _touch(tmp_path / "tldr" / "user.md", "Summarize: {{source_content}}")
+    result = watcher.poll()
+    assert result is not None and result.updated == ("tldr",)
+    assert registry["tldr"].user_prompt_template == "Summarize: {{source_content}}"
+
+    shutil.rmtree(tmp_path / "one_pager")
+    build_index(tmp_path)
+    result = watcher.poll()
+    assert result is not None and result.removed == ("one_pager",)
+    assert "one_pager" not in registry
+
+
+def test_server_advertises_tools_list_changed() -> None:
+    capabilities = create_server().create_initialization_options().capabilities
+    assert capabilities.tools is not None and capabilities.tools.listChanged is True
+
+
+async def test_tools_list_changed_reaches_connected_client() -> None:
+    server = create_server()
+    received = anyio.Event()
+
+    async def on_message(message) -> None:
+        if isinstance(message, ServerNotification) and isinstance(
+            message.root, ToolListChangedNotification
+        ):
+            received.set()
+
+    async with create_connected_server_and_client_session(
+        server, message_handler=on_message
+    ) as client:
+        await client.list_tools()
+        assert await server.notify_tools_changed() == 1
+        with anyio.fail_after(5):
+            await received.wait()